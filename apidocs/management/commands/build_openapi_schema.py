@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apidocs.schema import artifact_path, generate_schema
+
+
+class Command(BaseCommand):
+    help = "Writes the OpenAPI schema served at /api/schema/ to schema.json and schema.yml."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only check that the files on disk match the current code; exit non-zero if not.",
+        )
+
+    def handle(self, *args, **options):
+        stale, written = [], 0
+        for fmt, content in generate_schema().items():
+            path = artifact_path(fmt)
+            if path.exists() and path.read_bytes() == content:
+                continue
+            if options['check']:
+                stale.append(path.name)
+                continue
+            path.write_bytes(content)
+            written += 1
+            self.stdout.write(f"Wrote {path}")
+
+        if stale:
+            raise CommandError(f"Out of date: {', '.join(stale)}. Run `manage.py build_openapi_schema`.")
+        if not written:
+            self.stdout.write(self.style.SUCCESS("OpenAPI schema is up to date"))
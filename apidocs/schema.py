@@ -0,0 +1,61 @@
+"""
+The OpenAPI schema is generated once, by `manage.py build_openapi_schema`,
+into schema.json and schema.yml under OPENAPI_SCHEMA_DIR, and served from
+those files. Generating it introspects every view, which is too slow to do
+per request and pulls in tooling workers otherwise never need.
+"""
+import hashlib
+import threading
+
+from django.conf import settings
+
+TITLE = "Skyfab Backend REST API"
+DESCRIPTION = "OpenAPI schema for Skyfab's backend APIs."
+
+FORMATS = {
+    'json': ('schema.json', 'application/vnd.oai.openapi+json'),
+    'yaml': ('schema.yml', 'application/vnd.oai.openapi'),
+}
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def artifact_path(fmt):
+    return settings.OPENAPI_SCHEMA_DIR / FORMATS[fmt][0]
+
+
+def generate_schema():
+    """
+    Returns the schema for the current code as {format: bytes}.
+    """
+    from rest_framework.renderers import JSONOpenAPIRenderer, OpenAPIRenderer
+    from rest_framework.schemas.openapi import SchemaGenerator
+
+    generator = SchemaGenerator(title=TITLE, description=DESCRIPTION, version=settings.API_VERSION)
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        'json': JSONOpenAPIRenderer().render(schema),
+        'yaml': OpenAPIRenderer().render(schema),
+    }
+
+
+def load_artifact(fmt):
+    """
+    Returns (content, etag) for the built schema in `fmt`, or None if it has
+    not been built. Files are read once per process and again only when they
+    change on disk.
+    """
+    path = artifact_path(fmt)
+    try:
+        modified = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != modified:
+            content = path.read_bytes()
+            etag = f'"{settings.API_VERSION}-{hashlib.sha256(content).hexdigest()[:16]}"'
+            cached = _loaded[path] = (modified, content, etag)
+    return cached[1], cached[2]
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import redoc_view, schema_view, swagger_ui_view
+
+urlpatterns = [
+    path('docs/', swagger_ui_view, name='api-docs'),
+    path('docs/redoc/', redoc_view, name='api-redoc'),
+    path('schema/', schema_view, name='api-schema'),
+]
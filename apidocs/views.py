@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from .schema import FORMATS, TITLE, load_artifact
+
+
+@require_safe
+def schema_view(request):
+    """
+    Serves the prebuilt OpenAPI schema: JSON by default, YAML with ?format=yaml.
+    Clients may cache it for OPENAPI_SCHEMA_MAX_AGE and revalidate by ETag.
+    """
+    fmt = 'yaml' if request.GET.get('format') in ('yaml', 'openapi') else 'json'
+    artifact = load_artifact(fmt)
+    if artifact is None:
+        return JsonResponse(
+            {"error": "The API schema has not been built. Run `manage.py build_openapi_schema`."},
+            status=503,
+        )
+
+    content, etag = artifact
+    response = get_conditional_response(request, etag=etag) or HttpResponse(content, content_type=FORMATS[fmt][1])
+    response.headers['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def _render_ui(request, renderer):
+    context = {'request': request}
+    renderer.set_context(context)
+    context['title'] = TITLE
+    response = HttpResponse(render_to_string(renderer.template, context, request))
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
+
+
+@require_safe
+def swagger_ui_view(request):
+    """Swagger UI for the schema served by schema_view."""
+    # drf-yasg is only needed for its UI pages, so workers import it on first use
+    from drf_yasg.renderers import SwaggerUIRenderer
+
+    return _render_ui(request, SwaggerUIRenderer())
+
+
+@require_safe
+def redoc_view(request):
+    """ReDoc for the schema served by schema_view."""
+    from drf_yasg.renderers import ReDocRenderer
+
+    return _render_ui(request, ReDocRenderer())
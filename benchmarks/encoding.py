@@ -0,0 +1,63 @@
+"""
+Bytes and CPU per catalog page for each JSON renderer and content coding.
+
+    python benchmarks/encoding.py --products 500 1000 5000
+
+Seeds a throwaway database (see benchmarks/endpoints.py), serializes the
+product listing once per size, then times rendering it with DRF's
+JSONRenderer and ORJSONRenderer, and compressing the result with gzip and
+brotli at the configured levels.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def cpu_ms(func, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.process_time() - started) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, nargs='+', default=[100, 1000, 5000], help="Page sizes to measure.")
+    parser.add_argument('--images', type=int, default=3, help="Images per product.")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per measurement.")
+    args = parser.parse_args()
+
+    from benchmarks.endpoints import seed, setup_django
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'bench.sqlite3'))
+        from rest_framework.renderers import JSONRenderer
+
+        from config.compression import compress
+        from config.renderers import ORJSONRenderer
+        from products.serializers import ProductSerializer
+        from products.views import catalog_queryset
+
+        seed(categories=4, subcategories=3, products=max(args.products), images=args.images,
+             users=1, cart_items=0, orders=0)
+        pages = {size: ProductSerializer(catalog_queryset()[:size], many=True).data for size in args.products}
+
+    columns = ('bytes', 'render_ms', 'gzip_bytes', 'gzip_ms', 'br_bytes', 'br_ms')
+    print(f"{'products':>8}  {'renderer':<15}" + ''.join(f"{column:>11}" for column in columns))
+    for size, data in pages.items():
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            body, render_ms = cpu_ms(lambda: renderer.render(data), args.repeat)
+            gzipped, gzip_ms = cpu_ms(lambda: compress(body, 'gzip'), args.repeat)
+            brotlied, br_ms = cpu_ms(lambda: compress(body, 'br'), args.repeat)
+            row = (len(body), round(render_ms, 2), len(gzipped), round(gzip_ms, 2), len(brotlied), round(br_ms, 2))
+            print(f"{size:>8}  {type(renderer).__name__:<15}" + ''.join(f"{value:>11}" for value in row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+"""
+In-process benchmark of every route in config/urls.py, with query budgets.
+
+    python benchmarks/endpoints.py --products 2000 --users 200 --iterations 50
+
+Seeds a fresh SQLite database with the requested volumes, then calls each
+route through the Django test client `--iterations` times and reports
+p50/p95 latency and the number of queries per call. Qikink is replaced by
+the local fake from tests/fake_qikink.py, and the order outbox worker is
+measured alongside the routes.
+
+The run fails if any call makes more queries than its budget in
+benchmarks/query_budgets.json. Query counts must not grow with the seeded
+volumes, so the same budgets are enforced on a small data set by
+tests/test_query_budgets.py. After an intended change, rewrite the file
+with --update-budgets and review the diff.
+"""
+import argparse
+import hashlib
+import hmac
+import io
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGETS_PATH = ROOT / 'benchmarks' / 'query_budgets.json'
+WEBHOOK_SECRET = 'benchmark-webhook-secret'
+PASSWORD = 'BenchPassword123'
+TRANSACTION_CONTROL = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN')
+
+DEFAULT_VOLUMES = {
+    'categories': 4,
+    'subcategories': 3,  # per category
+    'products': 500,
+    'images': 3,  # per product
+    'users': 50,
+    'cart_items': 3,  # per user
+    'orders': 2,  # per user
+}
+
+
+class Scenario:
+    """
+    One benchmarked call. `setup(client)` runs unmeasured before each call
+    and returns keyword arguments for it; `call(client, **kwargs)` makes the
+    call and returns its status code.
+    """
+
+    def __init__(self, name, call, expected_status=200, setup=None):
+        self.name = name
+        self.call = call
+        self.expected_status = expected_status
+        self.setup = setup
+
+
+def seed(categories, subcategories, products, images, users, cart_items, orders):
+    """
+    Creates the catalog, customers with carts and order history, and one
+    staff user. Returns what the scenarios need.
+    """
+    from django.contrib.auth.hashers import make_password
+
+    from cart.models import Cart, CartItem
+    from orders.models import Order, OrderItem
+    from products.models import Category, Product, ProductImage, SubCategory
+    from reports.aggregates import rebuild_sales
+    from users.models import User, UserProfile
+
+    category_rows = Category.objects.bulk_create([Category(name=f"Category{i}") for i in range(categories)])
+    subcategory_rows = SubCategory.objects.bulk_create([
+        SubCategory(name=f"{category.name}-Sub{j}", category=category)
+        for category in category_rows
+        for j in range(subcategories)
+    ])
+    product_rows = Product.objects.bulk_create([
+        Product(
+            product_id=f"BENCH-{i}",
+            sku=f"BENCH-{i}",
+            name=f"Bench Tee {i}",
+            price_with_shipping=Decimal('499.00') + i % 7,
+            sizes="S,M,L,XL",
+            category=subcategory_rows[i % len(subcategory_rows)].category,
+            subcategory=subcategory_rows[i % len(subcategory_rows)],
+        )
+        for i in range(products)
+    ])
+    ProductImage.objects.bulk_create([
+        ProductImage(product=product, image_url=f"https://cdn.example.com/{product.sku}/{j}.jpg")
+        for product in product_rows
+        for j in range(images)
+    ])
+
+    password = make_password(PASSWORD)
+    user_rows = User.objects.bulk_create([
+        User(
+            phone_number=f"+9170000{i:05d}",
+            email=f"bench{i}@example.com",
+            first_name=f"Bench{i}",
+            password=password,
+        )
+        for i in range(users)
+    ])
+    UserProfile.objects.bulk_create([UserProfile(user=user, city="Bengaluru") for user in user_rows])
+    cart_rows = Cart.objects.bulk_create([Cart(user=user) for user in user_rows])
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, product=product_rows[(i * cart_items + j) % len(product_rows)], quantity=1 + j)
+        for i, cart in enumerate(cart_rows)
+        for j in range(cart_items)
+    ])
+
+    order_rows = Order.objects.bulk_create([
+        Order(
+            user=user,
+            order_number=f"BENCH{i:05d}{j:02d}",
+            total_order_value=Decimal('998.00'),
+            status=Order.Status.SUBMITTED if j % 2 else Order.Status.DELIVERED,
+        )
+        for i, user in enumerate(user_rows)
+        for j in range(orders)
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem.from_product(order, product_rows[(i + j) % len(product_rows)], 2)
+        for i, order in enumerate(order_rows)
+        for j in range(2)
+    ])
+    rebuild_sales()
+
+    admin = User.objects.create_user(
+        phone_number="+917999999999", email="bench-admin@example.com", password=PASSWORD, first_name="Admin",
+    )
+    User.objects.filter(pk=admin.pk).update(is_staff=True, is_superuser=True)
+    admin.refresh_from_db()
+
+    return {
+        'admin': admin,
+        'customer': user_rows[0],
+        'users': user_rows,
+        'product': product_rows[0],
+        'products': product_rows,
+        'category': subcategory_rows[0].category,
+        'subcategory': subcategory_rows[0],
+        'orders': order_rows,
+    }
+
+
+def _bearer(user):
+    from users.tokens import SkyfabRefreshToken
+
+    return {'HTTP_AUTHORIZATION': f"Bearer {SkyfabRefreshToken.for_user(user).access_token}"}
+
+
+def _photo():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (1200, 800), 'navy').save(buffer, format='JPEG')
+    buffer.name = 'photo.jpg'
+    buffer.seek(0)
+    return buffer
+
+
+def _shipping_address(user):
+    return {
+        "first_name": user.first_name, "last_name": "Bench", "address1": "1 MG Road", "phone": "9394029313",
+        "email": user.email, "city": "Bengaluru", "zip": "560001", "province": "KA", "country_code": "IN",
+    }
+
+
+def build_scenarios(data):
+    """
+    Returns a Scenario for every route in config/urls.py, plus the order
+    outbox worker.
+    """
+    from django.test import Client
+    from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+    from django.urls import reverse
+
+    from cart.models import Cart, CartItem
+    from orders.outbox import process_due_submissions
+    from users.otp import issue_otp
+    from users.tokens import SkyfabRefreshToken
+
+    admin, customer, product = data['admin'], data['customer'], data['product']
+    customer_auth, admin_auth = _bearer(customer), _bearer(admin)
+    counter = itertools.count()
+    admin_client = Client()
+    admin_client.force_login(admin)
+
+    def get(url, auth=None, **params):
+        return lambda client, **kwargs: client.get(url, params, **(auth or {})).status_code
+
+    def post_json(url, auth=None):
+        return lambda client, body: client.post(
+            url, data=json.dumps(body), content_type='application/json', **(auth or {})
+        ).status_code
+
+    def registration(client):
+        n = next(counter)
+        return {'body': {
+            "phone_number": f"+9160000{n:05d}", "email": f"new{n}@example.com", "password": PASSWORD,
+            "first_name": "New", "last_name": "User", "profile": {"city": "Bengaluru"},
+        }}
+
+    def refresh_token(client):
+        return {'body': {"refresh": str(SkyfabRefreshToken.for_user(customer))}}
+
+    def otp(client):
+        return {'body': {"email": customer.email, "otp": issue_otp(customer), "new_password": PASSWORD}}
+
+    def filled_cart(client):
+        cart, _ = Cart.objects.get_or_create(user=customer)
+        CartItem.objects.get_or_create(cart=cart, product=product)
+        return {'body': _shipping_address(customer)}
+
+    def pending_submission(client):
+        # Drain orders left by the place-order scenario so each call submits exactly one
+        while process_due_submissions():
+            pass
+        client.post(
+            reverse('place-order'), data=json.dumps(filled_cart(client)['body']),
+            content_type='application/json', **customer_auth,
+        )
+        return {}
+
+    def webhook(client):
+        body = json.dumps({"updates": [
+            {"order_number": order.order_number, "status": "Delivered", "tracking_url": "https://track.example.com/1"}
+            for order in data['orders'][:20]
+        ]}).encode()
+        signature = hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+        return client.post(
+            reverse('order-status-webhook'), data=body, content_type='application/json',
+            HTTP_X_QIKINK_SIGNATURE=signature,
+        ).status_code
+
+    def import_csv(client):
+        n = next(counter)
+        lines = ["Product Name,SKU,Design,Product Type,Product & Shipping (Inclusive GST),Sizes,Image URLs"]
+        lines += [
+            f'Men_T-Shirts_Import{n}-{i},IMPORT-{n}-{i},Plain,T-Shirt,599.00,"S,M",'
+            f'"https://cdn.example.com/import/{n}/{i}.jpg"'
+            for i in range(5)
+        ]
+        upload = io.BytesIO("\n".join(lines).encode())
+        upload.name = 'products.csv'
+        return client.post(reverse('import-products'), {'file': upload}, **admin_auth).status_code
+
+    def photo_upload(client):
+        return client.put(
+            reverse('profile-photo'), data=encode_multipart(BOUNDARY, {"photo": _photo()}),
+            content_type=MULTIPART_CONTENT, **customer_auth,
+        ).status_code
+
+    return [
+        Scenario('admin:index', lambda client: admin_client.get(reverse('admin:index')).status_code),
+        Scenario('api-root', get(reverse('api-root'), customer_auth)),
+        Scenario('user-list', get(reverse('user-list'), admin_auth)),
+        Scenario('user-detail', get(reverse('user-detail', args=[customer.pk]), customer_auth)),
+        Scenario('register', post_json(reverse('register')), 201, registration),
+        Scenario('login', lambda client: post_json(reverse('login'))(
+            client, {"phone_number": str(customer.phone_number), "password": PASSWORD})),
+        Scenario('token_refresh', post_json(reverse('token_refresh')), setup=refresh_token),
+        Scenario('logout', post_json(reverse('logout'), customer_auth), setup=refresh_token),
+        Scenario('forgot-password', lambda client: post_json(reverse('forgot-password'))(
+            client, {"email": customer.email})),
+        Scenario('reset-password', post_json(reverse('reset-password')), setup=otp),
+        Scenario('profile-photo', photo_upload, 202),
+        Scenario('list-products', get(reverse('list-products'))),
+        Scenario('category-products', get(reverse('category-products', args=[data['category'].name]))),
+        Scenario('subcategory-products', get(reverse(
+            'subcategory-products', args=[data['category'].name, data['subcategory'].name]))),
+        Scenario('related-products', get(reverse('related-products', args=[product.pk]))),
+        Scenario('import-products', import_csv, 201),
+        Scenario('add-to-cart', lambda client: post_json(reverse('add-to-cart'), customer_auth)(
+            client, {"product_id": product.product_id, "quantity": 1}), 201),
+        Scenario('cart', get(reverse('cart'), customer_auth), setup=filled_cart),
+        Scenario('place-order', post_json(reverse('place-order'), customer_auth), 201, filled_cart),
+        Scenario('order-history', get(reverse('order-history'), customer_auth)),
+        Scenario('order-status-webhook', webhook),
+        Scenario('sales-report', get(reverse('sales-report'), admin_auth)),
+        Scenario('metrics', get(reverse('metrics'), admin_auth)),
+        Scenario('api-docs', get(reverse('api-docs'))),
+        Scenario('api-redoc', get(reverse('api-redoc'))),
+        Scenario('api-schema', get(reverse('api-schema'))),
+        Scenario('worker:order-outbox', lambda client: process_due_submissions(), 1, pending_submission),
+    ]
+
+
+def measure(client, scenario, iterations):
+    """
+    Runs `scenario` `iterations` times. Returns latencies in seconds, query
+    counts per call and any unexpected status codes.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    latencies, queries, bad_statuses = [], [], []
+    for _ in range(iterations):
+        kwargs = scenario.setup(client) if scenario.setup else {}
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            status = scenario.call(client, **kwargs)
+            latencies.append(time.perf_counter() - started)
+        # Savepoints only appear inside an outer transaction (as under pytest), so they are not counted
+        queries.append(sum(not query['sql'].startswith(TRANSACTION_CONTROL) for query in ctx.captured_queries))
+        if status != scenario.expected_status:
+            bad_statuses.append(status)
+    return latencies, queries, bad_statuses
+
+
+def load_budgets():
+    with open(BUDGETS_PATH) as f:
+        return json.load(f)
+
+
+def run_suite(data, iterations, budgets):
+    """
+    Measures every scenario and returns one result row per scenario, with
+    `over_budget` set when the worst call exceeded its query budget.
+    """
+    from django.test import Client
+
+    client = Client(raise_request_exception=False)
+    results = []
+    for scenario in build_scenarios(data):
+        latencies, queries, bad_statuses = measure(client, scenario, iterations)
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+        budget = budgets.get(scenario.name)
+        results.append({
+            'name': scenario.name,
+            'p50_ms': round(cuts[49] * 1000, 2),
+            'p95_ms': round(cuts[94] * 1000, 2),
+            'queries': max(queries),
+            'budget': budget,
+            'over_budget': budget is None or max(queries) > budget,
+            'bad_statuses': sorted(set(bad_statuses)),
+        })
+    return results
+
+
+def setup_django(db_path):
+    sys.path.insert(0, str(ROOT))
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings'
+    os.environ['DB_ENGINE'] = 'sqlite'
+    os.environ['SQLITE_DB_NAME'] = db_path
+    os.environ.setdefault('SECRET_KEY', 'benchmark-only-secret-key-0123456789abcdef')
+    os.environ.setdefault('EMAIL_HOST_USER', 'benchmark@example.com')
+    os.environ.setdefault('EMAIL_HOST_PASSWORD', '')
+    os.environ.setdefault('QIKINK_CLIENT_ID', 'benchmark')
+    os.environ.setdefault('QIKINK_CLIENT_SECRET', 'benchmark')
+    import django
+    django.setup()
+
+    from django.apps import apps
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    with connection.schema_editor() as editor:
+        for model in apps.get_models():
+            if model._meta.managed and not model._meta.proxy:
+                editor.create_model(model)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for name, default in DEFAULT_VOLUMES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default, help=f"Default: {default}.")
+    parser.add_argument('--iterations', type=int, default=20, help="Calls per route.")
+    parser.add_argument('--update-budgets', action='store_true', help="Rewrite the budgets from this run.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'bench.sqlite3'))
+        from django.conf import settings
+
+        from tests.fake_qikink import FakeQikink
+        from users.throttling import SlidingWindowRateThrottle
+
+        fake = FakeQikink().start()
+        settings.MEDIA_ROOT = directory
+        settings.QIKINK_BASE_URL = fake.url
+        settings.QIKINK_WEBHOOK_SECRET = WEBHOOK_SECRET
+        # Keep the throttles in the path without letting repeated logins trip them
+        SlidingWindowRateThrottle.THROTTLE_RATES = {
+            scope: '1000000/min' for scope in SlidingWindowRateThrottle.THROTTLE_RATES
+        }
+        try:
+            data = seed(**{name: getattr(args, name) for name in DEFAULT_VOLUMES})
+            results = run_suite(data, args.iterations, {} if args.update_budgets else load_budgets())
+        finally:
+            fake.stop()
+
+    columns = ('p50_ms', 'p95_ms', 'queries', 'budget')
+    print(f"{'route':<24}" + ''.join(f"{column:>10}" for column in columns))
+    for row in results:
+        flag = '  OVER BUDGET' if row['over_budget'] and not args.update_budgets else ''
+        if row['bad_statuses']:
+            flag += f"  unexpected status {row['bad_statuses']}"
+        print(f"{row['name']:<24}" + ''.join(f"{str(row[column]):>10}" for column in columns) + flag)
+
+    if args.update_budgets:
+        with open(BUDGETS_PATH, 'w') as f:
+            json.dump({row['name']: row['queries'] for row in results}, f, indent=2)
+            f.write('\n')
+        print(f"Wrote {BUDGETS_PATH.relative_to(ROOT)}")
+        return 0
+    return 1 if any(row['over_budget'] or row['bad_statuses'] for row in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
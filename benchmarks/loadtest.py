@@ -0,0 +1,126 @@
+"""
+Closed-loop HTTP load test for comparing the WSGI and ASGI server modes.
+
+Against a running server:
+
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000/api/v1/products/ --concurrency 200
+
+Or let it start gunicorn (see gunicorn.conf.py) in each mode in turn on the
+current database and print both results side by side:
+
+    python benchmarks/loadtest.py --compare --path /api/v1/products/
+
+More than one `--workers` needs a shared CACHE_BACKEND, as in production.
+
+Each of `concurrency` clients sends its next request as soon as the previous
+one completes, for `duration` seconds.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def run_load(url, concurrency, duration, timeout):
+    latencies = []
+    errors = 0
+    stop_at = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < stop_at:
+                started = time.monotonic()
+                try:
+                    response = await client.get(url)
+                    ok = response.status_code < 500
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.monotonic() - started)
+                else:
+                    errors += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    return summarize(latencies, errors, elapsed)
+
+
+def summarize(latencies, errors, elapsed):
+    if not latencies:
+        return {'requests': 0, 'errors': errors, 'rps': 0.0, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(cuts[49] * 1000, 1),
+        'p95_ms': round(cuts[94] * 1000, 1),
+        'p99_ms': round(cuts[98] * 1000, 1),
+    }
+
+
+def wait_until_up(url, deadline=30):
+    stop_at = time.monotonic() + deadline
+    while time.monotonic() < stop_at:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+
+def run_mode(mode, args):
+    env = dict(os.environ, SERVER_MODE=mode, GUNICORN_BIND=f"127.0.0.1:{args.port}", GUNICORN_WORKERS=str(args.workers))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', '/dev/null'],
+        cwd=ROOT,
+        env=env,
+    )
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+    try:
+        wait_until_up(url)
+        return asyncio.run(run_load(url, args.concurrency, args.duration, args.timeout))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help="Target URL of an already running server.")
+    parser.add_argument('--compare', action='store_true', help="Start gunicorn in WSGI then ASGI mode and compare.")
+    parser.add_argument('--path', default='/api/v1/products/', help="Path to load in --compare mode.")
+    parser.add_argument('--port', type=int, default=8765, help="Port for servers started by --compare.")
+    parser.add_argument('--workers', type=int, default=1, help="Gunicorn workers for --compare.")
+    parser.add_argument('--concurrency', type=int, default=100, help="Concurrent clients.")
+    parser.add_argument('--duration', type=float, default=15, help="Seconds of load per run.")
+    parser.add_argument('--timeout', type=float, default=30, help="Per-request timeout in seconds.")
+    args = parser.parse_args()
+
+    if args.compare:
+        results = {mode: run_mode(mode, args) for mode in ('wsgi', 'asgi')}
+    elif args.url:
+        results = {'target': asyncio.run(run_load(args.url, args.concurrency, args.duration, args.timeout))}
+    else:
+        parser.error("pass --url or --compare")
+
+    columns = ('requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms')
+    print(f"{'mode':<8}" + ''.join(f"{column:>10}" for column in columns))
+    for mode, result in results.items():
+        print(f"{mode:<8}" + ''.join(f"{str(result[column]):>10}" for column in columns))
+
+
+if __name__ == '__main__':
+    main()
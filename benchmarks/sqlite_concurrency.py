@@ -0,0 +1,152 @@
+"""
+Catalog read throughput on SQLite while a large product import is running,
+with and without SQLITE_TUNED (see config/settings.py).
+
+    python benchmarks/sqlite_concurrency.py --readers 4 --import-rows 50000
+
+Each run uses a fresh database file. One process imports products in
+transactions of `--batch-size` rows while the reader processes repeatedly
+load a page of the catalog; the run ends when the import does.
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG_MODELS = ('Category', 'SubCategory', 'Product', 'ProductImage')
+
+
+def setup_django(db_path, tuned):
+    sys.path.insert(0, ROOT)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings'
+    os.environ['DB_ENGINE'] = 'sqlite'
+    os.environ['SQLITE_DB_NAME'] = db_path
+    os.environ['SQLITE_TUNED'] = '1' if tuned else '0'
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ.setdefault('EMAIL_HOST_USER', 'benchmark@example.com')
+    os.environ.setdefault('EMAIL_HOST_PASSWORD', '')
+    os.environ.setdefault('QIKINK_CLIENT_ID', 'benchmark')
+    os.environ.setdefault('QIKINK_CLIENT_SECRET', 'benchmark')
+    import django
+    django.setup()
+
+
+def create_schema(db_path, tuned, seed_rows):
+    setup_django(db_path, tuned)
+    from django.apps import apps
+    from django.db import connection
+    from products.models import Category, Product, SubCategory
+
+    with connection.schema_editor() as editor:
+        for name in CATALOG_MODELS:
+            editor.create_model(apps.get_model('products', name))
+
+    category = Category.objects.create(name='Men')
+    subcategory = SubCategory.objects.create(name='T-Shirts', category=category)
+    Product.objects.bulk_create([
+        Product(product_id=f'SEED-{i}', sku=f'SEED-{i}', name=f'Seed {i}', price_with_shipping='499.00',
+                category=category, subcategory=subcategory)
+        for i in range(seed_rows)
+    ])
+
+
+def run_import(db_path, tuned, rows, batch_size, done):
+    setup_django(db_path, tuned)
+    from django.db import transaction
+    from products.models import Category, Product, SubCategory
+
+    category = Category.objects.get(name='Men')
+    subcategory = SubCategory.objects.get(category=category)
+    try:
+        for start in range(0, rows, batch_size):
+            with transaction.atomic():
+                Product.objects.bulk_create([
+                    Product(product_id=f'IMP-{i}', sku=f'IMP-{i}', name=f'Imported {i}',
+                            price_with_shipping='599.00', category=category, subcategory=subcategory)
+                    for i in range(start, min(start + batch_size, rows))
+                ])
+    finally:
+        done.set()
+
+
+def run_reader(db_path, tuned, done, results):
+    setup_django(db_path, tuned)
+    from django.db import OperationalError
+    from products.models import Product
+
+    latencies = []
+    errors = 0
+    while not done.is_set():
+        started = time.monotonic()
+        try:
+            list(Product.objects.filter(is_visible=True).select_related('category', 'subcategory')[:50])
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.monotonic() - started)
+    results.put((latencies, errors))
+
+
+def run(tuned, args):
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'bench.sqlite3')
+        ctx = multiprocessing.get_context('spawn')
+
+        schema = ctx.Process(target=create_schema, args=(db_path, tuned, args.seed_rows))
+        schema.start()
+        schema.join()
+
+        done = ctx.Event()
+        results = ctx.Queue()
+        readers = [ctx.Process(target=run_reader, args=(db_path, tuned, done, results)) for _ in range(args.readers)]
+        for reader in readers:
+            reader.start()
+        time.sleep(1)  # let readers finish starting Django
+
+        started = time.monotonic()
+        importer = ctx.Process(target=run_import, args=(db_path, tuned, args.import_rows, args.batch_size, done))
+        importer.start()
+        importer.join()
+        import_seconds = time.monotonic() - started
+
+        latencies, errors = [], 0
+        for _ in readers:
+            reader_latencies, reader_errors = results.get()
+            latencies.extend(reader_latencies)
+            errors += reader_errors
+        for reader in readers:
+            reader.join()
+
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [float('nan')] * 99
+    return {
+        'import_s': round(import_seconds, 2),
+        'reads': len(latencies),
+        'reads_per_s': round(len(latencies) / import_seconds, 1),
+        'p50_ms': round(cuts[49] * 1000, 2),
+        'p95_ms': round(cuts[94] * 1000, 2),
+        'locked': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=4, help="Reader processes.")
+    parser.add_argument('--import-rows', type=int, default=50000, help="Products imported during the run.")
+    parser.add_argument('--batch-size', type=int, default=500, help="Products per import transaction.")
+    parser.add_argument('--seed-rows', type=int, default=1000, help="Products present before the import starts.")
+    args = parser.parse_args()
+
+    results = {'default': run(False, args), 'tuned': run(True, args)}
+
+    columns = ('import_s', 'reads', 'reads_per_s', 'p50_ms', 'p95_ms', 'locked')
+    print(f"{'mode':<9}" + ''.join(f"{column:>12}" for column in columns))
+    for mode, result in results.items():
+        print(f"{mode:<9}" + ''.join(f"{str(result[column]):>12}" for column in columns))
+
+
+if __name__ == '__main__':
+    main()
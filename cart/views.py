@@ -22,7 +22,7 @@ class AddToCartView(APIView):
             return Response({"error": "Product not found or not visible"}, status=status.HTTP_404_NOT_FOUND)
 
         # Get or create a cart for the user
-        cart, _ = Cart.objects.get_or_create(user=user)
+        cart, _ = Cart.objects.get_or_create(user_id=user.id)
 
         # Get or create the cart item and update quantity
         cart_item, created = CartItem.objects.get_or_create(cart=cart, product=product)
@@ -36,8 +36,8 @@ class AddToCartView(APIView):
 class ViewCartView(APIView):
     def get(self, request, *args, **kwargs):
         user = request.user
-        cart = Cart.objects.filter(user=user).first()
-        if not cart or not cart.items.exists():
+        cart = Cart.objects.filter(user_id=user.id).prefetch_related('items__product').first()
+        if not cart or not cart.items.all():
             return Response({"error": "Cart is empty"}, status=status.HTTP_404_NOT_FOUND)
 
         serializer = CartSerializer(cart)
@@ -0,0 +1,275 @@
+"""
+Per-view request metrics, served in Prometheus text format at /api/v1/metrics/.
+
+For every request, RequestMetricsMiddleware records under the resolved URL
+name (`list-products`, `place-order`, ...):
+- latency, as a histogram
+- database queries and the time spent in them
+- cache hits and misses, via InstrumentedCache
+- time spent calling upstream APIs, reported by CircuitBreaker
+
+Metrics are kept with prometheus_client. Under gunicorn with several workers,
+set PROMETHEUS_MULTIPROC_DIR so each scrape adds up every worker's numbers
+instead of returning whichever worker answered (see gunicorn.conf.py).
+"""
+import os
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, disable_created_metrics, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+UPSTREAM_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+UNMATCHED = 'unmatched'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+disable_created_metrics()
+REGISTRY = CollectorRegistry()
+
+RESPONSES = Counter(
+    'skyfab_http_responses', "Responses by view, method and status code.",
+    ['view', 'method', 'status'], registry=REGISTRY,
+)
+REQUEST_DURATION = Histogram(
+    'skyfab_http_request_duration_seconds', "Request latency by view.",
+    ['view'], buckets=LATENCY_BUCKETS, registry=REGISTRY,
+)
+DB_QUERIES = Counter('skyfab_db_queries', "Database queries run by view.", ['view'], registry=REGISTRY)
+DB_QUERY_SECONDS = Counter(
+    'skyfab_db_query_seconds', "Time spent in database queries by view.", ['view'], registry=REGISTRY,
+)
+CACHE_HITS = Counter('skyfab_cache_hits', "Cache hits by view.", ['view'], registry=REGISTRY)
+CACHE_MISSES = Counter('skyfab_cache_misses', "Cache misses by view.", ['view'], registry=REGISTRY)
+UPSTREAM_SECONDS = Counter(
+    'skyfab_upstream_seconds', "Time spent calling upstream APIs by view.", ['view'], registry=REGISTRY,
+)
+
+BREAKER_OPEN = Gauge(
+    'skyfab_circuit_breaker_open', "Whether the upstream circuit breaker is refusing calls.",
+    ['name'], multiprocess_mode='livemax', registry=REGISTRY,
+)
+BREAKER_CALLS = Counter('skyfab_circuit_breaker_calls', "Upstream calls made.", ['name'], registry=REGISTRY)
+BREAKER_FAILURES = Counter('skyfab_circuit_breaker_failures', "Upstream calls that failed.", ['name'], registry=REGISTRY)
+BREAKER_REJECTED = Counter(
+    'skyfab_circuit_breaker_rejected', "Calls refused while the breaker was open.", ['name'], registry=REGISTRY,
+)
+BREAKER_OPENED = Counter('skyfab_circuit_breaker_opened', "Times the breaker opened.", ['name'], registry=REGISTRY)
+UPSTREAM_CALL_DURATION = Histogram(
+    'skyfab_upstream_call_duration_seconds', "Upstream API call latency.",
+    ['name'], buckets=UPSTREAM_LATENCY_BUCKETS, registry=REGISTRY,
+)
+
+AUTH_THROTTLED = Counter(
+    'skyfab_auth_throttled', "Auth requests rejected by the throttles.", ['scope', 'kind'], registry=REGISTRY,
+)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'query_seconds', 'cache_hits', 'cache_misses', 'upstream_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.upstream_seconds = 0.0
+
+
+def record_upstream_time(seconds):
+    """Adds an upstream API call's duration to the current request, if any."""
+    stats = _current.get()
+    if stats is not None:
+        stats.upstream_seconds += seconds
+
+
+def _record_cache(hit):
+    stats = _current.get()
+    if stats is not None:
+        if hit:
+            stats.cache_hits += 1
+        else:
+            stats.cache_misses += 1
+
+
+def _count_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_seconds += time.perf_counter() - started
+
+
+def _install_query_counter(connection, **kwargs):
+    # Connections are per thread, and async views query from executor threads,
+    # so the counter stays installed and reads the request from the context.
+    # It goes first so that execute_wrapper() blocks still pop their own wrapper.
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _count_query)
+
+
+connection_created.connect(_install_query_counter)
+
+
+def _observe(view, method, status, latency, stats):
+    RESPONSES.labels(view, method, str(status)).inc()
+    REQUEST_DURATION.labels(view).observe(latency)
+    DB_QUERIES.labels(view).inc(stats.queries)
+    DB_QUERY_SECONDS.labels(view).inc(stats.query_seconds)
+    CACHE_HITS.labels(view).inc(stats.cache_hits)
+    CACHE_MISSES.labels(view).inc(stats.cache_misses)
+    UPSTREAM_SECONDS.labels(view).inc(stats.upstream_seconds)
+
+
+def reset():
+    """Clears this process's metrics; for tests."""
+    for metric in (
+        RESPONSES, REQUEST_DURATION, DB_QUERIES, DB_QUERY_SECONDS, CACHE_HITS, CACHE_MISSES, UPSTREAM_SECONDS,
+        BREAKER_OPEN, BREAKER_CALLS, BREAKER_FAILURES, BREAKER_REJECTED, BREAKER_OPENED, UPSTREAM_CALL_DURATION,
+        AUTH_THROTTLED,
+    ):
+        metric.clear()
+
+
+class InstrumentedCache:
+    """
+    Wraps the cache backend named by the alias's WRAPPED_BACKEND setting,
+    counting hits and misses against the current request; everything else is
+    passed straight through.
+
+        CACHES = {'default': {
+            'BACKEND': 'config.metrics.InstrumentedCache',
+            'WRAPPED_BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://redis:6379/0',
+        }}
+    """
+    _miss = object()
+
+    def __init__(self, location, params):
+        params = dict(params)
+        backend = import_string(params.pop('WRAPPED_BACKEND'))
+        self._cache = backend(location, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+    def _count(self, value):
+        _record_cache(value is not self._miss)
+        return value
+
+    def get(self, key, default=None, version=None):
+        value = self._count(self._cache.get(key, self._miss, version))
+        return default if value is self._miss else value
+
+    async def aget(self, key, default=None, version=None):
+        value = self._count(await self._cache.aget(key, self._miss, version))
+        return default if value is self._miss else value
+
+    def _count_many(self, keys, values):
+        for key in keys:
+            _record_cache(key in values)
+        return values
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        return self._count_many(keys, self._cache.get_many(keys, version))
+
+    async def aget_many(self, keys, version=None):
+        keys = list(keys)
+        return self._count_many(keys, await self._cache.aget_many(keys, version))
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self._count(self._cache.get(key, self._miss, version))
+        if value is not self._miss:
+            return value
+        return self._cache.get_or_set(key, default, timeout, version)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records per-view metrics for each request; see the module docstring.
+    Disabled with METRICS_ENABLED=False.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with _Measurement(request) as measurement:
+            measurement.response = self.get_response(request)
+        return measurement.response
+
+    async def __acall__(self, request):
+        with _Measurement(request) as measurement:
+            measurement.response = await self.get_response(request)
+        return measurement.response
+
+
+class _Measurement:
+    def __init__(self, request):
+        self.request = request
+        self.response = None
+        self.stats = RequestStats()
+
+    def __enter__(self):
+        self._token = _current.set(self.stats)
+        for connection in connections.all(initialized_only=True):
+            _install_query_counter(connection)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        latency = time.perf_counter() - self._started
+        _current.reset(self._token)
+        match = getattr(self.request, 'resolver_match', None)
+        if match is None:
+            view = UNMATCHED
+        else:
+            # Unnamed routes are labelled by pattern, never by the raw path
+            view = match.view_name if match.url_name else match.route
+        status = self.response.status_code if self.response is not None else 500
+        _observe(view, self.request.method, status, latency, self.stats)
+
+
+def render_metrics():
+    """Returns all metrics in Prometheus text exposition format."""
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+class MetricsView(APIView):
+    """
+    API View serving metrics to Prometheus (admin only).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
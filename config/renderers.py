@@ -0,0 +1,33 @@
+import decimal
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_fallback = JSONEncoder()
+
+
+def _default(obj):
+    # Exact decimal text, as DecimalField already renders prices; float() would round
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    # Lazy strings, querysets, timedeltas, generators and the rest, as DRF encodes them
+    return _fallback.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer that encodes with orjson.
+
+    Output is compact UTF-8, like JSONRenderer with the default COMPACT_JSON
+    and UNICODE_JSON settings. Types orjson does not know are handed to DRF's
+    encoder, except Decimals, which are kept exact as strings.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        option = orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=option)
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA = 'replica'
+
+
+def catalog_database():
+    """
+    The database the public catalog views read from: the `replica` when one
+    is configured, otherwise `default`. Catalog pages may be served slightly
+    stale; nothing else reads from the replica.
+    """
+    return REPLICA if REPLICA in settings.DATABASES else DEFAULT_DB_ALIAS
+
+
+class CatalogReplicaRouter:
+    """
+    Keeps every write, and every read that does not explicitly ask for the
+    replica with `.using(catalog_database())`, on `default`. Carts, checkout
+    and imports therefore always see the primary, including their own
+    uncommitted writes. Related rows of an object loaded from the replica
+    are read from the replica too.
+    """
+
+    def db_for_write(self, model, **hints):
+        # Including rows that were read from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
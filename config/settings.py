@@ -33,13 +33,19 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
+    'drf_yasg',
     'users',
     'products',
     'cart',
     'orders',
+    'reports',
+    'apidocs',
+    'notifications',
 ]
 
 MIDDLEWARE = [
+    'config.metrics.RequestMetricsMiddleware',
+    'config.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -74,34 +80,168 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # REST Framework Configurations
 REST_FRAMEWORK = {
+    # The browsable API is only offered in DEBUG (see below)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        config('JSON_RENDERER_CLASS', default='config.renderers.ORJSONRenderer'),
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'users.authentication.SkyfabJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.TokenAuthentication',
     ],
+    # Reverse proxies in front of the app; the client IP is the address the
+    # outermost one of them saw. 0 uses REMOTE_ADDR and ignores X-Forwarded-For,
+    # which clients can set to anything.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    # Auth endpoints (see users/throttling.py): per phone number/email, and per client IP
+    'DEFAULT_THROTTLE_RATES': {
+        'login': config('THROTTLE_LOGIN', default='10/min'),
+        'login_ip': config('THROTTLE_LOGIN_IP', default='60/min'),
+        'forgot_password': config('THROTTLE_FORGOT_PASSWORD', default='5/hour'),
+        'forgot_password_ip': config('THROTTLE_FORGOT_PASSWORD_IP', default='30/hour'),
+        'reset_password': config('THROTTLE_RESET_PASSWORD', default='10/hour'),
+        'reset_password_ip': config('THROTTLE_RESET_PASSWORD_IP', default='60/hour'),
+    },
 }
 
+if DEBUG:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('rest_framework.renderers.BrowsableAPIRenderer')
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_USER_CLASS': 'users.tokens.SkyfabTokenUser',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.SkyfabTokenRefreshSerializer',
+}
+
+# Response compression for bodies of at least COMPRESSION_MIN_BYTES (see config/compression.py)
+COMPRESSION_ENABLED = config("COMPRESSION_ENABLED", default=True, cast=bool)
+COMPRESSION_MIN_BYTES = config("COMPRESSION_MIN_BYTES", default=1024, cast=int)
+COMPRESSION_GZIP_LEVEL = config("COMPRESSION_GZIP_LEVEL", default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config("COMPRESSION_BROTLI_QUALITY", default=4, cast=int)
+
+# OpenAPI schema, built by `manage.py build_openapi_schema` and served from disk (see apidocs/schema.py)
+API_VERSION = config("API_VERSION", default="1.0.0")
+OPENAPI_SCHEMA_DIR = BASE_DIR
+OPENAPI_SCHEMA_MAX_AGE = config("OPENAPI_SCHEMA_MAX_AGE", default=3600, cast=int)
+
+# Swagger UI and ReDoc pages (drf-yasg templates) read the prebuilt schema
+SWAGGER_SETTINGS = {
+    'SPEC_URL': 'api-schema',
+    'USE_SESSION_AUTH': False,
 }
+REDOC_SETTINGS = {
+    'SPEC_URL': 'api-schema',
+}
+
+# Build request.user from JWT claims instead of a database lookup
+JWT_STATELESS_USER = config('JWT_STATELESS_USER', default=False, cast=bool)
 
-# Database Configuration (SQLite by Default)
-DATABASES = {
+# Refresh token revocation (see users/revocation.py and `manage.py prune_expired_tokens`)
+JWT_PRUNE_BATCH_SIZE = config('JWT_PRUNE_BATCH_SIZE', default=1000, cast=int)
+
+# Per-view request metrics, served to admins at /api/v1/metrics/ (see config/metrics.py)
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+
+# Cache holding OTPs, auth throttle windows and the token revocation list. The
+# local-memory default is private to each process, so running more than one
+# worker needs a shared backend, e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# with CACHE_LOCATION=redis://redis:6379/0 (see gunicorn.conf.py)
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+CACHE_LOCATION = config('CACHE_LOCATION', default='')
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / config("SQLITE_DB_NAME", default="db.sqlite3"),
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
     }
 }
 
+if METRICS_ENABLED:
+    # Counts cache hits and misses per view, whichever backend is configured
+    CACHES['default'].update(BACKEND='config.metrics.InstrumentedCache', WRAPPED_BACKEND=CACHE_BACKEND)
+
+# Password reset OTPs (stored in the cache, see users/otp.py)
+OTP_LENGTH = config('OTP_LENGTH', default=6, cast=int)
+OTP_TTL_SECONDS = config('OTP_TTL_SECONDS', default=600, cast=int)
+OTP_MAX_ATTEMPTS = config('OTP_MAX_ATTEMPTS', default=5, cast=int)
+
+# Seconds a user listing's total count is reused across pages
+USER_LIST_COUNT_CACHE_SECONDS = config('USER_LIST_COUNT_CACHE_SECONDS', default=60, cast=int)
+
+# Database Configuration (SQLite by Default, PostgreSQL when DB_ENGINE=postgres)
+DB_ENGINE = config("DB_ENGINE", default="sqlite")
+
+if DB_ENGINE == "postgres":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config("POSTGRES_DB", default="skyfab"),
+            'USER': config("POSTGRES_USER", default="skyfab"),
+            'PASSWORD': config("POSTGRES_PASSWORD", default=""),
+            'HOST': config("POSTGRES_HOST", default="localhost"),
+            'PORT': config("POSTGRES_PORT", default="5432"),
+            # Keep connections open between requests; check them before reuse
+            'CONN_MAX_AGE': config("DB_CONN_MAX_AGE", default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': config("DB_CONNECT_TIMEOUT", default=5, cast=int),
+            },
+        }
+    }
+    # Server-side pooling per process; needs Django 5.1+ and psycopg 3 (`pip install "psycopg[binary,pool]"`)
+    # and replaces persistent connections
+    if config("DB_POOL", default=False, cast=bool):
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config("DB_POOL_MIN_SIZE", default=2, cast=int),
+            'max_size': config("DB_POOL_MAX_SIZE", default=10, cast=int),
+        }
+
+    # Optional read replica for catalog reads (see config/routers.py)
+    DB_REPLICA_HOST = config("POSTGRES_REPLICA_HOST", default="")
+    if DB_REPLICA_HOST:
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': DB_REPLICA_HOST,
+            'PORT': config("POSTGRES_REPLICA_PORT", default=DATABASES['default']['PORT']),
+            'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / config("SQLITE_DB_NAME", default="db.sqlite3"),
+        }
+    }
+    # Opt-in tuning for single-node deployments: WAL lets readers run alongside a
+    # writer, NORMAL skips the fsync on every commit (still safe in WAL mode), and
+    # writers take the write lock at BEGIN so they queue on busy_timeout instead
+    # of failing with "database is locked" when upgrading a read transaction.
+    # transaction_mode and multi-statement init_command need Django 5.1+.
+    if config("SQLITE_TUNED", default=False, cast=bool):
+        SQLITE_BUSY_TIMEOUT_MS = config("SQLITE_BUSY_TIMEOUT_MS", default=5000, cast=int)
+        DATABASES['default']['OPTIONS'] = {
+            'init_command': ";".join([
+                "PRAGMA journal_mode=WAL",
+                "PRAGMA synchronous=NORMAL",
+                f"PRAGMA mmap_size={config('SQLITE_MMAP_SIZE', default=134217728, cast=int)}",
+                f"PRAGMA cache_size=-{config('SQLITE_CACHE_SIZE_KB', default=65536, cast=int)}",
+                f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+                "PRAGMA temp_store=MEMORY",
+            ]),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+
+DATABASE_ROUTERS = ['config.routers.CatalogReplicaRouter']
+
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
 ]
@@ -113,6 +253,13 @@ MEDIA_ROOT = BASE_DIR / 'media'
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'static'
 
+# Stream every upload to a temporary file instead of buffering small ones in memory
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
+# Profile photo thumbnails (`manage.py process_profile_photos`)
+PROFILE_THUMBNAIL_SIZE = config('PROFILE_THUMBNAIL_SIZE', default=256, cast=int)
+PROFILE_PHOTO_BATCH_SIZE = config('PROFILE_PHOTO_BATCH_SIZE', default=20, cast=int)
+
 # Password Validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -138,8 +285,62 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = f"Skyfab Team <{EMAIL_HOST_USER}>"
+EMAIL_TIMEOUT = config("EMAIL_TIMEOUT", default=10, cast=int)
 
 # Twilio SMS Configuration (From .env)
 TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID", default="")
 TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN", default="")
 TWILIO_PHONE_NUMBER = config("TWILIO_PHONE_NUMBER", default="")
+SMS_BACKEND = config(
+    "SMS_BACKEND",
+    default="notifications.sms.TwilioSMSBackend" if TWILIO_ACCOUNT_SID else "notifications.sms.ConsoleSMSBackend",
+)
+SMS_CONNECT_TIMEOUT = config("SMS_CONNECT_TIMEOUT", default=3.05, cast=float)
+SMS_READ_TIMEOUT = config("SMS_READ_TIMEOUT", default=10, cast=float)
+
+# Notification Outbox (emails and SMS are sent by `manage.py process_notifications`)
+NOTIFICATION_BATCH_SIZE = config("NOTIFICATION_BATCH_SIZE", default=50, cast=int)
+NOTIFICATION_MAX_ATTEMPTS = config("NOTIFICATION_MAX_ATTEMPTS", default=5, cast=int)
+NOTIFICATION_BACKOFF_SECONDS = config("NOTIFICATION_BACKOFF_SECONDS", default=15, cast=int)
+NOTIFICATION_BACKOFF_MAX_SECONDS = config("NOTIFICATION_BACKOFF_MAX_SECONDS", default=900, cast=int)
+NOTIFICATION_LEASE_SECONDS = config("NOTIFICATION_LEASE_SECONDS", default=120, cast=int)
+
+# Qikink Fulfilment API (From .env)
+QIKINK_BASE_URL = config("QIKINK_BASE_URL", default="https://sandbox.qikink.com")
+QIKINK_CLIENT_ID = config("QIKINK_CLIENT_ID")
+QIKINK_CLIENT_SECRET = config("QIKINK_CLIENT_SECRET")
+QIKINK_CONNECT_TIMEOUT = config("QIKINK_CONNECT_TIMEOUT", default=3.05, cast=float)
+QIKINK_READ_TIMEOUT = config("QIKINK_READ_TIMEOUT", default=10, cast=float)
+QIKINK_POOL_SIZE = config("QIKINK_POOL_SIZE", default=10, cast=int)
+QIKINK_TOKEN_TTL = config("QIKINK_TOKEN_TTL", default=3600, cast=int)
+QIKINK_TOKEN_REFRESH_MARGIN = config("QIKINK_TOKEN_REFRESH_MARGIN", default=300, cast=int)
+QIKINK_CALL_BUDGET = config("QIKINK_CALL_BUDGET", default=15, cast=float)
+QIKINK_BREAKER_FAILURE_RATE = config("QIKINK_BREAKER_FAILURE_RATE", default=0.5, cast=float)
+QIKINK_BREAKER_WINDOW = config("QIKINK_BREAKER_WINDOW", default=20, cast=int)
+QIKINK_BREAKER_MIN_CALLS = config("QIKINK_BREAKER_MIN_CALLS", default=5, cast=int)
+QIKINK_BREAKER_RESET_TIMEOUT = config("QIKINK_BREAKER_RESET_TIMEOUT", default=30, cast=float)
+
+QIKINK_WEBHOOK_SECRET = config("QIKINK_WEBHOOK_SECRET", default="")
+
+# Shipment status polling (`manage.py refresh_order_status`)
+ORDER_STATUS_POLL_BATCH_SIZE = config("ORDER_STATUS_POLL_BATCH_SIZE", default=100, cast=int)
+ORDER_STATUS_POLL_CONCURRENCY = config("ORDER_STATUS_POLL_CONCURRENCY", default=8, cast=int)
+ORDER_STATUS_POLL_MIN_AGE = config("ORDER_STATUS_POLL_MIN_AGE", default=900, cast=int)
+
+# Order Numbers (reserved in blocks per worker process)
+ORDER_NUMBER_PREFIX = config("ORDER_NUMBER_PREFIX", default="SKY")
+ORDER_NUMBER_WIDTH = config("ORDER_NUMBER_WIDTH", default=8, cast=int)
+ORDER_NUMBER_BLOCK_SIZE = config("ORDER_NUMBER_BLOCK_SIZE", default=20, cast=int)
+
+# Idempotency-Key handling for order placement
+IDEMPOTENCY_WAIT_SECONDS = config("IDEMPOTENCY_WAIT_SECONDS", default=10, cast=float)
+IDEMPOTENCY_LOCK_SECONDS = config("IDEMPOTENCY_LOCK_SECONDS", default=60, cast=int)
+IDEMPOTENCY_KEY_TTL_SECONDS = config("IDEMPOTENCY_KEY_TTL_SECONDS", default=86400, cast=int)
+IDEMPOTENCY_PRUNE_BATCH_SIZE = config("IDEMPOTENCY_PRUNE_BATCH_SIZE", default=1000, cast=int)
+
+# Order Outbox (orders are submitted to Qikink by `manage.py process_order_outbox`)
+ORDER_OUTBOX_BATCH_SIZE = config("ORDER_OUTBOX_BATCH_SIZE", default=20, cast=int)
+ORDER_OUTBOX_MAX_ATTEMPTS = config("ORDER_OUTBOX_MAX_ATTEMPTS", default=8, cast=int)
+ORDER_OUTBOX_BACKOFF_SECONDS = config("ORDER_OUTBOX_BACKOFF_SECONDS", default=30, cast=int)
+ORDER_OUTBOX_BACKOFF_MAX_SECONDS = config("ORDER_OUTBOX_BACKOFF_MAX_SECONDS", default=3600, cast=int)
+ORDER_OUTBOX_LEASE_SECONDS = config("ORDER_OUTBOX_LEASE_SECONDS", default=120, cast=int)
@@ -0,0 +1,62 @@
+"""
+Gunicorn settings for the API, picked by SERVER_MODE:
+
+- `wsgi` (default): threaded sync workers running config.wsgi; concurrency is
+  workers × threads.
+- `asgi`: uvicorn workers running config.asgi; each worker multiplexes many
+  in-flight requests on its event loop, so async views waiting on the network
+  do not tie up a worker.
+
+    gunicorn -c gunicorn.conf.py
+"""
+import multiprocessing
+import os
+import shutil
+
+from decouple import config
+
+mode = os.environ.get("SERVER_MODE", "wsgi").lower()
+
+# OTPs, throttle windows and revoked tokens live in the Django cache, which
+# every worker must share; the local-memory default only works with one worker
+shared_cache = "locmem" not in config("CACHE_BACKEND", default="locmem").lower()
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1 if shared_cache else 1))
+if workers > 1 and not shared_cache:
+    raise RuntimeError(
+        f"GUNICORN_WORKERS={workers} needs a cache shared by all workers; "
+        "set CACHE_BACKEND and CACHE_LOCATION (e.g. Redis) or run a single worker"
+    )
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+
+if mode == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+    # Sync views still run in each worker's thread pool (ASGI_THREADS)
+    os.environ.setdefault("ASGI_THREADS", os.environ.get("GUNICORN_THREADS", "8"))
+else:
+    wsgi_app = "config.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Workers write their metrics to files here, which /api/v1/metrics/ adds up
+# (see config/metrics.py). It must be set before the workers import Django.
+prometheus_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+def on_starting(server):
+    if prometheus_dir:
+        # Numbers left over from a previous run would be counted again
+        shutil.rmtree(prometheus_dir, ignore_errors=True)
+        os.makedirs(prometheus_dir)
+
+
+def child_exit(server, worker):
+    if prometheus_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import process_due_notifications
+
+
+class Command(BaseCommand):
+    help = "Sends queued emails and text messages from the notification outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process a single batch and exit.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Maximum notifications to claim per batch.")
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds to sleep when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_due_notifications(batch_size=options['batch_size'])
+            if processed:
+                self.stdout.write(f"Processed {processed} notification(s)")
+
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
@@ -0,0 +1,153 @@
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import Notification
+from .sms import SMSError, get_sms_backend
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(to, subject, body):
+    """
+    Queues an email for the notification worker and returns immediately.
+    """
+    return Notification.objects.create(channel=Notification.Channel.EMAIL, recipient=to, subject=subject, body=body)
+
+
+def enqueue_sms(to, body):
+    """
+    Queues a text message for the notification worker and returns immediately.
+    """
+    return Notification.objects.create(channel=Notification.Channel.SMS, recipient=str(to), body=body)
+
+
+def backoff_delay(attempts):
+    """
+    Exponential backoff for the given number of failed attempts, capped.
+    """
+    delay = settings.NOTIFICATION_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, settings.NOTIFICATION_BACKOFF_MAX_SECONDS))
+
+
+def claim_due_notifications(batch_size=None, now=None):
+    """
+    Leases up to `batch_size` due notifications to this worker, the same way
+    the order outbox does: a conditional update of `next_attempt_at` per row,
+    which expires if the worker dies before recording the outcome.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    now = now or timezone.now()
+    lease_until = now + timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS)
+
+    candidates = (
+        Notification.objects
+        .filter(status=Notification.Status.PENDING, next_attempt_at__lte=now)
+        .order_by('next_attempt_at')
+        .values_list('pk', 'next_attempt_at')[:batch_size]
+    )
+
+    claimed = []
+    for pk, next_attempt_at in candidates:
+        updated = Notification.objects.filter(
+            pk=pk, next_attempt_at=next_attempt_at, status=Notification.Status.PENDING
+        ).update(next_attempt_at=lease_until)
+        if updated:
+            claimed.append(pk)
+
+    return list(Notification.objects.filter(pk__in=claimed).order_by('pk'))
+
+
+def _mark_sent(notification, now):
+    notification.status = Notification.Status.SENT
+    notification.attempts += 1
+    notification.sent_at = now
+    notification.last_error = ''
+    # Bodies may carry one-time codes; they are not needed once delivered
+    notification.body = ''
+
+
+def _mark_failed(notification, error, retryable, now):
+    notification.attempts += 1
+    notification.last_error = str(error)
+    if not retryable or notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+        logger.error(f"Giving up on {notification} after {notification.attempts} attempts: {error}")
+        notification.status = Notification.Status.FAILED
+        notification.body = ''
+    else:
+        notification.next_attempt_at = now + backoff_delay(notification.attempts)
+        logger.warning(f"Sending {notification} failed (attempt {notification.attempts}): {error}")
+
+
+def _send_emails(notifications, now):
+    """
+    Sends the batch over a single SMTP connection, one message at a time so a
+    rejected recipient only fails its own notification.
+    """
+    connection = get_connection(fail_silently=False)
+    try:
+        for notification in notifications:
+            message = EmailMessage(
+                notification.subject,
+                notification.body,
+                settings.DEFAULT_FROM_EMAIL,
+                [notification.recipient],
+                connection=connection,
+            )
+            try:
+                # send_messages() opens and closes a session of its own unless the
+                # connection is already open. open() does nothing when it is.
+                connection.open()
+                connection.send_messages([message])
+            except smtplib.SMTPRecipientsRefused as e:
+                _mark_failed(notification, e, retryable=False, now=now)
+            except (smtplib.SMTPException, OSError) as e:
+                _mark_failed(notification, e, retryable=True, now=now)
+                # The connection may be unusable now; the next message reopens it
+                connection.close()
+            else:
+                _mark_sent(notification, now)
+    finally:
+        connection.close()
+
+
+def _send_sms(notifications, now):
+    backend = get_sms_backend()
+    try:
+        for notification in notifications:
+            try:
+                backend.send(notification.recipient, notification.body)
+            except SMSError as e:
+                _mark_failed(notification, e, retryable=e.retryable, now=now)
+            else:
+                _mark_sent(notification, now)
+    finally:
+        backend.close()
+
+
+def process_due_notifications(batch_size=None):
+    """
+    Claims and sends one batch of due notifications, then records every
+    outcome with a single bulk update. Returns the number processed.
+    """
+    notifications = claim_due_notifications(batch_size=batch_size)
+    if not notifications:
+        return 0
+
+    now = timezone.now()
+    emails = [n for n in notifications if n.channel == Notification.Channel.EMAIL]
+    texts = [n for n in notifications if n.channel == Notification.Channel.SMS]
+    if emails:
+        _send_emails(emails, now)
+    if texts:
+        _send_sms(texts, now)
+
+    Notification.objects.bulk_update(
+        notifications,
+        ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'body'],
+    )
+    return len(notifications)
@@ -0,0 +1,74 @@
+import logging
+
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class SMSError(Exception):
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class BaseSMSBackend:
+    """
+    An SMS backend sends one text message per `send` call and raises SMSError
+    on failure. One instance is used for a whole batch, so backends may hold
+    on to connections between sends.
+    """
+    def send(self, to, body):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ConsoleSMSBackend(BaseSMSBackend):
+    """Logs messages instead of sending them, for development."""
+
+    def send(self, to, body):
+        logger.info(f"SMS to {to}: {body}")
+
+
+class LocmemSMSBackend(BaseSMSBackend):
+    """Collects messages in `LocmemSMSBackend.outbox`, for tests."""
+    outbox = []
+
+    def send(self, to, body):
+        self.outbox.append({'to': to, 'body': body})
+
+
+class TwilioSMSBackend(BaseSMSBackend):
+    """
+    Sends through the Twilio Messages API using the TWILIO_* settings, over
+    one keep-alive session per batch.
+    """
+    api_url = "https://api.twilio.com/2010-04-01/Accounts/{sid}/Messages.json"
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.auth = (settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+
+    def send(self, to, body):
+        try:
+            response = self.session.post(
+                self.api_url.format(sid=settings.TWILIO_ACCOUNT_SID),
+                data={'To': to, 'From': settings.TWILIO_PHONE_NUMBER, 'Body': body},
+                timeout=(settings.SMS_CONNECT_TIMEOUT, settings.SMS_READ_TIMEOUT),
+            )
+        except requests.RequestException as e:
+            raise SMSError(f"Twilio request failed: {e}")
+
+        if response.status_code >= 400:
+            retryable = response.status_code == 429 or response.status_code >= 500
+            raise SMSError(f"Twilio returned {response.status_code}: {response.text[:200]}", retryable=retryable)
+
+    def close(self):
+        self.session.close()
+
+
+def get_sms_backend():
+    return import_string(settings.SMS_BACKEND)()
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import deque
+
+from config.metrics import (
+    BREAKER_CALLS,
+    BREAKER_FAILURES,
+    BREAKER_OPEN,
+    BREAKER_OPENED,
+    BREAKER_REJECTED,
+    UPSTREAM_CALL_DURATION,
+    UPSTREAM_LATENCY_BUCKETS,
+    record_upstream_time,
+)
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for an upstream dependency.
+
+    CLOSED: calls flow; once at least `min_calls` of the last `window` calls
+    have been seen and the failure ratio reaches `failure_rate`, it opens.
+    OPEN: calls are refused until `reset_timeout` seconds have passed.
+    HALF_OPEN: up to `half_open_max_calls` probes are let through; a success
+    closes the breaker, a failure re-opens it.
+
+    State is per process; counters are exposed through `stats()` and to
+    Prometheus (see config/metrics.py). Call latencies are also added to the
+    current request's metrics.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    LATENCY_BUCKETS = UPSTREAM_LATENCY_BUCKETS
+
+    def __init__(self, name, failure_rate=0.5, window=20, min_calls=5, reset_timeout=30, half_open_max_calls=1):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+        self.counters = {
+            'calls': 0,
+            'failures': 0,
+            'rejected': 0,
+            'opened': 0,
+        }
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(self.LATENCY_BUCKETS)
+        BREAKER_OPEN.labels(name).set(0)
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+            BREAKER_OPEN.labels(self.name).set(0)
+        return self._state
+
+    def retry_after(self):
+        """Seconds until an open breaker will let a probe through."""
+        with self._lock:
+            if self._current_state() != self.OPEN:
+                return 0.0
+            return max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+    def allow(self):
+        """
+        Returns True if a call may proceed; counts a rejection otherwise.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self.counters['rejected'] += 1
+            BREAKER_REJECTED.labels(self.name).inc()
+            return False
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.counters['opened'] += 1
+        BREAKER_OPENED.labels(self.name).inc()
+        BREAKER_OPEN.labels(self.name).set(1)
+
+    def _observe_latency(self, latency):
+        record_upstream_time(latency)
+        BREAKER_CALLS.labels(self.name).inc()
+        UPSTREAM_CALL_DURATION.labels(self.name).observe(latency)
+        self.latency_count += 1
+        self.latency_sum += latency
+        for i, bound in enumerate(self.LATENCY_BUCKETS):
+            if latency <= bound:
+                self.latency_buckets[i] += 1
+                break
+
+    def record_success(self, latency):
+        with self._lock:
+            self.counters['calls'] += 1
+            self._observe_latency(latency)
+            if self._current_state() == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self, latency):
+        with self._lock:
+            self.counters['calls'] += 1
+            self.counters['failures'] += 1
+            BREAKER_FAILURES.labels(self.name).inc()
+            self._observe_latency(latency)
+            if self._current_state() == self.HALF_OPEN:
+                self._trip()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._trip()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'state': self._current_state(),
+                **self.counters,
+                'latency_count': self.latency_count,
+                'latency_sum': self.latency_sum,
+                'latency_buckets': dict(zip(self.LATENCY_BUCKETS, self.latency_buckets)),
+            }
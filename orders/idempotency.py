@@ -0,0 +1,144 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method}:{request.path}:{body}".encode()).hexdigest()
+
+
+def _replay(record):
+    response = Response(record.response_body, status=record.status_code)
+    response[REPLAY_HEADER] = 'true'
+    return response
+
+
+def _claim(user, key, fingerprint):
+    """
+    Returns (record, owned). `owned` is True when this request must do the work.
+    """
+    record = IdempotencyKey.objects.filter(user_id=user.id, key=key).first()
+    if record is None:
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(user_id=user.id, key=key, request_fingerprint=fingerprint), True
+        except IntegrityError:
+            record = IdempotencyKey.objects.get(user_id=user.id, key=key)
+    return record, False
+
+
+def _take_over_if_stale(record):
+    """
+    Lets a retry take over a key whose first attempt died without finishing.
+    """
+    if record.locked_at > timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS):
+        return False
+    now = timezone.now()
+    taken = IdempotencyKey.objects.filter(
+        pk=record.pk, status_code__isnull=True, locked_at=record.locked_at
+    ).update(locked_at=now)
+    record.locked_at = now
+    return bool(taken)
+
+
+def _wait_for_result(record):
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while record.status_code is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+        record.refresh_from_db(fields=['status_code', 'response_body', 'locked_at'])
+    return record
+
+
+def idempotent(view_method):
+    """
+    Makes a DRF view method honour the `Idempotency-Key` request header.
+
+    The first request with a key runs the view and stores its response; later
+    requests with the same key get that response back from one indexed lookup.
+    A duplicate that arrives while the first is still running waits for its
+    result rather than repeating the work. Server errors are not stored, so
+    the client may retry them. Keys are kept for IDEMPOTENCY_KEY_TTL_SECONDS
+    (see `manage.py prune_idempotency_keys`).
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            return Response({"error": f"{HEADER} is too long"}, status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = request_fingerprint(request)
+        record, owned = _claim(request.user, key, fingerprint)
+
+        if not owned:
+            if record.request_fingerprint != fingerprint:
+                return Response(
+                    {"error": f"{HEADER} was already used for a different request"},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if record.status_code is None:
+                record = _wait_for_result(record)
+            if record.status_code is not None:
+                return _replay(record)
+            if not _take_over_if_stale(record):
+                return Response(
+                    {"error": "A request with this Idempotency-Key is still in progress"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+        try:
+            # The stored response commits together with the view's writes, so a
+            # crash in between cannot leave an order behind a retryable key
+            with transaction.atomic():
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code < 500:
+                    record.status_code = response.status_code
+                    record.response_body = response.data
+                    record.save(update_fields=['status_code', 'response_body'])
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+        return response
+
+    return wrapper
+
+
+def prune_expired_keys(batch_size=None):
+    """
+    Deletes idempotency keys older than IDEMPOTENCY_KEY_TTL_SECONDS,
+    `batch_size` rows per transaction, walking the primary key. Returns the
+    number of keys deleted.
+    """
+    batch_size = batch_size or settings.IDEMPOTENCY_PRUNE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+    deleted = 0
+    last_id = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects
+            .filter(id__gt=last_id, created_at__lte=cutoff)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        last_id = ids[-1]
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.outbox import process_due_submissions
+from orders.qikink import get_client
+
+
+class Command(BaseCommand):
+    help = "Submits pending orders from the outbox to Qikink, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process a single batch and exit.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Maximum orders to claim per batch.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to sleep when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_due_submissions(batch_size=options['batch_size'])
+            if processed:
+                self.stdout.write(f"Processed {processed} order submission(s)")
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"Qikink breaker: {get_client().breaker.stats()}")
+
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
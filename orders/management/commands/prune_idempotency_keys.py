@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.idempotency import prune_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Deletes Idempotency-Key records older than IDEMPOTENCY_KEY_TTL_SECONDS in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run a single pass and exit.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Rows deleted per transaction.")
+        parser.add_argument('--interval', type=float, default=3600, help="Seconds between passes.")
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = prune_expired_keys(batch_size=options['batch_size'])
+            self.stdout.write(f"Pruned {deleted} expired idempotency key(s)")
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
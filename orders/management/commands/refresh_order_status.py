@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.tracking import refresh_open_orders
+
+
+class Command(BaseCommand):
+    help = "Polls Qikink for the status of open orders and records any changes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run a single pass and exit.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Orders fetched per batch.")
+        parser.add_argument('--concurrency', type=int, default=None, help="Maximum concurrent status requests.")
+        parser.add_argument('--interval', type=float, default=300, help="Seconds between passes.")
+
+    def handle(self, *args, **options):
+        while True:
+            updated = refresh_open_orders(batch_size=options['batch_size'], concurrency=options['concurrency'])
+            self.stdout.write(f"Refreshed status of {updated} order(s)")
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -1,22 +1,144 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from products.models import Product
 
 class Order(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SUBMITTED = 'submitted', 'Submitted'
+        FAILED = 'failed', 'Failed'
+        PROCESSING = 'processing', 'Processing'
+        SHIPPED = 'shipped', 'Shipped'
+        DELIVERED = 'delivered', 'Delivered'
+        CANCELLED = 'cancelled', 'Cancelled'
+        RETURNED = 'returned', 'Returned'
+
+    # Accepted by Qikink and not yet in a final state; these are polled for updates
+    OPEN_STATUSES = (Status.SUBMITTED, Status.PROCESSING, Status.SHIPPED)
+    FINAL_STATUSES = (Status.DELIVERED, Status.CANCELLED, Status.RETURNED)
+    # Fulfilment progress; provider updates never move an order back down it
+    STATUS_RANKS = {
+        Status.PENDING: 0,
+        Status.FAILED: 0,
+        Status.SUBMITTED: 1,
+        Status.PROCESSING: 2,
+        Status.SHIPPED: 3,
+        Status.DELIVERED: 4,
+        Status.CANCELLED: 4,
+        Status.RETURNED: 4,
+    }
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='orders')
     order_number = models.CharField(max_length=50, unique=True)
     total_order_value = models.DecimalField(max_digits=10, decimal_places=2)
     tracking_url = models.URLField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    status_updated_at = models.DateTimeField(blank=True, null=True)
+    status_checked_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['status', 'status_checked_at']),
+        ]
+
     def __str__(self):
         return f"Order {self.order_number} by {self.user.email}"
 
 
 class OrderItem(models.Model):
+    """
+    A purchased line. Product details are copied at checkout so order reads never
+    join the live catalog and later product edits or deletions leave it intact.
+    """
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
-    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True, related_name='order_items')
+    sku = models.CharField(max_length=100)
+    name = models.CharField(max_length=255)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    image_url = models.URLField(max_length=500, blank=True, null=True)
+    category_name = models.CharField(max_length=100, blank=True, default='')
+    subcategory_name = models.CharField(max_length=100, blank=True, default='')
     quantity = models.PositiveIntegerField()
 
     def __str__(self):
-        return f"{self.quantity} x {self.product.name}"
+        return f"{self.quantity} x {self.name}"
+
+    @classmethod
+    def from_product(cls, order, product, quantity):
+        """
+        Builds an unsaved line with `product`'s current sku, name, price, first
+        image and category names. Uses `product.images`, `product.category` and
+        `product.subcategory` as prefetched, if they were.
+        """
+        image = next((image.image_url for image in product.images.all() if image.image_url), None)
+        return cls(
+            order=order,
+            product=product,
+            sku=product.sku,
+            name=product.name,
+            unit_price=product.price_with_shipping,
+            image_url=image,
+            category_name=product.category.name if product.category else '',
+            subcategory_name=product.subcategory.name if product.subcategory else '',
+            quantity=quantity,
+        )
+
+
+class OrderNumberSequence(models.Model):
+    """
+    Counter from which workers reserve blocks of order numbers.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} (next {self.next_value})"
+
+
+class OrderSubmission(models.Model):
+    """
+    Outbox entry holding the Qikink payload for an order until it has been submitted.
+    """
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='submission')
+    payload = models.JSONField()
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    completed_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['completed_at', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"Submission for order {self.order.order_number}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a request made with an `Idempotency-Key` header.
+    `status_code` stays empty while the first attempt is still running.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    request_fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(blank=True, null=True)
+    response_body = models.JSONField(blank=True, null=True)
+    locked_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} for {self.user_id}"
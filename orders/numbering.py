@@ -0,0 +1,91 @@
+import os
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+
+from .models import OrderNumberSequence
+
+SEQUENCE_NAME = 'order_number'
+
+_lock = threading.Lock()
+_block = {'id': None, 'pid': None, 'next': 0, 'end': 0, 'committed': False}
+
+
+def _reserve_block(size):
+    """
+    Atomically advances the counter by `size` and returns the reserved range
+    as (start, end). Each call is one short write transaction, so workers only
+    contend on the counter row once per block rather than once per order.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {OrderNumberSequence._meta.db_table} "
+                "SET next_value = next_value + %s WHERE name = %s RETURNING next_value",
+                [size, SEQUENCE_NAME],
+            )
+            row = cursor.fetchone()
+        if row is not None:
+            return row[0] - size, row[0]
+
+    while True:
+        try:
+            with transaction.atomic():
+                # Write first: on SQLite this takes the write lock up front instead
+                # of upgrading a read lock, which would fail fast under contention
+                updated = OrderNumberSequence.objects.filter(name=SEQUENCE_NAME).update(
+                    next_value=F('next_value') + size
+                )
+                if not updated:
+                    OrderNumberSequence.objects.create(name=SEQUENCE_NAME, next_value=1 + size)
+                end = OrderNumberSequence.objects.filter(name=SEQUENCE_NAME).values_list('next_value', flat=True).get()
+            return end - size, end
+        except IntegrityError:
+            # Another worker created the counter first; reserve from it
+            continue
+
+
+def _mark_committed(block_id):
+    with _lock:
+        if _block['id'] is block_id:
+            _block['committed'] = True
+
+
+def next_order_number():
+    """
+    Returns a new unique order number such as ``SKY00000042``.
+
+    Numbers come from a block reserved for this process, so most calls touch
+    no database at all. Blocks are dropped after a fork. Numbers left in a
+    block when a process exits are skipped, never reused.
+
+    A block reserved inside a transaction is only reused once that
+    transaction commits. If it rolls back, the counter forgets the block and
+    another worker may reserve the same range, so the next call here reserves
+    a fresh one instead.
+    """
+    reserved = None
+    with _lock:
+        pid = os.getpid()
+        if _block['pid'] != pid or not _block['committed'] or _block['next'] >= _block['end']:
+            start, end = _reserve_block(settings.ORDER_NUMBER_BLOCK_SIZE)
+            reserved = object()
+            _block.update(id=reserved, pid=pid, next=start, end=end, committed=False)
+        value = _block['next']
+        _block['next'] += 1
+
+    if reserved is not None:
+        # Runs straight away in autocommit mode
+        transaction.on_commit(lambda: _mark_committed(reserved))
+
+    return f"{settings.ORDER_NUMBER_PREFIX}{value:0{settings.ORDER_NUMBER_WIDTH}d}"
+
+
+def reset():
+    """
+    Forgets this process's reserved block.
+    """
+    with _lock:
+        _block.update(id=None, pid=None, next=0, end=0, committed=False)
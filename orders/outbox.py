@@ -0,0 +1,128 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import URLField, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import qikink
+from .models import Order, OrderSubmission
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_submission(order, payload):
+    """
+    Records the Qikink payload for `order` so the outbox worker can submit it.
+    Call inside the transaction that creates the order.
+    """
+    return OrderSubmission.objects.create(order=order, payload=payload)
+
+
+def backoff_delay(attempts):
+    """
+    Exponential backoff for the given number of failed attempts, capped.
+    """
+    delay = settings.ORDER_OUTBOX_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, settings.ORDER_OUTBOX_BACKOFF_MAX_SECONDS))
+
+
+def claim_due_submissions(batch_size=None, now=None):
+    """
+    Leases up to `batch_size` due submissions to this worker.
+
+    A submission is claimed by pushing its `next_attempt_at` forward with a
+    conditional update, so concurrent workers never send the same order twice.
+    If a worker dies mid-send the lease expires and the row becomes due again.
+    """
+    batch_size = batch_size or settings.ORDER_OUTBOX_BATCH_SIZE
+    now = now or timezone.now()
+    lease_until = now + timedelta(seconds=settings.ORDER_OUTBOX_LEASE_SECONDS)
+
+    candidates = (
+        OrderSubmission.objects
+        .filter(completed_at__isnull=True, next_attempt_at__lte=now)
+        .order_by('next_attempt_at')
+        .values_list('pk', 'next_attempt_at')[:batch_size]
+    )
+
+    claimed = []
+    for pk, next_attempt_at in candidates:
+        updated = OrderSubmission.objects.filter(
+            pk=pk, next_attempt_at=next_attempt_at, completed_at__isnull=True
+        ).update(next_attempt_at=lease_until)
+        if updated:
+            claimed.append(pk)
+
+    return list(OrderSubmission.objects.filter(pk__in=claimed).select_related('order'))
+
+
+def submit(submission):
+    """
+    Sends one claimed submission to Qikink and records the outcome.
+    Returns True if the order was accepted.
+    """
+    order = submission.order
+    now = timezone.now()
+
+    try:
+        data = qikink.create_order(submission.payload)
+    except qikink.CircuitOpenError as e:
+        # Upstream is known to be down; park the order without using up an attempt
+        submission.next_attempt_at = now + timedelta(seconds=e.retry_after)
+        submission.save(update_fields=['next_attempt_at'])
+        return False
+    except qikink.QikinkError as e:
+        submission.attempts += 1
+        submission.last_error = str(e)
+
+        if not e.retryable or submission.attempts >= settings.ORDER_OUTBOX_MAX_ATTEMPTS:
+            logger.error(f"Giving up on order {order.order_number} after {submission.attempts} attempts: {e}")
+            with transaction.atomic():
+                submission.completed_at = now
+                submission.save(update_fields=['attempts', 'last_error', 'completed_at'])
+                order.status = Order.Status.FAILED
+                order.status_updated_at = now
+                order.save(update_fields=['status', 'status_updated_at'])
+        else:
+            submission.next_attempt_at = now + backoff_delay(submission.attempts)
+            logger.warning(
+                f"Order {order.order_number} submission failed (attempt {submission.attempts}), "
+                f"retrying at {submission.next_attempt_at}: {e}"
+            )
+            submission.save(update_fields=['attempts', 'last_error', 'next_attempt_at'])
+        return False
+
+    with transaction.atomic():
+        submission.attempts += 1
+        submission.last_error = ''
+        submission.completed_at = now
+        submission.save(update_fields=['attempts', 'last_error', 'completed_at'])
+        # A status webhook may already have moved the order on; never move it back
+        # or drop the tracking URL it stored
+        Order.objects.filter(
+            pk=order.pk, status__in=[Order.Status.PENDING, Order.Status.FAILED]
+        ).update(
+            status=Order.Status.SUBMITTED,
+            status_updated_at=now,
+            tracking_url=Coalesce('tracking_url', Value(data.get("tracking_url"), output_field=URLField())),
+        )
+
+    logger.info(f"Order {order.order_number} submitted to Qikink")
+    return True
+
+
+def process_due_submissions(batch_size=None):
+    """
+    Claims and submits one batch of due orders. Returns the number processed.
+    """
+    submissions = claim_due_submissions(batch_size=batch_size)
+    for submission in submissions:
+        try:
+            submit(submission)
+        except Exception:
+            # Leave it leased; it becomes due again once the lease expires
+            logger.exception(f"Unexpected error submitting order {submission.order.order_number}")
+    return len(submissions)
@@ -0,0 +1,382 @@
+import logging
+import threading
+import time
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+
+from .breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class QikinkError(Exception):
+    """
+    Raised when Qikink cannot accept an order.
+
+    `retryable` tells the outbox worker whether a later attempt may succeed.
+    """
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class CircuitOpenError(QikinkError):
+    """
+    Raised without calling Qikink while its circuit breaker is open.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"Qikink circuit is open; retry in {retry_after:.0f}s", retryable=True)
+        self.retry_after = retry_after
+
+
+class QikinkClient:
+    """
+    Qikink API client sharing one pooled keep-alive session per process.
+
+    The access token is cached with its expiry and refreshed shortly before it
+    lapses. Refreshes are single-flight: a thread lock covers this process and a
+    cache lock covers other workers, which keep using the current token (or wait
+    briefly for the new one) instead of all hitting the token endpoint at once.
+
+    API calls go through a circuit breaker and each shares one latency budget
+    (`QIKINK_CALL_BUDGET`) across token refresh, submission and retry, so a
+    degraded upstream is failed fast instead of holding the caller.
+    """
+
+    TOKEN_CACHE_KEY = 'qikink_access_token'
+    TOKEN_LOCK_KEY = 'qikink_access_token_lock'
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.QIKINK_POOL_SIZE,
+            max_retries=0,
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._refresh_lock = threading.Lock()
+        self.breaker = CircuitBreaker(
+            'qikink',
+            failure_rate=settings.QIKINK_BREAKER_FAILURE_RATE,
+            window=settings.QIKINK_BREAKER_WINDOW,
+            min_calls=settings.QIKINK_BREAKER_MIN_CALLS,
+            reset_timeout=settings.QIKINK_BREAKER_RESET_TIMEOUT,
+        )
+
+    @property
+    def base_url(self):
+        return settings.QIKINK_BASE_URL
+
+    def new_deadline(self):
+        return time.monotonic() + settings.QIKINK_CALL_BUDGET
+
+    def timeout(self, deadline):
+        """
+        Connect/read timeouts for one request, clipped to what is left of `deadline`.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise QikinkError("Qikink call budget exhausted", retryable=True)
+        return (min(settings.QIKINK_CONNECT_TIMEOUT, remaining), min(settings.QIKINK_READ_TIMEOUT, remaining))
+
+    def _is_fresh(self, entry):
+        return entry is not None and entry['expires_at'] - settings.QIKINK_TOKEN_REFRESH_MARGIN > time.time()
+
+    def _is_usable(self, entry):
+        return entry is not None and entry['expires_at'] > time.time()
+
+    def _request_token(self, deadline):
+        payload = {
+            'ClientId': settings.QIKINK_CLIENT_ID,
+            'client_secret': settings.QIKINK_CLIENT_SECRET,
+        }
+        response = self.session.post(f"{self.base_url}/api/token", data=payload, timeout=self.timeout(deadline))
+        response.raise_for_status()
+        response_data = response.json()
+        access_token = response_data.get('Accesstoken')
+        if not access_token:
+            raise QikinkError("Access token not found in the response")
+
+        ttl = int(response_data.get('expires_in') or settings.QIKINK_TOKEN_TTL)
+        entry = {'token': access_token, 'expires_at': time.time() + ttl}
+        cache.set(self.TOKEN_CACHE_KEY, entry, timeout=ttl)
+        return entry
+
+    def _wait_for_refresh(self, deadline):
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(self.TOKEN_CACHE_KEY)
+            if self._is_fresh(entry):
+                return entry
+            if cache.get(self.TOKEN_LOCK_KEY) is None:
+                break
+        return None
+
+    def _refresh_token(self, stale, deadline, rejected=False):
+        with self._refresh_lock:
+            entry = cache.get(self.TOKEN_CACHE_KEY)
+            if self._is_fresh(entry) and (stale is None or entry['token'] != stale['token']):
+                return entry
+
+            lock_timeout = int(settings.QIKINK_CONNECT_TIMEOUT + settings.QIKINK_READ_TIMEOUT) + 1
+            acquired = cache.add(self.TOKEN_LOCK_KEY, True, timeout=lock_timeout)
+            if not acquired:
+                # Another worker is refreshing; the current token is still good
+                if not rejected and self._is_usable(stale):
+                    return stale
+                entry = self._wait_for_refresh(deadline)
+                if entry is not None:
+                    return entry
+
+            try:
+                return self._request_token(deadline)
+            finally:
+                if acquired:
+                    cache.delete(self.TOKEN_LOCK_KEY)
+
+    def get_access_token(self, rejected_token=None, deadline=None):
+        """
+        Returns a valid access token, refreshing it if it is missing, about to
+        expire, or is `rejected_token` (one the API has just refused).
+        """
+        entry = cache.get(self.TOKEN_CACHE_KEY)
+        rejected = entry is not None and entry['token'] == rejected_token
+        if self._is_fresh(entry) and not rejected:
+            return entry['token']
+
+        try:
+            return self._refresh_token(stale=entry, deadline=deadline or self.new_deadline(), rejected=rejected)['token']
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error occurred while requesting the access token: {e}")
+            if not rejected and self._is_usable(entry):
+                return entry['token']
+            raise QikinkError(f"Failed to retrieve access token: {e}") from e
+
+    def _send(self, method, path, access_token, deadline, **kwargs):
+        headers = {
+            "ClientId": settings.QIKINK_CLIENT_ID,
+            "Accesstoken": access_token,
+        }
+        return self.session.request(
+            method,
+            f"{self.base_url}{path}",
+            headers=headers,
+            timeout=self.timeout(deadline),
+            **kwargs,
+        )
+
+    def _request(self, method, path, deadline, action, **kwargs):
+        """
+        Makes an authenticated request and returns the decoded JSON body,
+        translating transport and HTTP errors into QikinkError.
+        """
+        try:
+            access_token = self.get_access_token(deadline=deadline)
+            response = self._send(method, path, access_token, deadline, **kwargs)
+            if response.status_code == 401:
+                # Token revoked or expired early; refresh once and retry
+                access_token = self.get_access_token(rejected_token=access_token, deadline=deadline)
+                response = self._send(method, path, access_token, deadline, **kwargs)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.JSONDecodeError as e:
+            # A 2xx that is not JSON, such as a proxy's maintenance page
+            logger.error(f"API Error Response: {response.text}")
+            raise QikinkError(f"Failed to {action}: response is not JSON", retryable=True) from e
+        except requests.exceptions.RequestException as e:
+            if e.response is not None:
+                logger.error(f"API Error Response: {e.response.text}")
+                # Client errors other than auth/rate limiting will not fix themselves
+                status_code = e.response.status_code
+                retryable = status_code >= 500 or status_code in (401, 408, 429)
+            else:
+                retryable = True
+            raise QikinkError(f"Failed to {action}: {e}", retryable=retryable) from e
+
+    def _guarded(self, call, deadline):
+        """
+        Runs `call(deadline)` through the circuit breaker.
+        Raises CircuitOpenError without any network I/O while the breaker is open.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.retry_after())
+
+        started = time.monotonic()
+        try:
+            data = call(deadline or self.new_deadline())
+        except QikinkError as e:
+            # Rejected requests mean the upstream is up; only outages count against it
+            if e.retryable:
+                self.breaker.record_failure(time.monotonic() - started)
+            else:
+                self.breaker.record_success(time.monotonic() - started)
+            raise
+        except Exception:
+            # Anything unexpected still settles a half-open probe
+            self.breaker.record_failure(time.monotonic() - started)
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        return data
+
+    def create_order(self, payload, deadline=None):
+        """
+        Submits an order payload to Qikink and returns the decoded response.
+        """
+        def call(deadline):
+            data = self._request('POST', '/api/order/create', deadline, "place order", json=payload)
+            if not isinstance(data, dict) or data.get("message") != "Order created successfully":
+                raise QikinkError(f"Order placement failed: {data}", retryable=False)
+            return data
+
+        return self._guarded(call, deadline)
+
+    def get_order_status(self, order_number, deadline=None):
+        """
+        Fetches the current fulfilment record for `order_number`.
+        """
+        def call(deadline):
+            data = self._request('GET', '/api/order', deadline, "fetch order status", params={'order_number': order_number})
+            # The API answers with a list of matching orders
+            if isinstance(data, list):
+                data = data[0] if data else {}
+            return data
+
+        return self._guarded(call, deadline)
+
+
+class AsyncQikinkClient:
+    """
+    asyncio counterpart of QikinkClient, for fanning many calls out from a
+    single thread over one pooled httpx connection pool.
+
+    It shares the sync client's cached access token and circuit breaker; the
+    rare token refresh is delegated to the sync client in a worker thread so
+    refreshes stay single-flight across both. Use as an async context manager.
+    """
+
+    def __init__(self, client=None):
+        self.sync_client = client or get_client()
+        self.breaker = self.sync_client.breaker
+        limits = httpx.Limits(
+            max_connections=settings.QIKINK_POOL_SIZE,
+            max_keepalive_connections=settings.QIKINK_POOL_SIZE,
+        )
+        self.http = httpx.AsyncClient(limits=limits)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.http.aclose()
+
+    def timeout(self, deadline):
+        connect, read = self.sync_client.timeout(deadline)
+        return httpx.Timeout(read, connect=connect)
+
+    async def get_access_token(self, rejected_token=None, deadline=None):
+        entry = await cache.aget(QikinkClient.TOKEN_CACHE_KEY)
+        if self.sync_client._is_fresh(entry) and entry['token'] != rejected_token:
+            return entry['token']
+        return await sync_to_async(self.sync_client.get_access_token, thread_sensitive=False)(
+            rejected_token=rejected_token, deadline=deadline
+        )
+
+    async def _send(self, method, path, access_token, deadline, **kwargs):
+        headers = {
+            "ClientId": settings.QIKINK_CLIENT_ID,
+            "Accesstoken": access_token,
+        }
+        return await self.http.request(
+            method,
+            f"{self.sync_client.base_url}{path}",
+            headers=headers,
+            timeout=self.timeout(deadline),
+            **kwargs,
+        )
+
+    async def _request(self, method, path, deadline, action, **kwargs):
+        try:
+            access_token = await self.get_access_token(deadline=deadline)
+            response = await self._send(method, path, access_token, deadline, **kwargs)
+            if response.status_code == 401:
+                access_token = await self.get_access_token(rejected_token=access_token, deadline=deadline)
+                response = await self._send(method, path, access_token, deadline, **kwargs)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"API Error Response: {e.response.text}")
+            status_code = e.response.status_code
+            retryable = status_code >= 500 or status_code in (401, 408, 429)
+            raise QikinkError(f"Failed to {action}: {e}", retryable=retryable) from e
+        except httpx.HTTPError as e:
+            raise QikinkError(f"Failed to {action}: {e}", retryable=True) from e
+        except ValueError as e:
+            logger.error(f"API Error Response: {response.text}")
+            raise QikinkError(f"Failed to {action}: response is not JSON", retryable=True) from e
+
+    async def _guarded(self, call, deadline):
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.retry_after())
+
+        started = time.monotonic()
+        try:
+            data = await call(deadline or self.sync_client.new_deadline())
+        except QikinkError as e:
+            if e.retryable:
+                self.breaker.record_failure(time.monotonic() - started)
+            else:
+                self.breaker.record_success(time.monotonic() - started)
+            raise
+        except Exception:
+            self.breaker.record_failure(time.monotonic() - started)
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        return data
+
+    async def get_order_status(self, order_number, deadline=None):
+        """
+        Fetches the current fulfilment record for `order_number`.
+        """
+        async def call(deadline):
+            data = await self._request('GET', '/api/order', deadline, "fetch order status", params={'order_number': order_number})
+            if isinstance(data, list):
+                data = data[0] if data else {}
+            return data
+
+        return await self._guarded(call, deadline)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Returns this process's shared QikinkClient.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = QikinkClient()
+    return _client
+
+
+def get_access_token():
+    return get_client().get_access_token()
+
+
+def create_order(payload):
+    return get_client().create_order(payload)
+
+
+def get_order_status(order_number):
+    return get_client().get_order_status(order_number)
@@ -1,13 +1,13 @@
 from rest_framework import serializers
 from .models import Order, OrderItem
-from products.serializers import ProductSerializer
 
 class OrderItemSerializer(serializers.ModelSerializer):
-    product = ProductSerializer()
-
+    """
+    Serializes the line as purchased, from its own snapshot columns.
+    """
     class Meta:
         model = OrderItem
-        fields = ('product', 'quantity')
+        fields = ('product', 'sku', 'name', 'unit_price', 'image_url', 'quantity')
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -15,4 +15,4 @@ class OrderSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Order
-        fields = ('order_number', 'total_order_value', 'tracking_url', 'created_at', 'items')
+        fields = ('order_number', 'total_order_value', 'status', 'tracking_url', 'created_at', 'items')
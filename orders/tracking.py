@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import qikink
+from .models import Order
+
+logger = logging.getLogger(__name__)
+
+# Fulfilment provider status names mapped onto Order.Status
+PROVIDER_STATUSES = {
+    'processing': Order.Status.PROCESSING,
+    'in production': Order.Status.PROCESSING,
+    'packed': Order.Status.PROCESSING,
+    'shipped': Order.Status.SHIPPED,
+    'dispatched': Order.Status.SHIPPED,
+    'in transit': Order.Status.SHIPPED,
+    'out for delivery': Order.Status.SHIPPED,
+    'delivered': Order.Status.DELIVERED,
+    'cancelled': Order.Status.CANCELLED,
+    'canceled': Order.Status.CANCELLED,
+    'rto': Order.Status.RETURNED,
+    'returned': Order.Status.RETURNED,
+}
+
+
+def normalize_status(value):
+    return PROVIDER_STATUSES.get(str(value or '').strip().lower().replace('_', ' '))
+
+
+def advances(current, status):
+    """
+    Whether an order in `current` status may take `status`: only forward
+    through Order.STATUS_RANKS, and never out of a final status.
+    """
+    if current in Order.FINAL_STATUSES:
+        return False
+    return Order.STATUS_RANKS[status] >= Order.STATUS_RANKS[current]
+
+
+def apply_status_updates(updates):
+    """
+    Applies provider status updates, each a dict with `order_number`, `status`
+    and optionally `tracking_url`, using one read and one bulk update per batch.
+
+    Updates arriving out of order cannot move an order backwards or reopen a
+    finished one; later entries for the same order win otherwise. Orders are
+    only written, and `status_updated_at` only bumped, when something changes.
+    Returns (applied, unknown) where `applied` counts the orders changed and
+    `unknown` lists order numbers with no matching order.
+    """
+    latest = {}
+    for update in updates:
+        order_number = str(update.get('order_number') or '')
+        status = normalize_status(update.get('status'))
+        if not (order_number and status):
+            continue
+        previous = latest.get(order_number)
+        if previous is None or advances(previous[0], status):
+            latest[order_number] = (status, update.get('tracking_url'))
+
+    if not latest:
+        return 0, []
+
+    now = timezone.now()
+    changed = []
+    found = set()
+    # Lock the rows until the update lands, so an overlapping batch (webhook and
+    # poller) cannot write an older status over the one read here
+    with transaction.atomic():
+        orders = (
+            Order.objects.select_for_update()
+            .filter(order_number__in=latest)
+            .order_by('id')
+            .only('id', 'order_number', 'status', 'tracking_url')
+        )
+        for order in orders:
+            found.add(order.order_number)
+            status, tracking_url = latest[order.order_number]
+            tracking_url = tracking_url or order.tracking_url
+            if not advances(order.status, status):
+                continue
+            if status == order.status and tracking_url == order.tracking_url:
+                continue
+            order.status = status
+            order.tracking_url = tracking_url
+            order.status_updated_at = now
+            changed.append(order)
+
+        Order.objects.bulk_update(changed, ['status', 'tracking_url', 'status_updated_at'], batch_size=500)
+    return len(changed), sorted(set(latest) - found)
+
+
+async def _fetch_status(client, semaphore, order_number):
+    async with semaphore:
+        try:
+            data = await client.get_order_status(order_number)
+        except qikink.QikinkError as e:
+            logger.warning(f"Could not refresh status of order {order_number}: {e}")
+            return None
+    if not isinstance(data, dict):
+        logger.warning(f"Could not refresh status of order {order_number}: unexpected reply {data!r:.200}")
+        return None
+    return {
+        'order_number': order_number,
+        'status': data.get('status'),
+        'tracking_url': data.get('tracking_url'),
+    }
+
+
+async def arefresh_open_orders(batch_size=None, concurrency=None):
+    """
+    Polls the provider for orders still in flight that have not been checked
+    recently, `batch_size` orders at a time with at most `concurrency` requests
+    outstanding, and applies the results batch by batch. Returns the number of
+    orders updated.
+
+    Requests are multiplexed on one event loop over the async Qikink client,
+    so concurrency costs sockets rather than threads.
+    """
+    batch_size = batch_size or settings.ORDER_STATUS_POLL_BATCH_SIZE
+    concurrency = concurrency or settings.ORDER_STATUS_POLL_CONCURRENCY
+    cutoff = timezone.now() - timedelta(seconds=settings.ORDER_STATUS_POLL_MIN_AGE)
+
+    due = Order.objects.filter(status__in=Order.OPEN_STATUSES).filter(
+        Q(status_checked_at__isnull=True) | Q(status_checked_at__lt=cutoff)
+    )
+
+    updated = 0
+    last_id = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    async with qikink.AsyncQikinkClient() as client:
+        while True:
+            batch = [
+                row async for row in
+                due.filter(id__gt=last_id).order_by('id').values_list('id', 'order_number')[:batch_size]
+            ]
+            if not batch:
+                break
+            last_id = batch[-1][0]
+
+            results = await asyncio.gather(
+                *(_fetch_status(client, semaphore, order_number) for _, order_number in batch)
+            )
+            applied, _ = await sync_to_async(apply_status_updates)([result for result in results if result])
+            updated += applied
+            # Unchanged orders wait ORDER_STATUS_POLL_MIN_AGE too before the next poll
+            await Order.objects.filter(
+                id__in=[order_id for (order_id, _), result in zip(batch, results) if result]
+            ).aupdate(status_checked_at=timezone.now())
+
+    return updated
+
+
+def refresh_open_orders(batch_size=None, concurrency=None):
+    return async_to_sync(arefresh_open_orders)(batch_size=batch_size, concurrency=concurrency)
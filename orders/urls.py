@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import PlaceOrderView, OrderHistoryView
+from .views import PlaceOrderView, OrderHistoryView, OrderStatusWebhookView
 
 urlpatterns = [
     path('place/', PlaceOrderView.as_view(), name='place-order'),
     path('history/', OrderHistoryView.as_view(), name='order-history'),
+    path('webhooks/status/', OrderStatusWebhookView.as_view(), name='order-status-webhook'),
 ]
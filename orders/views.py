@@ -1,79 +1,59 @@
-from django.db import models
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from .models import Order, OrderItem
+from .pagination import OrderHistoryPagination
 from .serializers import OrderSerializer
-from cart.models import Cart
+from cart.models import Cart, CartItem
 from products.models import Product  # Assuming Product model is defined in the products app
+from reports.aggregates import record_order_sales
+from .idempotency import idempotent
+from .numbering import next_order_number
+from .outbox import enqueue_submission
+from .tracking import apply_status_updates
 from django.conf import settings
-import requests
 import decimal
+import hashlib
+import hmac
 import logging
-from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
-# Utility to get access token from Qikink
-def get_access_token():
-    url = "https://sandbox.qikink.com/api/token"
-    client_id = "413721902814506"
-    client_secret = "51fcf1bc9e32215e9f2caec4d0231eb0beb6c164d28886edb7ccf7d531056ea5"
-
-    payload = {
-        'ClientId': client_id,
-        'client_secret': client_secret
-    }
-
-    try:
-        response = requests.post(url, data=payload)
-        response.raise_for_status()
-        response_data = response.json()
-        access_token = response_data.get('Accesstoken')
-
-        if access_token:
-            return access_token
-        else:
-            raise Exception("Access token not found in the response")
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error occurred while requesting the access token: {e}")
-        return None
-
-# Cache the access token
-def store_access_token():
-    access_token = get_access_token()
-    if access_token:
-        cache.set('qikink_access_token', access_token, timeout=3600)
-
 # API view to place an order
 class PlaceOrderView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request, *args, **kwargs):
         user = request.user
-        cart = Cart.objects.filter(user=user).first()
-        if not cart or not cart.items.exists():
+        cart = Cart.objects.filter(user_id=user.id).first()
+
+        # Snapshot the cart lines with their products once; everything below works off this list
+        cart_items = list(
+            cart.items.select_related('product__category', 'product__subcategory').prefetch_related('product__images')
+        ) if cart else []
+        if not cart_items:
             return Response({"error": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST)
 
         # Generate unique order number
-        order_number = 234
+        order_number = next_order_number()
 
         # Prepare line_items for API call
         line_items = []
-        for item in cart.items.all():
-            product = item.product  # Assuming `CartItem` has a ForeignKey to Product model
+        total_order_value = decimal.Decimal(0)
+        for item in cart_items:
+            line_total = item.get_total_price()
+            total_order_value += line_total
             line_items.append({
                 "search_from_my_products": 1,  # Set to 1 as we are searching by SKU
-                "sku": product.sku,  # SKU from Product model
+                "sku": item.product.sku,  # SKU from Product model
                 "quantity": str(item.quantity),
-                "price": str(float(item.get_total_price())),
+                "price": str(float(line_total)),
                 "designs": []  # Empty because we are using existing SKUs from My Products
             })
 
-        # Calculate total order value
-        total_order_value = sum(item.get_total_price() for item in cart.items.all())
-
         # Prepare payload for API
         payload = {
             "order_number": order_number,
@@ -102,60 +82,73 @@ class PlaceOrderView(APIView):
             }
         }
 
-        # Retrieve access token from cache or request a new one
-        access_token = cache.get('qikink_access_token') or get_access_token()
-        if not access_token:
-            return Response({"error": "Failed to retrieve access token"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        headers = {
-            "ClientId": "413721902814506",
-            "Accesstoken": access_token,
-        }
-
-        # Send order creation request to Qikink API
-        try:
-            logger.info(f"Payload: {payload}")
-            logger.info(f"Headers: {headers}")
-
-            response = requests.post("https://sandbox.qikink.com/api/order/create", json=payload, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("message") == "Order created successfully":
-                tracking_url = data.get("tracking_url")
-
-                # Create Order in the database
-                order = Order.objects.create(
-                    user=user,
-                    order_number=order_number,
-                    total_order_value=decimal.Decimal(total_order_value),
-                    tracking_url=tracking_url,
-                )
-                for item in cart.items.all():
-                    OrderItem.objects.create(order=order, product=item.product, quantity=item.quantity)
+        # Record the order locally; the outbox worker submits it to Qikink
+        with transaction.atomic():
+            order = Order.objects.create(
+                user_id=user.id,
+                order_number=order_number,
+                total_order_value=total_order_value,
+                status=Order.Status.PENDING,
+            )
+            order_items = OrderItem.objects.bulk_create([
+                OrderItem.from_product(order, item.product, item.quantity)
+                for item in cart_items
+            ])
+            record_order_sales(order, order_items)
+
+            enqueue_submission(order, payload)
+
+            # Clear the cart lines that were ordered; anything added meanwhile stays
+            CartItem.objects.filter(pk__in=[item.pk for item in cart_items]).delete()
+
+        logger.info(f"Order {order.order_number} queued for submission")
+        return Response(
+            {
+                "message": "Order placed successfully",
+                "order_number": order.order_number,
+                "status": order.status,
+                "tracking_url": order.tracking_url,
+            },
+            status=status.HTTP_201_CREATED,
+        )
 
-                # Clear the cart
-                cart.items.all().delete()
 
-                return Response({"message": "Order placed successfully", "tracking_url": tracking_url}, status=status.HTTP_201_CREATED)
+class OrderHistoryView(APIView):
+    permission_classes = [IsAuthenticated]
 
-            else:
-                logger.error(f"Order placement failed: {data}")
-                return Response({"error": "Order placement failed", "details": data}, status=status.HTTP_400_BAD_REQUEST)
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        # Line items carry their own product snapshot, so a page is two queries with no catalog joins
+        orders = Order.objects.filter(user_id=user.id).prefetch_related('items')
 
-        except requests.exceptions.RequestException as e:
-            if e.response is not None:
-                logger.error(f"API Error Response: {e.response.text}")
-            logger.error(f"Failed to place order: {e}")
-            return Response({"error": "Failed to place order", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        paginator = OrderHistoryPagination()
+        page = paginator.paginate_queryset(orders, request, view=self)
+        serializer = OrderSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
+class OrderStatusWebhookView(APIView):
+    """
+    Receives batched shipment status updates from the fulfilment provider.
 
-class OrderHistoryView(APIView):
-    permission_classes = [IsAuthenticated]
+    Expects `{"updates": [{"order_number", "status", "tracking_url"}, ...]}`
+    signed with an HMAC-SHA256 of the raw body in the `X-Qikink-Signature` header.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
 
-    def get(self, request, *args, **kwargs):
-        user = request.user
-        orders = Order.objects.filter(user=user).order_by('-created_at')
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def post(self, request, *args, **kwargs):
+        secret = settings.QIKINK_WEBHOOK_SECRET
+        signature = request.headers.get('X-Qikink-Signature', '')
+        expected = hmac.new(secret.encode(), request.body, hashlib.sha256).hexdigest()
+        if not secret or not hmac.compare_digest(signature, expected):
+            return Response({"error": "Invalid signature"}, status=status.HTTP_403_FORBIDDEN)
+
+        updates = request.data.get("updates") if isinstance(request.data, dict) else None
+        if not isinstance(updates, list):
+            return Response({"error": "Expected a list of updates"}, status=status.HTTP_400_BAD_REQUEST)
+
+        applied, unknown = apply_status_updates(update for update in updates if isinstance(update, dict))
+        if unknown:
+            logger.warning(f"Status updates for unknown orders: {unknown}")
+        return Response({"applied": applied, "unknown": unknown}, status=status.HTTP_200_OK)
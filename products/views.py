@@ -1,10 +1,13 @@
 import csv
-from django.shortcuts import get_object_or_404
+from adrf.views import APIView as AsyncAPIView
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.shortcuts import aget_object_or_404
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from config.routers import catalog_database
 from .models import Product, ProductImage, Category, SubCategory
 from .serializers import ProductSerializer
 
@@ -28,9 +31,32 @@ class ImportProductsView(APIView):
 
         return category_name.strip(), subcategory_name.strip(), product_title.strip()
 
+    def parse_row(self, row):
+        """
+        Returns the product fields for a CSV row, validated as the model would
+        on save. Raises for rows that cannot be imported.
+        """
+        category_name, subcategory_name, product_title = self.parse_product_name(row['Product Name'])
+        fields = {
+            'sku': row['SKU'],
+            'name': product_title,
+            'design': row.get('Design', ''),
+            'product_type': row.get('Product Type', ''),
+            'price_with_shipping': row['Product & Shipping (Inclusive GST)'],
+            'sizes': row.get('Sizes', ''),
+        }
+        for name, value in fields.items():
+            fields[name] = Product._meta.get_field(name).clean(value, None)
+        image_urls = [url.strip() for url in (row.get('Image URLs') or '').split(',') if url.strip()]
+        return category_name, subcategory_name, fields, image_urls
+
     def post(self, request, *args, **kwargs):
         """
         Handles CSV file upload and processes products.
+
+        Rows are validated first, then written with a fixed number of bulk
+        queries whatever the size of the file. A later row for the same SKU
+        overrides an earlier one, as it would when imported one by one.
         """
         csv_file = request.FILES.get('file')
         if not csv_file or not csv_file.name.endswith('.csv'):
@@ -39,104 +65,159 @@ class ImportProductsView(APIView):
         decoded_file = csv_file.read().decode('utf-8').splitlines()
         reader = csv.DictReader(decoded_file)
 
-        created_count = 0
+        rows = {}
+        image_urls = {}
         error_count = 0
-
         for row in reader:
             try:
-                category_name, subcategory_name, product_title = self.parse_product_name(row['Product Name'])
-
-                category, _ = Category.objects.get_or_create(name=category_name)
-                subcategory, _ = SubCategory.objects.get_or_create(name=subcategory_name, category=category)
-
-                # Create or update product
-                product, created = Product.objects.update_or_create(
-                    sku=row['SKU'],
-                    defaults={
-                        'name': product_title,
-                        'design': row.get('Design', ''),
-                        'product_type': row.get('Product Type', ''),
-                        'price_with_shipping': row['Product & Shipping (Inclusive GST)'],
-                        'sizes': row.get('Sizes', ''),
-                        'category': category,
-                        'subcategory': subcategory,
-                    }
-                )
-                
-                # Process and store image URLs
-                if 'Image URLs' in row and row['Image URLs']:
-                    image_urls = row['Image URLs'].split(',')
-                    for image_url in image_urls:
-                        ProductImage.objects.get_or_create(product=product, image_url=image_url.strip())
-
-                if created:
-                    created_count += 1
-
-            except Exception as e:
+                category_name, subcategory_name, fields, urls = self.parse_row(row)
+            except Exception:
                 error_count += 1
                 continue  # Skip problematic rows without stopping the process
+            rows[fields['sku']] = (category_name, subcategory_name, fields)
+            image_urls.setdefault(fields['sku'], []).extend(urls)
+
+        # Reads below must see this transaction's own writes, so none may go to the replica
+        with transaction.atomic():
+            categories = self.get_or_create_categories({category for category, _, _ in rows.values()})
+            # In file order, so the first row to use a new subcategory name decides its category
+            subcategories = self.get_or_create_subcategories(
+                list(dict.fromkeys((subcategory, category) for category, subcategory, _ in rows.values())), categories
+            )
+
+            existing = Product.objects.using(DEFAULT_DB_ALIAS).in_bulk(list(rows), field_name='sku')
+            created, updated = [], []
+            for sku, (category_name, subcategory_name, fields) in rows.items():
+                subcategory = subcategories.get(subcategory_name)
+                if subcategory is None or subcategory.category_id != categories[category_name].pk:
+                    # The subcategory name is taken by another category
+                    error_count += 1
+                    continue
+                product = existing.get(sku)
+                if product is None:
+                    product = Product()
+                    created.append(product)
+                else:
+                    updated.append(product)
+                for name, value in fields.items():
+                    setattr(product, name, value)
+                product.category = categories[category_name]
+                product.subcategory = subcategory
+
+            Product.objects.bulk_create(created)
+            for product in created:
+                product.product_id = f"PROD-{product.serial_number}"
+            Product.objects.bulk_update(created, ['product_id'])
+            Product.objects.bulk_update(
+                updated,
+                ['name', 'design', 'product_type', 'price_with_shipping', 'sizes', 'category', 'subcategory'],
+            )
+
+            # Store image URLs the products do not have yet
+            products = created + updated
+            stored = set(
+                ProductImage.objects.using(DEFAULT_DB_ALIAS)
+                .filter(product__in=products)
+                .values_list('product_id', 'image_url')
+            )
+            new_images = {}
+            for product in products:
+                for image_url in image_urls[product.sku]:
+                    if (product.pk, image_url) not in stored:
+                        new_images[(product.pk, image_url)] = ProductImage(product=product, image_url=image_url)
+            ProductImage.objects.bulk_create(new_images.values())
 
         return Response(
             {
-                "success": f"{created_count} products imported successfully",
+                "success": f"{len(created)} products imported successfully",
                 "errors": f"{error_count} products had errors and were skipped"
             },
             status=status.HTTP_201_CREATED
         )
 
+    def get_or_create_categories(self, names):
+        Category.objects.bulk_create([Category(name=name) for name in names], ignore_conflicts=True)
+        return {
+            category.name: category
+            for category in Category.objects.using(DEFAULT_DB_ALIAS).filter(name__in=names)
+        }
+
+    def get_or_create_subcategories(self, pairs, categories):
+        SubCategory.objects.bulk_create(
+            [SubCategory(name=name, category=categories[category]) for name, category in pairs],
+            ignore_conflicts=True,
+        )
+        return {
+            subcategory.name: subcategory
+            for subcategory in SubCategory.objects.using(DEFAULT_DB_ALIAS).filter(name__in={name for name, _ in pairs})
+        }
+
 
-class ListProductsView(APIView):
+def catalog_queryset():
+    """
+    Products with everything ProductSerializer reads, loaded up front so
+    serializing them never touches the database again. Read from the
+    replica when one is configured.
+    """
+    return Product.objects.using(catalog_database()).select_related('category', 'subcategory').prefetch_related('images')
+
+
+async def serialize_products(queryset, request):
+    products = [product async for product in queryset]
+    return ProductSerializer(products, many=True, context={'request': request}).data
+
+
+class ListProductsView(AsyncAPIView):
     """
     API View to list all visible products.
     """
     permission_classes = [AllowAny]
 
-    def get(self, request, *args, **kwargs):
-        products = Product.objects.filter(is_visible=True)
-        serializer = ProductSerializer(products, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    async def get(self, request, *args, **kwargs):
+        products = catalog_queryset().filter(is_visible=True)
+        return Response(await serialize_products(products, request), status=status.HTTP_200_OK)
 
 
-class CategoryProductsView(APIView):
+class CategoryProductsView(AsyncAPIView):
     """
     API View to retrieve all products under a specific category.
     """
     permission_classes = [AllowAny]
 
-    def get(self, request, category_name, *args, **kwargs):
-        category = get_object_or_404(Category, name__iexact=category_name)
-        products = Product.objects.filter(category=category, is_visible=True)
-        serializer = ProductSerializer(products, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    async def get(self, request, category_name, *args, **kwargs):
+        category = await aget_object_or_404(Category.objects.using(catalog_database()), name__iexact=category_name)
+        products = catalog_queryset().filter(category=category, is_visible=True)
+        return Response(await serialize_products(products, request), status=status.HTTP_200_OK)
 
 
-class SubCategoryProductsView(APIView):
+class SubCategoryProductsView(AsyncAPIView):
     """
     API View to retrieve all products under a specific subcategory.
     """
     permission_classes = [AllowAny]
 
-    def get(self, request, category_name, subcategory_name, *args, **kwargs):
-        category = get_object_or_404(Category, name__iexact=category_name)
-        subcategory = get_object_or_404(SubCategory, name__iexact=subcategory_name, category=category)
-        products = Product.objects.filter(subcategory=subcategory, is_visible=True)
-        serializer = ProductSerializer(products, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    async def get(self, request, category_name, subcategory_name, *args, **kwargs):
+        category = await aget_object_or_404(Category.objects.using(catalog_database()), name__iexact=category_name)
+        subcategory = await aget_object_or_404(
+            SubCategory.objects.using(catalog_database()), name__iexact=subcategory_name, category=category
+        )
+        products = catalog_queryset().filter(subcategory=subcategory, is_visible=True)
+        return Response(await serialize_products(products, request), status=status.HTTP_200_OK)
 
 
-class RelatedProductsView(APIView):
+class RelatedProductsView(AsyncAPIView):
     """
     API View to retrieve related products based on a given product ID.
     """
     permission_classes = [AllowAny]
 
-    def get(self, request, product_id, *args, **kwargs):
+    async def get(self, request, product_id, *args, **kwargs):
         # Fetch the product using `serial_number` instead of `id`
-        product = get_object_or_404(Product, serial_number=product_id)
+        product = await aget_object_or_404(Product.objects.using(catalog_database()), serial_number=product_id)
 
-        related_products = Product.objects.filter(
-            category=product.category,
-            subcategory=product.subcategory
+        related_products = catalog_queryset().filter(
+            category_id=product.category_id,
+            subcategory_id=product.subcategory_id
         ).exclude(serial_number=product_id)  # Exclude the current product
 
         # Apply additional filters for closer matches
@@ -150,6 +231,4 @@ class RelatedProductsView(APIView):
         # Limit to 10 related products
         related_products = related_products[:10]
 
-        serializer = ProductSerializer(related_products, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
+        return Response(await serialize_products(related_products, request), status=status.HTTP_200_OK)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import DailySales
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    list_display = ('day', 'dimension', 'key', 'revenue', 'units', 'orders')
+    list_filter = ('dimension', 'day')
+    search_fields = ('key',)
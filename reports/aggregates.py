@@ -0,0 +1,103 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models import OrderItem
+from .models import DailySales
+
+UNCATEGORIZED = 'Uncategorized'
+
+# Dimension -> OrderItem snapshot column it is keyed on
+DIMENSION_FIELDS = {
+    DailySales.Dimension.CATEGORY: 'category_name',
+    DailySales.Dimension.SUBCATEGORY: 'subcategory_name',
+    DailySales.Dimension.SKU: 'sku',
+}
+
+
+def _upsert(rows):
+    """
+    Adds (day, dimension, key, revenue, units, orders) rows onto the existing
+    aggregates in one INSERT ... ON CONFLICT DO UPDATE statement.
+    """
+    table = connection.ops.quote_name(DailySales._meta.db_table)
+    columns = ['day', 'dimension', 'key', 'revenue', 'units', 'orders']
+    fields = [DailySales._meta.get_field(column) for column in columns]
+    quoted = [connection.ops.quote_name(column) for column in columns]
+    increments = ", ".join(f"{column} = {table}.{column} + excluded.{column}" for column in quoted[3:])
+
+    params = []
+    for row in rows:
+        params.extend(field.get_db_prep_save(value, connection) for field, value in zip(fields, row))
+    values = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(rows))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(quoted)}) VALUES {values} "
+            f"ON CONFLICT ({', '.join(quoted[:3])}) DO UPDATE SET {increments}",
+            params,
+        )
+
+
+def record_order_sales(order, items):
+    """
+    Adds a newly created order's lines to its day's aggregates.
+    Call inside the checkout transaction so the totals commit with the order.
+    """
+    day = timezone.localdate(order.created_at)
+    totals = defaultdict(lambda: [Decimal(0), 0])
+    for item in items:
+        line_total = Decimal(item.unit_price) * item.quantity
+        for dimension, field in DIMENSION_FIELDS.items():
+            row = totals[(dimension, getattr(item, field) or UNCATEGORIZED)]
+            row[0] += line_total
+            row[1] += item.quantity
+
+    if totals:
+        _upsert([(day, dimension, key, revenue, units, 1) for (dimension, key), (revenue, units) in totals.items()])
+
+
+def rebuild_sales(start=None, end=None):
+    """
+    Recomputes the aggregates for orders created between `start` and `end`
+    (inclusive dates, both optional) from the order lines. Returns the number
+    of rows written.
+    """
+    items = OrderItem.objects.annotate(day=TruncDate('order__created_at'))
+    existing = DailySales.objects.all()
+    if start:
+        items = items.filter(day__gte=start)
+        existing = existing.filter(day__gte=start)
+    if end:
+        items = items.filter(day__lte=end)
+        existing = existing.filter(day__lte=end)
+
+    rows = []
+    for dimension, field in DIMENSION_FIELDS.items():
+        grouped = items.values('day', field).annotate(
+            revenue=Sum(F('unit_price') * F('quantity'), output_field=DecimalField()),
+            units=Sum('quantity'),
+            orders=Count('order', distinct=True),
+        ).order_by()
+
+        merged = defaultdict(lambda: [Decimal(0), 0, 0])
+        for group in grouped:
+            # Blank snapshots fold into the same bucket as checkout uses
+            row = merged[(group['day'], group[field] or UNCATEGORIZED)]
+            row[0] += group['revenue']
+            row[1] += group['units']
+            row[2] += group['orders']
+
+        rows.extend(
+            DailySales(day=day, dimension=dimension, key=key, revenue=revenue, units=units, orders=orders)
+            for (day, key), (revenue, units, orders) in merged.items()
+        )
+
+    with transaction.atomic():
+        existing.delete()
+        DailySales.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
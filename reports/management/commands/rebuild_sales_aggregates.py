@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from reports.aggregates import rebuild_sales
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the daily sales aggregates from order lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First day to rebuild (YYYY-MM-DD). Defaults to the first order.")
+        parser.add_argument('--end', help="Last day to rebuild (YYYY-MM-DD). Defaults to the latest order.")
+
+    def handle(self, *args, **options):
+        dates = {}
+        for name in ('start', 'end'):
+            value = options[name]
+            try:
+                dates[name] = parse_date(value) if value else None
+            except ValueError:
+                dates[name] = None
+            if value and dates[name] is None:
+                raise CommandError(f"Invalid --{name} date: {value}")
+
+        written = rebuild_sales(**dates)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily sales row(s)"))
@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class DailySales(models.Model):
+    """
+    Pre-aggregated sales for one day and one category, subcategory or SKU.
+    Kept up to date at checkout and rebuilt by `manage.py rebuild_sales_aggregates`.
+    """
+    class Dimension(models.TextChoices):
+        CATEGORY = 'category', 'Category'
+        SUBCATEGORY = 'subcategory', 'SubCategory'
+        SKU = 'sku', 'SKU'
+
+    day = models.DateField()
+    dimension = models.CharField(max_length=20, choices=Dimension.choices)
+    key = models.CharField(max_length=100, help_text="Category name, subcategory name or SKU.")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units = models.PositiveIntegerField(default=0)
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'daily sales'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'dimension', 'key'], name='unique_daily_sales_row'),
+        ]
+        indexes = [
+            models.Index(fields=['dimension', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.dimension}={self.key}: {self.revenue}"
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+
+class SalesRowSerializer(serializers.Serializer):
+    """
+    Serializer for one aggregated sales row of a report.
+    """
+    key = serializers.CharField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    units = serializers.IntegerField()
+    orders = serializers.IntegerField()
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+
+from .models import DailySales
+from .serializers import SalesRowSerializer
+
+
+class SalesReportView(APIView):
+    """
+    API View to report revenue, units and orders per category, subcategory or SKU
+    over a date range. Reads only the pre-aggregated daily sales table.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        dimension = request.query_params.get('dimension', DailySales.Dimension.CATEGORY)
+        if dimension not in DailySales.Dimension.values:
+            return Response(
+                {"error": f"dimension must be one of {', '.join(DailySales.Dimension.values)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        today = timezone.localdate()
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+        try:
+            start = parse_date(start) if start else today - timedelta(days=29)
+            end = parse_date(end) if end else today
+        except ValueError:
+            # Well formed but impossible, such as 2024-02-30
+            start = end = None
+        if start is None or end is None:
+            return Response({"error": "start and end must be dates (YYYY-MM-DD)"}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = (
+            DailySales.objects
+            .filter(dimension=dimension, day__range=(start, end))
+            .values('key')
+            .annotate(revenue=Sum('revenue'), units=Sum('units'), orders=Sum('orders'))
+            .order_by('-revenue', 'key')
+        )
+        return Response(
+            {
+                "dimension": dimension,
+                "start": start,
+                "end": end,
+                "results": SalesRowSerializer(rows, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,108 @@
+import pytest
+from django.core.cache import cache
+from django.db import connections
+
+from cart.models import Cart, CartItem
+from notifications.sms import LocmemSMSBackend
+from orders import numbering, qikink
+from products.models import Category, Product, SubCategory
+from users.models import User
+
+from .fake_qikink import FakeQikink
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached tokens and counters must not leak between tests."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_order_numbers():
+    """Each test database starts a fresh counter, so drop any reserved block."""
+    numbering.reset()
+
+
+@pytest.fixture
+def replica(settings, db):
+    """
+    A `replica` alias with its own connection to the test database. Like a
+    real replica, it cannot see writes the primary has not committed.
+    """
+    primary = connections['default']
+    connection = type(primary)({**primary.settings_dict}, alias='replica')
+    settings.DATABASES = {**settings.DATABASES, 'replica': connection.settings_dict}
+    connections['replica'] = connection
+    yield connection
+    connection.close()
+    del connections['replica']
+
+
+@pytest.fixture
+def fake_qikink(settings, monkeypatch):
+    server = FakeQikink().start()
+    settings.QIKINK_BASE_URL = server.url
+    # Fresh shared client, so breaker state does not carry over between tests
+    monkeypatch.setattr(qikink, '_client', None)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def sms_outbox(settings):
+    settings.SMS_BACKEND = 'notifications.sms.LocmemSMSBackend'
+    LocmemSMSBackend.outbox.clear()
+    return LocmemSMSBackend.outbox
+
+
+@pytest.fixture
+def customer(db):
+    return User.objects.create_user(
+        phone_number="+919394029313",
+        password="SecurePassword123",
+        email="customer@example.com",
+        first_name="Test",
+        last_name="User",
+    )
+
+
+@pytest.fixture
+def products(db):
+    category = Category.objects.create(name="Men")
+    subcategory = SubCategory.objects.create(name="T-Shirts", category=category)
+    return [
+        Product.objects.create(
+            product_id=f"PROD-{i}",
+            name=f"RoundNeck {i}",
+            sku=f"SKU-{i}",
+            price_with_shipping="499.00",
+            category=category,
+            subcategory=subcategory,
+        )
+        for i in range(1, 4)
+    ]
+
+
+@pytest.fixture
+def filled_cart(customer, products):
+    cart = Cart.objects.create(user=customer)
+    for quantity, product in enumerate(products, start=1):
+        CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+    return cart
+
+
+@pytest.fixture
+def shipping_address():
+    return {
+        "first_name": "Test",
+        "last_name": "User",
+        "address1": "123 Test Street",
+        "phone": "9394029313",
+        "email": "customer@example.com",
+        "city": "TestCity",
+        "zip": "560001",
+        "province": "KA",
+        "country_code": "IN",
+    }
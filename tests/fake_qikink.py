@@ -0,0 +1,147 @@
+"""
+A local stand-in for the Qikink API, served over real HTTP on a random port.
+"""
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeQikink:
+    """
+    Records every call and lets a test inject faults into the order endpoints:
+    queued HTTP error codes, non-JSON replies, or a fixed response delay.
+    """
+
+    def __init__(self):
+        self.token_requests = 0
+        self.token_delay = 0
+        self.revoked_tokens = set()
+        self.connections = set()
+        self.orders = []
+        self.order_failures = []  # HTTP status codes to return before succeeding
+        self.garbled_orders = 0  # 200 responses with an HTML body to return before succeeding
+        self.garbled_statuses = 0
+        self.order_delay = 0
+        self.order_requests = 0
+        self.statuses = {}  # order_number -> provider status
+        self.malformed_statuses = set()  # order numbers whose record is not a JSON object
+        self.status_requests = 0
+        self.status_delay = 0
+        self.status_in_flight = 0
+        self.max_status_in_flight = 0
+        self._tokens = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def fail_orders(self, *status_codes):
+        self.order_failures.extend(status_codes)
+
+    def issue_token(self, form):
+        time.sleep(self.token_delay)
+        with self._lock:
+            self.token_requests += 1
+            return 200, {"ClientId": form.get('ClientId'), "Accesstoken": f"token-{next(self._tokens)}"}
+
+    def create_order(self, headers, body):
+        time.sleep(self.order_delay)
+        with self._lock:
+            self.order_requests += 1
+            if self.order_failures:
+                return self.order_failures.pop(0), {"message": "Upstream unavailable"}
+            if self.garbled_orders:
+                self.garbled_orders -= 1
+                return 200, "<html><body>Down for maintenance</body></html>"
+            if not headers.get('Accesstoken') or headers['Accesstoken'] in self.revoked_tokens:
+                return 401, {"message": "Unauthorized"}
+            self.orders.append(body)
+            return 200, {
+                "message": "Order created successfully",
+                "tracking_url": f"https://track.example.com/{body['order_number']}",
+            }
+
+    def order_status(self, headers, query):
+        order_number = query.get('order_number')
+        with self._lock:
+            self.status_requests += 1
+            if not headers.get('Accesstoken') or headers['Accesstoken'] in self.revoked_tokens:
+                return 401, {"message": "Unauthorized"}
+            self.status_in_flight += 1
+            self.max_status_in_flight = max(self.max_status_in_flight, self.status_in_flight)
+        time.sleep(self.status_delay)
+        with self._lock:
+            self.status_in_flight -= 1
+            if self.garbled_statuses:
+                self.garbled_statuses -= 1
+                return 200, "<html><body>Down for maintenance</body></html>"
+            if order_number in self.malformed_statuses:
+                return 200, ["unexpected"]
+            if order_number not in self.statuses:
+                return 200, []
+            return 200, [{
+                "order_number": order_number,
+                "status": self.statuses[order_number],
+                "tracking_url": f"https://track.example.com/{order_number}/live",
+            }]
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse is observable
+
+            def do_POST(self):
+                fake.connections.add(self.client_address)
+                length = int(self.headers.get('Content-Length', 0))
+                raw = self.rfile.read(length).decode()
+
+                if self.path == '/api/token':
+                    form = {k: v[0] for k, v in parse_qs(raw).items()}
+                    code, payload = fake.issue_token(form)
+                elif self.path == '/api/order/create':
+                    code, payload = fake.create_order(self.headers, json.loads(raw))
+                else:
+                    code, payload = 404, {"message": "Not found"}
+                self._reply(code, payload)
+
+            def do_GET(self):
+                fake.connections.add(self.client_address)
+                url = urlsplit(self.path)
+                if url.path == '/api/order':
+                    query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                    code, payload = fake.order_status(self.headers, query)
+                else:
+                    code, payload = 404, {"message": "Not found"}
+                self._reply(code, payload)
+
+            def _reply(self, code, payload):
+                if isinstance(payload, str):
+                    body, content_type = payload.encode(), 'text/html'
+                else:
+                    body, content_type = json.dumps(payload).encode(), 'application/json'
+                self.send_response(code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+
+def test_checked_in_schema_matches_the_code():
+    call_command('build_openapi_schema', check=True)
+
+
+def test_schema_is_served_from_disk_with_caching_headers(client, settings):
+    settings.OPENAPI_SCHEMA_MAX_AGE = 600
+
+    response = client.get(reverse('api-schema'))
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/vnd.oai.openapi+json'
+    assert 'max-age=600' in response['Cache-Control'] and 'public' in response['Cache-Control']
+    schema = json.loads(response.content)
+    assert schema['info']['version'] == settings.API_VERSION
+    assert '/api/v1/products/' in schema['paths']
+    assert response['ETag'].startswith(f'"{settings.API_VERSION}-')
+
+
+def test_schema_revalidates_by_etag(client):
+    etag = client.get(reverse('api-schema'))['ETag']
+
+    response = client.get(reverse('api-schema'), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+
+def test_schema_is_available_as_yaml(client):
+    response = client.get(reverse('api-schema'), {'format': 'yaml'})
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/vnd.oai.openapi'
+    assert response.content.startswith(b'openapi: ')
+
+
+def test_schema_build_writes_artifacts(settings, tmp_path, client):
+    settings.OPENAPI_SCHEMA_DIR = tmp_path
+    assert client.get(reverse('api-schema')).status_code == 503
+
+    call_command('build_openapi_schema')
+
+    assert (tmp_path / 'schema.yml').exists()
+    assert json.loads((tmp_path / 'schema.json').read_bytes())['info']['title'] == "Skyfab Backend REST API"
+    assert client.get(reverse('api-schema')).status_code == 200
+
+
+@pytest.mark.parametrize('name, marker', [('api-docs', b'swagger-settings'), ('api-redoc', b'redoc-settings')])
+def test_docs_pages_point_at_the_prebuilt_schema(client, name, marker):
+    response = client.get(reverse(name))
+
+    assert response.status_code == 200
+    assert marker in response.content
+    assert reverse('api-schema').encode() in response.content
@@ -0,0 +1,119 @@
+import pytest
+from django.urls import reverse
+
+from users import throttling, views
+from users.throttling import SlidingWindowRateThrottle, throttle_stats
+
+RATES = {
+    'login': '3/min',
+    'login_ip': '5/min',
+    'forgot_password': '2/hour',
+    'forgot_password_ip': '30/hour',
+    'reset_password': '10/hour',
+    'reset_password_ip': '60/hour',
+}
+
+
+@pytest.fixture(autouse=True)
+def rates(monkeypatch):
+    monkeypatch.setattr(SlidingWindowRateThrottle, 'THROTTLE_RATES', RATES)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_040.0]  # 20 seconds into a minute window
+    monkeypatch.setattr(throttling.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def authenticate_calls(monkeypatch):
+    calls = []
+    original = views.authenticate
+
+    def counting_authenticate(**credentials):
+        calls.append(credentials)
+        return original(**credentials)
+
+    monkeypatch.setattr(views, 'authenticate', counting_authenticate)
+    return calls
+
+
+def login(client, phone_number="+919394029313", ip="10.0.0.1", **headers):
+    return client.post(
+        reverse('login'),
+        data={"phone_number": phone_number, "password": "wrong"},
+        content_type="application/json",
+        REMOTE_ADDR=ip,
+        **headers,
+    )
+
+
+@pytest.mark.django_db
+def test_login_is_throttled_per_phone_before_hashing(client, customer, authenticate_calls, clock):
+    assert [login(client).status_code for _ in range(3)] == [401, 401, 401]
+
+    response = login(client)
+
+    assert response.status_code == 429
+    assert int(response["Retry-After"]) == 40
+    assert len(authenticate_calls) == 3
+    assert throttle_stats()["login:phone_number"] >= 1
+    # Another account from another address is unaffected
+    assert login(client, phone_number="+919000000001", ip="10.0.0.2").status_code == 401
+
+
+@pytest.mark.django_db
+def test_login_is_throttled_per_ip_across_accounts(client, customer, authenticate_calls, clock):
+    statuses = [login(client, phone_number=f"+91900000000{i}").status_code for i in range(6)]
+
+    assert statuses == [401] * 5 + [429]
+    assert len(authenticate_calls) == 5
+
+
+@pytest.mark.django_db
+def test_forwarded_for_does_not_reset_ip_counter(client, customer, clock):
+    statuses = [
+        login(client, phone_number=f"+91900000000{i}", HTTP_X_FORWARDED_FOR=f"203.0.113.{i}").status_code
+        for i in range(6)
+    ]
+
+    assert statuses == [401] * 5 + [429]
+
+
+@pytest.mark.django_db
+def test_ip_counter_uses_address_seen_by_trusted_proxy(client, customer, clock, settings):
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+
+    # The proxy appends the real client address; anything before it is client-supplied
+    statuses = [
+        login(client, phone_number=f"+91900000000{i}", HTTP_X_FORWARDED_FOR=f"198.51.100.{i}, 203.0.113.7").status_code
+        for i in range(6)
+    ]
+    other_client = login(client, phone_number="+919000000009", HTTP_X_FORWARDED_FOR="203.0.113.8")
+
+    assert statuses == [401] * 5 + [429]
+    assert other_client.status_code == 401
+
+
+@pytest.mark.django_db
+def test_previous_window_is_weighted_by_overlap(client, customer, clock):
+    for _ in range(3):
+        login(client)
+
+    # Early in the next window most of the previous window still counts
+    clock[0] += 45
+    assert login(client).status_code == 401
+    assert login(client).status_code == 429
+
+    # Near the end of it, the old requests have mostly slid out
+    clock[0] += 50
+    assert login(client).status_code == 401
+
+
+@pytest.mark.django_db
+def test_forgot_password_is_throttled_per_email(client, customer):
+    def forgot():
+        return client.post(reverse('forgot-password'), data={"email": "customer@example.com"}, content_type="application/json")
+
+    assert [forgot().status_code for _ in range(3)] == [200, 200, 429]
@@ -0,0 +1,61 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from products.models import Product, ProductImage
+
+
+@pytest.fixture
+def catalog(products):
+    for product in products:
+        ProductImage.objects.create(product=product, image_url=f"https://img.example.com/{product.sku}.jpg")
+        ProductImage.objects.create(product=product, image_url=f"https://img.example.com/{product.sku}-back.jpg")
+    return products
+
+
+@pytest.mark.django_db
+def test_product_list_loads_relations_up_front(client, catalog):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse('list-products'))
+
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    assert len(response.json()) == 3
+    assert response.json()[0]["category_name"] == "Men"
+    assert len(response.json()[0]["images"]) == 2
+    # Products with category and subcategory joined, then one query for all images
+    assert len(ctx.captured_queries) == 2
+
+
+@pytest.mark.django_db
+def test_category_and_subcategory_listings(client, catalog):
+    category = client.get(reverse('category-products', args=["men"]))
+    subcategory = client.get(reverse('subcategory-products', args=["men", "t-shirts"]))
+
+    assert category.status_code == 200
+    assert len(category.json()) == 3
+    assert [p["sku"] for p in subcategory.json()] == [p["sku"] for p in category.json()]
+    assert client.get(reverse('category-products', args=["women"])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_related_products(client, catalog):
+    product = catalog[0]
+
+    response = client.get(reverse('related-products', args=[product.serial_number]))
+
+    assert response.status_code == 200
+    assert product.sku not in [p["sku"] for p in response.json()]
+    assert client.get(reverse('related-products', args=[999999])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_catalog_served_natively_under_asgi(catalog):
+    Product.objects.filter(pk=catalog[2].pk).update(is_visible=False)
+
+    response = async_to_sync(AsyncClient().get)(reverse('list-products'))
+
+    assert response.status_code == 200
+    assert sorted(p["sku"] for p in response.json()) == ["SKU-1", "SKU-2"]
@@ -0,0 +1,59 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cart.models import Cart, CartItem
+from orders.models import Order
+from orders.numbering import next_order_number
+from products.models import Product
+
+
+def fill_cart(user, size):
+    cart, _ = Cart.objects.get_or_create(user=user)
+    for i in range(size):
+        product = Product.objects.create(
+            product_id=f"BULK-{size}-{i}", name=f"Product {i}", sku=f"BULK-{size}-{i}", price_with_shipping="100.00"
+        )
+        CartItem.objects.create(cart=cart, product=product, quantity=2)
+    return cart
+
+
+def checkout_queries(client, user, shipping_address, size):
+    fill_cart(user, size)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post(reverse('place-order'), data=shipping_address, content_type="application/json")
+    assert response.status_code == 201, f"Response: {response.content.decode()}"
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_checkout_query_count_is_independent_of_cart_size(
+    client, customer, shipping_address, django_capture_on_commit_callbacks
+):
+    client.force_login(customer)
+    # Reserve and commit this process's order number block up front so neither run pays for it
+    with django_capture_on_commit_callbacks(execute=True):
+        next_order_number()
+
+    small = checkout_queries(client, customer, shipping_address, 1)
+    large = checkout_queries(client, customer, shipping_address, 25)
+
+    assert small == large
+
+
+@pytest.mark.django_db
+def test_checkout_writes_all_lines_and_totals(client, customer, filled_cart, shipping_address):
+    client.force_login(customer)
+    client.post(reverse('place-order'), data=shipping_address, content_type="application/json")
+
+    order = Order.objects.get()
+    # 1 + 2 + 3 units at 499.00
+    assert order.total_order_value == 6 * 499
+    assert sorted(order.items.values_list('sku', 'name', 'unit_price', 'quantity')) == [
+        ("SKU-1", "RoundNeck 1", 499, 1),
+        ("SKU-2", "RoundNeck 2", 499, 2),
+        ("SKU-3", "RoundNeck 3", 499, 3),
+    ]
+    assert order.submission.payload["total_order_value"] == str(float(6 * 499))
+    assert not CartItem.objects.filter(cart=filled_cart).exists()
@@ -0,0 +1,59 @@
+import pytest
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cart.models import CartItem
+from config.routers import CatalogReplicaRouter, catalog_database
+from orders.models import Order
+from products.models import Product
+
+router = CatalogReplicaRouter()
+
+
+@pytest.fixture
+def with_replica(settings):
+    settings.DATABASES = {**settings.DATABASES, 'replica': {**settings.DATABASES['default']}}
+
+
+def test_catalog_views_read_from_replica_when_configured(with_replica):
+    assert catalog_database() == 'replica'
+
+
+def test_without_replica_catalog_uses_default():
+    assert catalog_database() == 'default'
+
+
+def test_all_writes_go_to_primary(with_replica):
+    assert router.db_for_write(Product) == 'default'
+    assert router.db_for_write(Order) == 'default'
+
+
+def test_replica_is_never_migrated():
+    assert router.allow_migrate('default', 'products')
+    assert not router.allow_migrate('replica', 'products')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_catalog_view_is_served_from_replica(client, products, replica):
+    with CaptureQueriesContext(replica) as ctx:
+        response = client.get(reverse('list-products'))
+
+    assert response.status_code == 200
+    assert len(response.json()) == len(products)
+    # Products and their prefetched images
+    assert len(ctx.captured_queries) == 2
+
+
+@pytest.mark.django_db
+def test_cart_reads_products_from_primary(client, customer, products, replica):
+    # The products are not committed, so the replica cannot see them
+    client.force_login(customer)
+
+    with CaptureQueriesContext(replica) as ctx:
+        response = client.post(
+            reverse('add-to-cart'), data={"product_id": products[0].product_id}, content_type="application/json"
+        )
+
+    assert response.status_code == 201, f"Response: {response.content.decode()}"
+    assert not ctx.captured_queries
+    assert CartItem.objects.get().product == products[0]
@@ -0,0 +1,173 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.idempotency import prune_expired_keys, request_fingerprint
+from orders.models import IdempotencyKey, Order
+
+
+@pytest.fixture
+def place_order(client, customer, shipping_address):
+    client.force_login(customer)
+
+    def _place(key, data=None):
+        return client.post(
+            reverse('place-order'),
+            data=data or shipping_address,
+            content_type="application/json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    return _place
+
+
+@pytest.fixture
+def fingerprint(shipping_address):
+    """Fingerprint of the standard place-order request, as the view computes it."""
+    class Request:
+        method = 'POST'
+        path = reverse('place-order')
+        data = shipping_address
+
+    return request_fingerprint(Request)
+
+
+@pytest.mark.django_db
+def test_retry_returns_original_response(place_order, filled_cart):
+    first = place_order("retry-1")
+    assert first.status_code == 201
+
+    second = place_order("retry-1")
+    assert second.status_code == 201
+    assert second.json() == first.json()
+    assert second["Idempotent-Replayed"] == "true"
+    assert Order.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_retry_skips_checkout_work(place_order, filled_cart):
+    place_order("retry-2")
+
+    with CaptureQueriesContext(connection) as ctx:
+        place_order("retry-2")
+
+    tables = " ".join(query['sql'] for query in ctx.captured_queries)
+    assert "cart_cart" not in tables and "orders_order" not in tables
+
+
+@pytest.mark.django_db
+def test_new_key_is_a_new_request(place_order, filled_cart):
+    place_order("key-a")
+    response = place_order("key-b")
+
+    # The first order emptied the cart
+    assert response.status_code == 400
+    assert Order.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_key_reuse_with_different_body_is_rejected(place_order, filled_cart, shipping_address):
+    place_order("reuse")
+    response = place_order("reuse", data={**shipping_address, "city": "Elsewhere"})
+    assert response.status_code == 422
+
+
+@pytest.mark.django_db
+def test_in_flight_duplicate_gets_conflict(place_order, customer, filled_cart, fingerprint, settings):
+    settings.IDEMPOTENCY_WAIT_SECONDS = 0.1
+    IdempotencyKey.objects.create(user=customer, key="busy", request_fingerprint=fingerprint)
+
+    response = place_order("busy")
+
+    assert response.status_code == 409
+    assert Order.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_stale_in_flight_key_is_taken_over(place_order, customer, filled_cart, fingerprint, settings):
+    settings.IDEMPOTENCY_WAIT_SECONDS = 0.1
+    IdempotencyKey.objects.create(
+        user=customer,
+        key="crashed",
+        request_fingerprint=fingerprint,
+        locked_at=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS + 1),
+    )
+
+    response = place_order("crashed")
+
+    assert response.status_code == 201
+    assert IdempotencyKey.objects.get(key="crashed").status_code == 201
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_duplicate_joins_in_flight_attempt(place_order, customer, filled_cart, fingerprint):
+    record = IdempotencyKey.objects.create(user=customer, key="joined", request_fingerprint=fingerprint)
+
+    def finish_first_attempt():
+        time.sleep(0.2)
+        IdempotencyKey.objects.filter(pk=record.pk).update(
+            status_code=201, response_body={"order_number": "SKY00000099"}
+        )
+        connection.close()
+
+    thread = threading.Thread(target=finish_first_attempt)
+    thread.start()
+    response = place_order("joined")
+    thread.join()
+
+    assert response.status_code == 201
+    assert response.json() == {"order_number": "SKY00000099"}
+    assert Order.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_order_is_rolled_back_if_response_cannot_be_stored(place_order, filled_cart, monkeypatch):
+    def fail(*args, **kwargs):
+        raise DatabaseError("disk full")
+
+    monkeypatch.setattr(IdempotencyKey, 'save', fail)
+    with pytest.raises(DatabaseError):
+        place_order("unsaved")
+    monkeypatch.undo()
+
+    # Nothing was committed, so a retry with the same key places the order once
+    assert Order.objects.count() == 0 and not IdempotencyKey.objects.exists()
+    assert filled_cart.items.count() == 3
+    assert place_order("unsaved").status_code == 201
+    assert Order.objects.count() == 1
+
+
+@pytest.fixture
+def aged_keys(customer, settings):
+    keys = IdempotencyKey.objects.bulk_create([
+        IdempotencyKey(user=customer, key=f"aged-{i}", request_fingerprint="x", status_code=201)
+        for i in range(5)
+    ])
+    old = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS + 1)
+    IdempotencyKey.objects.filter(key__in=["aged-0", "aged-1", "aged-3"]).update(created_at=old)
+    return keys
+
+
+@pytest.mark.django_db
+def test_prune_deletes_only_expired_keys_in_chunks(aged_keys):
+    with CaptureQueriesContext(connection) as ctx:
+        deleted = prune_expired_keys(batch_size=2)
+
+    assert deleted == 3
+    assert sorted(IdempotencyKey.objects.values_list('key', flat=True)) == ["aged-2", "aged-4"]
+    assert sum(query['sql'].startswith('DELETE') for query in ctx.captured_queries) == 2
+
+
+@pytest.mark.django_db
+def test_prune_idempotency_keys_command(aged_keys, capsys):
+    call_command('prune_idempotency_keys', '--once')
+
+    assert "Pruned 3 expired idempotency key(s)" in capsys.readouterr().out
+    assert IdempotencyKey.objects.count() == 2
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@pytest.fixture
+def tokens(client, customer):
+    response = client.post(
+        reverse('login'),
+        data={"phone_number": "+919394029313", "password": "SecurePassword123"},
+        content_type="application/json",
+    )
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    return response.json()
+
+
+def bearer(token):
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+def auth_queries(client, url, access):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, **bearer(access))
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    return [query['sql'] for query in ctx.captured_queries]
+
+
+@pytest.mark.django_db
+def test_access_token_carries_user_claims(tokens, customer):
+    token = AccessToken(tokens["access"])
+    assert token["user_id"] == customer.id
+    assert token["is_staff"] is False
+    assert token["phone_number"] == "+919394029313"
+
+
+@pytest.mark.django_db
+def test_bearer_token_authenticates_cart_and_orders(client, tokens, products):
+    add = client.post(
+        reverse('add-to-cart'),
+        data={"product_id": products[0].product_id, "quantity": 1},
+        content_type="application/json",
+        **bearer(tokens["access"]),
+    )
+    assert add.status_code == 201, f"Response: {add.content.decode()}"
+
+    view = client.get(reverse('cart'), **bearer(tokens["access"]))
+    assert view.status_code == 200
+    assert client.get(reverse('order-history'), **bearer(tokens["access"])).status_code == 200
+
+
+@pytest.mark.django_db
+def test_bearer_token_loads_user_once_by_default(client, tokens):
+    queries = auth_queries(client, reverse('order-history'), tokens["access"])
+
+    assert sum('"users_user"' in sql for sql in queries) == 1
+    assert not any('django_session' in sql for sql in queries)
+
+
+@pytest.mark.django_db
+def test_stateless_mode_skips_user_query(client, tokens, settings):
+    settings.JWT_STATELESS_USER = True
+
+    queries = auth_queries(client, reverse('order-history'), tokens["access"])
+
+    assert not any('"users_user"' in sql or 'django_session' in sql for sql in queries)
+
+
+@pytest.mark.django_db
+def test_stateless_mode_honours_staff_claim(client, customer, settings):
+    customer.is_staff = True
+    customer.save()
+    settings.JWT_STATELESS_USER = True
+    access = client.post(
+        reverse('login'),
+        data={"phone_number": "+919394029313", "password": "SecurePassword123"},
+        content_type="application/json",
+    ).json()["access"]
+
+    assert client.get(reverse('sales-report'), **bearer(access)).status_code == 200
+
+
+@pytest.mark.django_db
+def test_refresh_endpoint_issues_new_access_token(client, tokens):
+    response = client.post(reverse('token_refresh'), data={"refresh": tokens["refresh"]}, content_type="application/json")
+
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    assert AccessToken(response.json()["access"])["phone_number"] == "+919394029313"
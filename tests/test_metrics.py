@@ -0,0 +1,150 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory
+from django.urls import resolve, reverse
+
+from config import metrics
+from orders.breaker import CircuitBreaker
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+
+
+@pytest.fixture
+def admin(customer):
+    customer.is_staff = True
+    customer.save(update_fields=['is_staff'])
+    return customer
+
+
+def scrape(client):
+    response = client.get(reverse('metrics'))
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return response.content.decode()
+
+
+def sample(text, name, **labels):
+    for found in re.finditer(rf'^{re.escape(name)}\{{(.*)\}} (\S+)$', text, re.MULTILINE):
+        if dict(re.findall(r'(\w+)="([^"]*)"', found.group(1))) == {key: str(value) for key, value in labels.items()}:
+            return float(found.group(2))
+    raise AssertionError(f"{name}{labels} not in metrics")
+
+
+@pytest.mark.django_db
+def test_metrics_are_admin_only(client, customer):
+    assert client.get(reverse('metrics')).status_code == 401
+    client.force_login(customer)
+    assert client.get(reverse('metrics')).status_code == 403
+
+
+@pytest.mark.django_db
+def test_requests_are_recorded_per_url_name(client, admin, products):
+    client.get(reverse('list-products'))
+    client.get(reverse('list-products'))
+    client.get('/api/v1/no-such-endpoint/')
+    client.force_login(admin)
+
+    text = scrape(client)
+
+    assert sample(text, 'skyfab_http_responses_total', view='list-products', method='GET', status='200') == 2
+    assert sample(text, 'skyfab_http_request_duration_seconds_count', view='list-products') == 2
+    assert sample(text, 'skyfab_http_request_duration_seconds_bucket', view='list-products', le='+Inf') == 2
+    assert sample(text, 'skyfab_db_queries_total', view='list-products') >= 2
+    assert sample(text, 'skyfab_db_query_seconds_total', view='list-products') > 0
+    assert sample(text, 'skyfab_http_responses_total', view='unmatched', method='GET', status='404') == 1
+    assert 'no-such-endpoint' not in text
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_view_queries_are_counted(client, admin, products):
+    async_to_sync(AsyncClient().get)(reverse('list-products'))
+    client.force_login(admin)
+
+    text = scrape(client)
+
+    assert sample(text, 'skyfab_http_responses_total', view='list-products', method='GET', status='200') == 1
+    assert sample(text, 'skyfab_db_queries_total', view='list-products') >= 2
+
+
+@pytest.mark.django_db
+def test_cache_hits_and_misses_are_counted(client, admin):
+    client.force_login(admin)
+    client.get(reverse('user-list'))
+    client.get(reverse('user-list'))
+
+    text = scrape(client)
+
+    # The listing's total count is cached by the first request and reused by the second
+    assert sample(text, 'skyfab_cache_misses_total', view='user-list') >= 1
+    assert sample(text, 'skyfab_cache_hits_total', view='user-list') >= 1
+
+
+def test_any_cache_backend_can_be_instrumented(tmp_path):
+    cache = metrics.InstrumentedCache(str(tmp_path), {
+        'WRAPPED_BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    })
+    stats = metrics.RequestStats()
+    token = metrics._current.set(stats)
+    try:
+        cache.set('present', 1)
+        assert cache.get('present') == 1
+        assert cache.get('absent', 'fallback') == 'fallback'
+        assert cache.get_many(['present', 'absent']) == {'present': 1}
+        assert cache.get_or_set('computed', 2) == 2
+        assert cache.get_or_set('computed', 3) == 2
+    finally:
+        metrics._current.reset(token)
+
+    assert (stats.cache_hits, stats.cache_misses) == (3, 3)
+
+
+@pytest.mark.django_db
+def test_upstream_time_is_attributed_to_the_request(client, admin):
+    breaker = CircuitBreaker('test')
+
+    def view(request):
+        breaker.record_success(0.2)
+        breaker.record_failure(0.3)
+        return HttpResponse()
+
+    request = RequestFactory().get(reverse('place-order'))
+    request.resolver_match = resolve(reverse('place-order'))
+    metrics.RequestMetricsMiddleware(view)(request)
+    breaker.record_success(5)  # outside any request
+    client.force_login(admin)
+
+    text = scrape(client)
+
+    assert sample(text, 'skyfab_upstream_seconds_total', view='place-order') == pytest.approx(0.5)
+    assert sample(text, 'skyfab_http_responses_total', view='place-order', method='GET', status='200') == 1
+
+
+WORKER_SCRIPT = """
+import django
+django.setup()
+from config import metrics
+metrics._observe('list-products', 'GET', 200, 0.01, metrics.RequestStats())
+print(metrics.render_metrics().decode())
+"""
+
+
+def test_workers_share_metrics_in_multiprocess_mode(tmp_path, settings):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path), DJANGO_SETTINGS_MODULE='config.settings')
+
+    for _ in range(3):
+        result = subprocess.run(
+            [sys.executable, '-c', WORKER_SCRIPT], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        )
+
+    # The last worker's scrape includes the other two
+    assert sample(result.stdout, 'skyfab_http_responses_total', view='list-products', method='GET', status='200') == 3
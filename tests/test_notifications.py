@@ -0,0 +1,124 @@
+import smtplib
+from unittest import mock
+
+import pytest
+from django.core.mail.backends.locmem import EmailBackend
+from django.urls import reverse
+
+from notifications.models import Notification
+from notifications.outbox import enqueue_email, enqueue_sms, process_due_notifications
+from notifications.sms import LocmemSMSBackend, SMSError
+
+
+@pytest.mark.django_db
+def test_forgot_password_queues_email_without_sending(client, customer, mailoutbox):
+    response = client.post(reverse('forgot-password'), data={"email": "customer@example.com"}, content_type="application/json")
+
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    assert mailoutbox == []
+    notification = Notification.objects.get()
+    assert notification.channel == Notification.Channel.EMAIL
+    assert notification.recipient == "customer@example.com"
+
+
+@pytest.mark.django_db
+def test_forgot_password_queues_sms(client, customer, sms_outbox):
+    response = client.post(reverse('forgot-password'), data={"phone_number": "+919394029313"}, content_type="application/json")
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+
+    assert process_due_notifications() == 1
+    assert sms_outbox[0]["to"] == "+919394029313"
+    assert "OTP" in sms_outbox[0]["body"]
+
+
+@pytest.fixture
+def smtp(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    with mock.patch("smtplib.SMTP") as smtp_class:
+        smtp_class.return_value.sendmail.return_value = {}
+        yield smtp_class
+
+
+@pytest.mark.django_db
+def test_worker_sends_email_batch_over_one_smtp_session(smtp):
+    for i in range(5):
+        enqueue_email(f"user{i}@example.com", "Hello", f"Message {i}")
+
+    assert process_due_notifications() == 5
+
+    assert smtp.call_count == 1
+    session = smtp.return_value
+    assert sorted(call.args[1][0] for call in session.sendmail.call_args_list) == [
+        f"user{i}@example.com" for i in range(5)
+    ]
+    session.quit.assert_called_once()
+    assert set(Notification.objects.values_list("status", flat=True)) == {Notification.Status.SENT}
+    # Delivered bodies are dropped so one-time codes do not linger in the table
+    assert set(Notification.objects.values_list("body", flat=True)) == {""}
+
+
+@pytest.mark.django_db
+def test_dropped_smtp_session_is_reopened_for_the_rest_of_the_batch(smtp):
+    for i in range(4):
+        enqueue_email(f"user{i}@example.com", "Hello", f"Message {i}")
+    smtp.return_value.sendmail.side_effect = [smtplib.SMTPServerDisconnected("connection lost"), {}, {}, {}]
+
+    assert process_due_notifications() == 4
+
+    assert smtp.call_count == 2
+    assert Notification.objects.filter(status=Notification.Status.SENT).count() == 3
+
+
+@pytest.mark.django_db
+def test_failed_email_is_retried_later_without_blocking_the_batch(mailoutbox, monkeypatch):
+    enqueue_email("bounce@example.com", "Hello", "first")
+    enqueue_email("ok@example.com", "Hello", "second")
+
+    original = EmailBackend.send_messages
+
+    def flaky_send(self, messages):
+        if messages[0].to == ["bounce@example.com"]:
+            raise smtplib.SMTPServerDisconnected("connection lost")
+        return original(self, messages)
+
+    monkeypatch.setattr(EmailBackend, "send_messages", flaky_send)
+
+    assert process_due_notifications() == 2
+    assert [message.to for message in mailoutbox] == [["ok@example.com"]]
+
+    failed = Notification.objects.get(recipient="bounce@example.com")
+    assert failed.status == Notification.Status.PENDING
+    assert failed.attempts == 1
+    assert "connection lost" in failed.last_error
+    # Backed off, so it is not due again straight away
+    assert process_due_notifications() == 0
+
+
+@pytest.mark.django_db
+def test_rejected_sms_is_not_retried(sms_outbox):
+    enqueue_sms("+910000000000", "hello")
+
+    with mock.patch.object(LocmemSMSBackend, "send", side_effect=SMSError("invalid number", retryable=False)):
+        process_due_notifications()
+
+    notification = Notification.objects.get()
+    assert notification.status == Notification.Status.FAILED
+    assert notification.last_error == "invalid number"
+
+
+@pytest.mark.django_db
+def test_twilio_backend_posts_to_messages_api(settings, sms_outbox):
+    settings.SMS_BACKEND = "notifications.sms.TwilioSMSBackend"
+    settings.TWILIO_ACCOUNT_SID = "AC123"
+    settings.TWILIO_AUTH_TOKEN = "secret"
+    settings.TWILIO_PHONE_NUMBER = "+15550000000"
+    enqueue_sms("+919394029313", "hello")
+
+    with mock.patch("requests.Session.post") as post:
+        post.return_value.status_code = 201
+        process_due_notifications()
+
+    url = post.call_args.args[0]
+    assert url == "https://api.twilio.com/2010-04-01/Accounts/AC123/Messages.json"
+    assert post.call_args.kwargs["data"] == {"To": "+919394029313", "From": "+15550000000", "Body": "hello"}
+    assert Notification.objects.get().status == Notification.Status.SENT
@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from orders.models import Order, OrderItem
+from products.models import ProductImage
+
+
+def create_orders(user, products, count, start=0):
+    for product in products:
+        ProductImage.objects.get_or_create(product=product, image_url=f"https://img.example.com/{product.sku}.jpg")
+    for i in range(start, start + count):
+        order = Order.objects.create(user=user, order_number=f"HIST{i:04d}", total_order_value="998.00")
+        OrderItem.objects.bulk_create([OrderItem.from_product(order, product, 2) for product in products])
+
+
+def history_queries(client, **params):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse('order-history'), params)
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    return response.json(), len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_history_query_count_is_fixed_per_page(client, customer, products):
+    client.force_login(customer)
+
+    create_orders(customer, products[:1], 2)
+    small, small_queries = history_queries(client)
+
+    create_orders(customer, products, 18, start=2)
+    large, large_queries = history_queries(client)
+
+    assert len(small["results"]) == 2 and len(large["results"]) == 20
+    assert small_queries == large_queries
+
+
+@pytest.mark.django_db
+def test_history_is_cursor_paginated_newest_first(client, customer, products):
+    client.force_login(customer)
+    create_orders(customer, products, 5)
+
+    first, _ = history_queries(client, page_size=3)
+    assert [o["order_number"] for o in first["results"]] == ["HIST0004", "HIST0003", "HIST0002"]
+    assert first["results"][0]["items"][0]["image_url"] == "https://img.example.com/SKU-1.jpg"
+
+    second = client.get(first["next"]).json()
+    assert [o["order_number"] for o in second["results"]] == ["HIST0001", "HIST0000"]
+    assert second["next"] is None
+
+
+@pytest.mark.django_db
+def test_history_only_lists_own_orders(client, customer, products, django_user_model):
+    other = django_user_model.objects.create_user(phone_number="+919000000001", password="x", email="other@example.com")
+    create_orders(other, products, 1)
+    client.force_login(customer)
+
+    data, _ = history_queries(client)
+    assert data["results"] == []
+
+
+@pytest.mark.django_db
+def test_history_reads_snapshot_not_live_catalog(client, customer, products):
+    client.force_login(customer)
+    create_orders(customer, products[:2], 1)
+
+    products[0].name = "Renamed"
+    products[0].price_with_shipping = "1.00"
+    products[0].save()
+    products[1].delete()
+
+    data, _ = history_queries(client)
+    items = sorted(data["results"][0]["items"], key=lambda item: item["sku"])
+    assert [(item["name"], item["unit_price"]) for item in items] == [("RoundNeck 1", "499.00"), ("RoundNeck 2", "499.00")]
+    assert items[1]["product"] is None
+
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(reverse('order-history'))
+    assert not any("products_" in query['sql'] for query in ctx.captured_queries)
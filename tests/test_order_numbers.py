@@ -0,0 +1,102 @@
+import multiprocessing
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from orders import numbering
+from orders.models import Order, OrderNumberSequence
+from reports import aggregates
+
+
+@pytest.mark.django_db(transaction=True)
+def test_order_numbers_are_formatted_and_sequential(settings):
+    settings.ORDER_NUMBER_BLOCK_SIZE = 3
+
+    numbers = [numbering.next_order_number() for _ in range(7)]
+
+    assert numbers[0] == "SKY00000001"
+    assert numbers == [f"SKY{i:08d}" for i in range(1, 8)]
+    # 7 numbers at 3 per block needs 3 reservations
+    assert OrderNumberSequence.objects.get().next_value == 10
+
+
+@pytest.mark.django_db
+def test_consecutive_orders_get_distinct_numbers(client, customer, products, shipping_address):
+    client.force_login(customer)
+
+    for product in products:
+        client.post(reverse('add-to-cart'), data={"product_id": product.product_id}, content_type="application/json")
+        response = client.post(reverse('place-order'), data=shipping_address, content_type="application/json")
+        assert response.status_code == 201, f"Response: {response.content.decode()}"
+
+    assert Order.objects.values('order_number').distinct().count() == len(products)
+
+
+@pytest.mark.django_db
+def test_block_from_rolled_back_checkout_is_not_reused(
+    client, customer, filled_cart, shipping_address, settings, monkeypatch
+):
+    settings.ORDER_NUMBER_BLOCK_SIZE = 20
+    client.force_login(customer)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("sales ledger unavailable")
+
+    monkeypatch.setattr('orders.views.record_order_sales', fail)
+    with pytest.raises(RuntimeError):
+        client.post(
+            reverse('place-order'), data=shipping_address, content_type="application/json",
+            HTTP_IDEMPOTENCY_KEY="rolled-back",
+        )
+    monkeypatch.setattr('orders.views.record_order_sales', aggregates.record_order_sales)
+
+    # The reservation rolled back with the checkout, so another worker gets the same range
+    assert numbering._reserve_block(20) == (1, 21)
+    response = client.post(reverse('place-order'), data=shipping_address, content_type="application/json")
+
+    assert response.status_code == 201, f"Response: {response.content.decode()}"
+    assert response.json()["order_number"] == "SKY00000021"
+
+
+def _use_database(path):
+    # Forked children must not reuse the parent's SQLite handle, which may be
+    # the in-memory test database that Django never closes
+    connection.connection = None
+    connection.settings_dict['NAME'] = path
+
+
+def _create_schema(path):
+    _use_database(path)
+    with connection.schema_editor() as editor:
+        editor.create_model(OrderNumberSequence)
+
+
+def _allocate(path, count, results):
+    _use_database(path)
+    results.put([numbering.next_order_number() for _ in range(count)])
+
+
+def test_concurrent_processes_never_collide(tmp_path, settings, django_db_blocker):
+    settings.ORDER_NUMBER_BLOCK_SIZE = 7
+    path = str(tmp_path / "numbers.sqlite3")
+    workers, per_worker = 8, 150
+    ctx = multiprocessing.get_context('fork')
+
+    with django_db_blocker.unblock():
+        setup = ctx.Process(target=_create_schema, args=(path,))
+        setup.start()
+        setup.join()
+        assert setup.exitcode == 0
+
+        results = ctx.Queue()
+        processes = [ctx.Process(target=_allocate, args=(path, per_worker, results)) for _ in range(workers)]
+        for process in processes:
+            process.start()
+        allocated = [number for _ in processes for number in results.get(timeout=60)]
+        for process in processes:
+            process.join()
+
+    assert all(process.exitcode == 0 for process in processes)
+    assert len(allocated) == workers * per_worker
+    assert len(set(allocated)) == len(allocated)
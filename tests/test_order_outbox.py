@@ -0,0 +1,119 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from orders import qikink
+from orders.models import Order, OrderSubmission
+from orders.outbox import process_due_submissions
+
+
+@pytest.fixture
+def place_order(client, customer, filled_cart, shipping_address):
+    client.force_login(customer)
+
+    def _place():
+        return client.post(reverse('place-order'), data=shipping_address, content_type="application/json")
+
+    return _place
+
+
+@pytest.mark.django_db
+def test_place_order_queues_without_calling_qikink(place_order, fake_qikink, filled_cart):
+    response = place_order()
+    assert response.status_code == 201, f"Response: {response.content.decode()}"
+    assert response.json()["status"] == "pending"
+
+    order = Order.objects.get()
+    assert order.status == Order.Status.PENDING
+    assert order.items.count() == 3
+    assert order.submission.payload["shipping_address"]["city"] == "TestCity"
+    assert not filled_cart.items.exists()
+    assert fake_qikink.orders == [] and fake_qikink.token_requests == 0
+
+
+@pytest.mark.django_db
+def test_outbox_worker_submits_pending_order(place_order, fake_qikink):
+    place_order()
+
+    assert process_due_submissions() == 1
+
+    order = Order.objects.get()
+    assert order.status == Order.Status.SUBMITTED
+    assert order.tracking_url == f"https://track.example.com/{order.order_number}"
+    assert order.submission.completed_at is not None
+    assert len(fake_qikink.orders) == 1
+    assert len(fake_qikink.orders[0]["line_items"]) == 3
+
+    # Nothing left to send
+    assert process_due_submissions() == 0
+
+
+@pytest.mark.django_db
+def test_outbox_worker_keeps_status_set_by_an_earlier_webhook(place_order, fake_qikink, monkeypatch):
+    place_order()
+    create_order = qikink.create_order
+
+    def accepted_then_webhook(payload):
+        data = create_order(payload)
+        # The status webhook lands before the worker records the submission
+        Order.objects.update(status=Order.Status.PROCESSING, tracking_url="https://track.example.com/webhook")
+        return {**data, "tracking_url": None}
+
+    monkeypatch.setattr(qikink, 'create_order', accepted_then_webhook)
+
+    assert process_due_submissions() == 1
+
+    order = Order.objects.get()
+    assert order.status == Order.Status.PROCESSING
+    assert order.tracking_url == "https://track.example.com/webhook"
+    assert order.submission.completed_at is not None
+
+
+@pytest.mark.django_db
+def test_outbox_worker_backs_off_on_upstream_errors(place_order, fake_qikink):
+    place_order()
+    fake_qikink.fail_orders(503)
+
+    assert process_due_submissions() == 1
+
+    submission = OrderSubmission.objects.get()
+    assert submission.attempts == 1
+    assert submission.completed_at is None
+    assert submission.next_attempt_at > timezone.now()
+    assert submission.order.status == Order.Status.PENDING
+
+    # Not due yet, so the worker leaves it alone
+    assert process_due_submissions() == 0
+
+    OrderSubmission.objects.update(next_attempt_at=timezone.now())
+    assert process_due_submissions() == 1
+    assert Order.objects.get().status == Order.Status.SUBMITTED
+
+
+@pytest.mark.django_db
+def test_outbox_worker_gives_up_after_max_attempts(place_order, fake_qikink, settings):
+    settings.ORDER_OUTBOX_MAX_ATTEMPTS = 2
+    place_order()
+    fake_qikink.fail_orders(503, 503)
+
+    process_due_submissions()
+    OrderSubmission.objects.update(next_attempt_at=timezone.now())
+    process_due_submissions()
+
+    submission = OrderSubmission.objects.get()
+    assert submission.attempts == 2
+    assert submission.completed_at is not None
+    assert submission.order.status == Order.Status.FAILED
+
+
+@pytest.mark.django_db
+def test_outbox_worker_does_not_retry_rejected_orders(place_order, fake_qikink):
+    place_order()
+    fake_qikink.fail_orders(422)
+
+    process_due_submissions()
+
+    submission = OrderSubmission.objects.get()
+    assert submission.attempts == 1
+    assert submission.order.status == Order.Status.FAILED
+    assert fake_qikink.orders == []
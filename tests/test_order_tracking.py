@@ -0,0 +1,177 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import Order
+from orders.tracking import refresh_open_orders
+
+WEBHOOK_SECRET = "test-webhook-secret"
+
+
+@pytest.fixture
+def submitted_orders(customer):
+    return [
+        Order.objects.create(
+            user=customer,
+            order_number=f"TRK{i:04d}",
+            total_order_value="499.00",
+            status=Order.Status.SUBMITTED,
+        )
+        for i in range(12)
+    ]
+
+
+@pytest.fixture
+def post_webhook(client, settings):
+    settings.QIKINK_WEBHOOK_SECRET = WEBHOOK_SECRET
+
+    def _post(payload, secret=WEBHOOK_SECRET):
+        body = json.dumps(payload).encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return client.post(
+            reverse('order-status-webhook'),
+            data=body,
+            content_type="application/json",
+            HTTP_X_QIKINK_SIGNATURE=signature,
+        )
+
+    return _post
+
+
+@pytest.mark.django_db
+def test_webhook_applies_batch_with_bulk_update(post_webhook, submitted_orders):
+    updates = [
+        {"order_number": order.order_number, "status": "Shipped", "tracking_url": f"https://t.example.com/{i}"}
+        for i, order in enumerate(submitted_orders)
+    ]
+    updates.append({"order_number": "TRK0000", "status": "Delivered"})
+    updates.append({"order_number": "NOPE", "status": "Shipped"})
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = post_webhook({"updates": updates})
+
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    assert response.json() == {"applied": 12, "unknown": ["NOPE"]}
+    # One read and one UPDATE for the whole batch
+    assert sum(query['sql'].startswith('UPDATE') for query in ctx.captured_queries) == 1
+
+    assert Order.objects.get(order_number="TRK0000").status == Order.Status.DELIVERED
+    shipped = Order.objects.get(order_number="TRK0001")
+    assert shipped.status == Order.Status.SHIPPED
+    assert shipped.tracking_url == "https://t.example.com/1"
+    assert shipped.status_updated_at is not None
+
+
+@pytest.mark.django_db
+def test_webhook_never_moves_orders_backwards(post_webhook, submitted_orders):
+    Order.objects.filter(order_number="TRK0000").update(status=Order.Status.DELIVERED)
+    Order.objects.filter(order_number="TRK0001").update(status=Order.Status.SHIPPED)
+    Order.objects.filter(order_number="TRK0002").update(status=Order.Status.CANCELLED)
+
+    response = post_webhook({"updates": [
+        {"order_number": "TRK0000", "status": "In Transit"},
+        {"order_number": "TRK0001", "status": "Processing"},
+        {"order_number": "TRK0002", "status": "Delivered"},
+        # Out of order within the batch: delivered first, then a stale scan
+        {"order_number": "TRK0003", "status": "Delivered"},
+        {"order_number": "TRK0003", "status": "Shipped"},
+    ]})
+
+    assert response.json() == {"applied": 1, "unknown": []}
+    statuses = dict(Order.objects.filter(order_number__lte="TRK0003").values_list('order_number', 'status'))
+    assert statuses == {
+        "TRK0000": Order.Status.DELIVERED,
+        "TRK0001": Order.Status.SHIPPED,
+        "TRK0002": Order.Status.CANCELLED,
+        "TRK0003": Order.Status.DELIVERED,
+    }
+
+
+@pytest.mark.django_db
+def test_webhook_skips_updates_that_change_nothing(post_webhook, submitted_orders):
+    update = {"order_number": "TRK0000", "status": "Shipped", "tracking_url": "https://t.example.com/0"}
+    post_webhook({"updates": [update]})
+    first = Order.objects.get(order_number="TRK0000").status_updated_at
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = post_webhook({"updates": [update]})
+
+    assert response.json() == {"applied": 0, "unknown": []}
+    assert not any(query['sql'].startswith('UPDATE') for query in ctx.captured_queries)
+    assert Order.objects.get(order_number="TRK0000").status_updated_at == first
+
+
+@pytest.mark.django_db
+def test_webhook_rejects_non_object_body(post_webhook, submitted_orders):
+    response = post_webhook([{"order_number": "TRK0000", "status": "Delivered"}])
+
+    assert response.status_code == 400
+    assert Order.objects.get(order_number="TRK0000").status == Order.Status.SUBMITTED
+
+
+@pytest.mark.django_db
+def test_webhook_rejects_bad_signature(post_webhook, submitted_orders):
+    response = post_webhook({"updates": [{"order_number": "TRK0000", "status": "Delivered"}]}, secret="wrong")
+
+    assert response.status_code == 403
+    assert Order.objects.get(order_number="TRK0000").status == Order.Status.SUBMITTED
+
+
+@pytest.mark.django_db
+def test_webhook_is_disabled_without_secret(post_webhook, settings):
+    settings.QIKINK_WEBHOOK_SECRET = ""
+    assert post_webhook({"updates": []}, secret="").status_code == 403
+
+
+@pytest.mark.django_db(transaction=True)
+def test_poller_refreshes_open_orders_with_bounded_concurrency(fake_qikink, submitted_orders):
+    fake_qikink.status_delay = 0.05
+    for order in submitted_orders[:10]:
+        fake_qikink.statuses[order.order_number] = "In Transit"
+
+    # Recently refreshed or finished orders are skipped
+    Order.objects.filter(order_number="TRK0010").update(status_checked_at=timezone.now())
+    Order.objects.filter(order_number="TRK0011").update(status=Order.Status.DELIVERED)
+
+    updated = refresh_open_orders(batch_size=5, concurrency=3)
+
+    assert updated == 10
+    assert 1 < fake_qikink.max_status_in_flight <= 3
+    order = Order.objects.get(order_number="TRK0003")
+    assert order.status == Order.Status.SHIPPED
+    assert order.tracking_url == "https://track.example.com/TRK0003/live"
+
+
+@pytest.mark.django_db
+def test_poller_waits_before_repolling(fake_qikink, submitted_orders, settings):
+    for order in submitted_orders:
+        fake_qikink.statuses[order.order_number] = "Processing"
+
+    assert refresh_open_orders() == 12
+    assert refresh_open_orders() == 0
+    assert fake_qikink.status_requests == 12
+
+    Order.objects.update(status_checked_at=timezone.now() - timedelta(seconds=settings.ORDER_STATUS_POLL_MIN_AGE + 1))
+    fake_qikink.statuses["TRK0000"] = "Shipped"
+    # Everything is polled again, but only the order that moved is written
+    assert refresh_open_orders() == 1
+    assert fake_qikink.status_requests == 24
+
+
+@pytest.mark.django_db
+def test_poller_skips_malformed_status_replies(fake_qikink, submitted_orders):
+    for order in submitted_orders:
+        fake_qikink.statuses[order.order_number] = "Shipped"
+    fake_qikink.malformed_statuses.add("TRK0001")
+
+    assert refresh_open_orders(batch_size=5) == 11
+
+    assert Order.objects.get(order_number="TRK0001").status == Order.Status.SUBMITTED
+    assert Order.objects.get(order_number="TRK0002").status == Order.Status.SHIPPED
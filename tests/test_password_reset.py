@@ -0,0 +1,81 @@
+import re
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from notifications.outbox import process_due_notifications
+from users.models import User
+from users.otp import issue_otp, verify_otp
+
+
+def request_otp(client, mailoutbox):
+    response = client.post(reverse('forgot-password'), data={"email": "customer@example.com"}, content_type="application/json")
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    process_due_notifications()
+    return re.search(r"\d{6}", mailoutbox[-1].body).group()
+
+
+def reset(client, otp, new_password="NewSecurePassword456"):
+    return client.post(
+        reverse('reset-password'),
+        data={"email": "customer@example.com", "otp": otp, "new_password": new_password},
+        content_type="application/json",
+    )
+
+
+@pytest.mark.django_db
+def test_forgot_password_keeps_existing_password(client, customer, mailoutbox):
+    password_hash = customer.password
+
+    otp = request_otp(client, mailoutbox)
+
+    customer.refresh_from_db()
+    assert customer.password == password_hash
+    assert otp not in str(cache.get(f"otp:{customer.pk}"))
+
+
+@pytest.mark.django_db
+def test_reset_password_with_otp(client, customer, mailoutbox):
+    otp = request_otp(client, mailoutbox)
+
+    response = reset(client, otp)
+
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    assert User.objects.get(pk=customer.pk).check_password("NewSecurePassword456")
+    # Codes are single use
+    assert reset(client, otp, "AnotherPassword789").status_code == 400
+
+
+@pytest.mark.django_db
+def test_wrong_otp_does_not_hash_password(client, customer, mailoutbox, monkeypatch):
+    request_otp(client, mailoutbox)
+    monkeypatch.setattr(User, "set_password", lambda *args: pytest.fail("password hashed for a wrong OTP"))
+
+    assert reset(client, "000000x").status_code == 400
+
+
+@pytest.mark.django_db
+def test_otp_is_discarded_after_max_attempts(customer, settings):
+    settings.OTP_MAX_ATTEMPTS = 3
+    otp = issue_otp(customer)
+
+    assert not any(verify_otp(customer, "bad") for _ in range(3))
+    assert not verify_otp(customer, otp)
+
+
+@pytest.mark.django_db
+def test_new_otp_replaces_outstanding_one(customer):
+    first = issue_otp(customer)
+    second = issue_otp(customer)
+
+    assert first == second or not verify_otp(customer, first)
+    assert verify_otp(customer, second)
+
+
+@pytest.mark.django_db
+def test_expired_otp_is_rejected(customer, settings):
+    settings.OTP_TTL_SECONDS = 0
+    otp = issue_otp(customer)
+
+    assert not verify_otp(customer, otp)
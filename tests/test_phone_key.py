@@ -0,0 +1,88 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import User
+from users.phone import normalize_phone
+
+
+@pytest.mark.parametrize("value", [
+    "+919394029313",
+    "9394029313",
+    "93940 29313",
+    "+91-93940-29313",
+    "09394029313",
+    "919394029313",
+    "(+91) 93940 29313",
+])
+def test_common_spellings_normalize_to_e164(value):
+    assert normalize_phone(value) == "+919394029313"
+
+
+def test_foreign_and_invalid_numbers():
+    assert normalize_phone("+44 20 7946 0958") == "+442079460958"
+    assert normalize_phone("12345") is None
+    assert normalize_phone("") is None
+    assert normalize_phone(["+919394029313"]) is None
+
+
+def test_fast_path_skips_phonenumbers(monkeypatch):
+    monkeypatch.setattr("users.phone.phonenumbers.parse", lambda *args: pytest.fail("parsed a common spelling"))
+    assert normalize_phone("+91 98765 43210") == "+919876543210"
+
+
+@pytest.mark.django_db
+def test_phone_key_is_kept_in_sync(customer):
+    assert customer.phone_key == "+919394029313"
+
+    customer.phone_number = "+919876543210"
+    customer.save(update_fields=["phone_number"])
+
+    assert User.objects.get(pk=customer.pk).phone_key == "+919876543210"
+
+
+@pytest.mark.django_db
+def test_bulk_writes_set_phone_key():
+    users = User.objects.bulk_create([
+        User(phone_number="+91 98765 00001", email="bulk1@example.com"),
+        User(phone_number="+91 98765 00002", email="bulk2@example.com"),
+    ])
+    assert User.objects.filter_phone("9876500001").get().email == "bulk1@example.com"
+
+    users[1].phone_number = "+919876500003"
+    User.objects.bulk_update(users[1:], ["phone_number"])
+    assert User.objects.filter_phone("+91 98765 00003").get().email == "bulk2@example.com"
+
+
+@pytest.mark.django_db
+def test_login_accepts_any_spelling_via_phone_key(client, customer):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post(
+            reverse('login'),
+            data={"phone_number": "093940 29313", "password": "SecurePassword123"},
+            content_type="application/json",
+        )
+
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    lookup = next(query['sql'] for query in ctx.captured_queries if 'FROM "users_user"' in query['sql'])
+    assert '"users_user"."phone_key" = ' in lookup
+
+
+@pytest.mark.django_db
+def test_forgot_password_finds_user_by_phone_key(client, customer):
+    response = client.post(reverse('forgot-password'), data={"phone_number": "93940-29313"}, content_type="application/json")
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+
+    response = client.post(reverse('forgot-password'), data={"phone_number": "not a number"}, content_type="application/json")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_backfill_command(customer):
+    User.objects.filter(pk=customer.pk).update(phone_key=None)
+
+    call_command("backfill_phone_keys")
+
+    assert User.objects.get(pk=customer.pk).phone_key == "+919394029313"
@@ -0,0 +1,102 @@
+import io
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from products.models import Category, Product, ProductImage
+
+HEADER = "Product Name,SKU,Design,Product Type,Product & Shipping (Inclusive GST),Sizes,Image URLs"
+
+
+@pytest.fixture
+def admin(customer):
+    customer.is_staff = True
+    customer.save(update_fields=['is_staff'])
+    return customer
+
+
+@pytest.fixture
+def import_csv(client, admin):
+    client.force_login(admin)
+
+    def _import(*lines):
+        upload = io.BytesIO("\n".join([HEADER, *lines]).encode())
+        upload.name = 'products.csv'
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post(reverse('import-products'), {'file': upload})
+        assert response.status_code == 201, f"Response: {response.content.decode()}"
+        return response.json(), len(ctx.captured_queries)
+
+    return _import
+
+
+def rows(count, prefix="NEW"):
+    return [
+        f'Women_Hoodies_Zip{i},{prefix}-{i},Plain,Hoodie,899.00,"S,M",'
+        f'"https://cdn.example.com/{prefix}/{i}a.jpg,https://cdn.example.com/{prefix}/{i}b.jpg"'
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_import_creates_and_updates_products(import_csv, products):
+    data, _ = import_csv(
+        *rows(2),
+        'Men_T-Shirts_Renamed,SKU-1,Plain,T-Shirt,549.00,"M,L",https://cdn.example.com/sku-1.jpg',
+    )
+
+    assert data["success"] == "2 products imported successfully"
+    assert data["errors"] == "0 products had errors and were skipped"
+
+    created = Product.objects.get(sku="NEW-1")
+    assert created.name == "Zip1" and created.category.name == "Women" and created.subcategory.name == "Hoodies"
+    assert created.product_id == f"PROD-{created.serial_number}"
+    assert created.images.count() == 2
+
+    updated = Product.objects.get(sku="SKU-1")
+    assert (updated.name, str(updated.price_with_shipping)) == ("Renamed", "549.00")
+    assert updated.category == products[0].category
+
+
+@pytest.mark.django_db
+def test_reimport_does_not_duplicate_images_or_categories(import_csv):
+    import_csv(*rows(3))
+    data, _ = import_csv(*rows(3))
+
+    assert data["success"] == "0 products imported successfully"
+    assert Product.objects.count() == 3
+    assert ProductImage.objects.count() == 6
+    assert Category.objects.filter(name="Women").count() == 1
+
+
+@pytest.mark.django_db
+def test_bad_rows_are_skipped(import_csv):
+    data, _ = import_csv(
+        *rows(1),
+        'Women_Hoodies_Broken,BAD-1,Plain,Hoodie,not-a-price,S,',
+        'Kids_Hoodies_Clash,BAD-2,Plain,Hoodie,499.00,S,',  # subcategory name belongs to Women
+    )
+
+    assert data["success"] == "1 products imported successfully"
+    assert data["errors"] == "2 products had errors and were skipped"
+    assert not Product.objects.filter(sku__startswith="BAD").exists()
+
+
+@pytest.mark.django_db
+def test_import_queries_do_not_grow_with_rows(import_csv, products):
+    _, small = import_csv(*rows(5, prefix="SMALL"))
+    _, large = import_csv(*rows(50, prefix="LARGE"))
+
+    assert large == small
+
+
+@pytest.mark.django_db
+def test_import_reads_its_own_writes_with_a_replica_configured(import_csv, replica):
+    data, _ = import_csv(*rows(2), 'Unsorted,ODD-1,Plain,Hoodie,499.00,S,https://cdn.example.com/odd-1.jpg')
+
+    assert data["success"] == "3 products imported successfully"
+    odd = Product.objects.using('default').select_related('category').get(sku="ODD-1")
+    assert odd.category.name == "Uncategorized"
+    assert ProductImage.objects.using('default').count() == 5
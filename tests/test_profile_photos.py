@@ -0,0 +1,108 @@
+import io
+import os
+
+import pytest
+from django.core.management import call_command
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+from PIL import Image
+
+from users.models import UserProfile
+from users.thumbnails import process_pending_photos
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def camera_photo(name="camera.jpg", size=(1200, 800)):
+    image = Image.new("RGB", size, "navy")
+    exif = Image.Exif()
+    exif[0x010F] = "ACME Camera"  # Make
+    exif[0x0112] = 6  # Orientation: rotate 90° clockwise on display
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", exif=exif)
+    buffer.name = name
+    buffer.seek(0)
+    return buffer
+
+
+def upload(client, file):
+    return client.put(
+        reverse('profile-photo'),
+        data=encode_multipart(BOUNDARY, {"photo": file}),
+        content_type=MULTIPART_CONTENT,
+    )
+
+
+@pytest.mark.django_db
+def test_upload_queues_thumbnailing(client, customer):
+    client.force_login(customer)
+
+    response = upload(client, camera_photo())
+
+    assert response.status_code == 202, f"Response: {response.content.decode()}"
+    assert response.json()["photo_thumbnail"] is None
+    profile = UserProfile.objects.get(user=customer)
+    assert profile.photo_pending
+    assert profile.photo.name.startswith("uploads/")
+
+
+@pytest.mark.django_db
+def test_worker_writes_small_metadata_free_thumbnails(client, customer, media_root, settings):
+    client.force_login(customer)
+    upload(client, camera_photo())
+
+    assert process_pending_photos() == 1
+
+    profile = UserProfile.objects.get(user=customer)
+    assert not profile.photo_pending
+    with Image.open(media_root / profile.photo_thumbnail.name) as jpeg:
+        assert jpeg.format == "JPEG"
+        assert jpeg.size == (settings.PROFILE_THUMBNAIL_SIZE, settings.PROFILE_THUMBNAIL_SIZE)
+        assert not jpeg.getexif()
+    with Image.open(media_root / profile.photo_thumbnail_webp.name) as webp:
+        assert webp.format == "WEBP"
+        assert not webp.getexif()
+
+    detail = client.get(reverse('user-detail', args=[customer.pk])).json()
+    assert detail["profile"]["photo_thumbnail_webp"].endswith(".webp")
+
+
+@pytest.mark.django_db
+def test_new_upload_replaces_old_thumbnails(client, customer, media_root):
+    client.force_login(customer)
+    upload(client, camera_photo("first.jpg"))
+    process_pending_photos()
+    old = UserProfile.objects.get(user=customer).photo_thumbnail.name
+
+    upload(client, camera_photo("second.jpg", size=(300, 300)))
+    call_command("process_profile_photos", "--once")
+
+    profile = UserProfile.objects.get(user=customer)
+    assert "second" in profile.photo_thumbnail.name
+    assert not os.path.exists(media_root / old)
+
+
+@pytest.mark.django_db
+def test_unreadable_photo_is_not_retried_forever(customer, media_root):
+    (media_root / "uploads").mkdir()
+    (media_root / "uploads" / "broken.jpg").write_bytes(b"not an image")
+    UserProfile.objects.create(user=customer, photo="uploads/broken.jpg", photo_pending=True)
+
+    process_pending_photos()
+
+    profile = UserProfile.objects.get(user=customer)
+    assert not profile.photo_pending
+    assert not profile.photo_thumbnail
+
+
+@pytest.mark.django_db
+def test_upload_rejects_non_images(client, customer):
+    client.force_login(customer)
+    file = io.BytesIO(b"plain text")
+    file.name = "notes.txt"
+
+    assert upload(client, file).status_code == 400
@@ -0,0 +1,182 @@
+import time
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from django.utils import timezone
+
+from orders import qikink
+from orders.breaker import CircuitBreaker
+from orders.models import Order, OrderSubmission
+from orders.outbox import process_due_submissions
+from orders.qikink import AsyncQikinkClient, CircuitOpenError, QikinkClient, QikinkError
+
+
+@pytest.fixture
+def breaker_settings(settings):
+    settings.QIKINK_BREAKER_MIN_CALLS = 3
+    settings.QIKINK_BREAKER_WINDOW = 5
+    settings.QIKINK_BREAKER_FAILURE_RATE = 0.5
+    settings.QIKINK_BREAKER_RESET_TIMEOUT = 0.2
+    return settings
+
+
+@pytest.fixture
+def qikink_client(fake_qikink, breaker_settings):
+    return QikinkClient()
+
+
+def order_payload(order_number):
+    return {"order_number": order_number, "line_items": []}
+
+
+def fail_calls(client, count):
+    for i in range(count):
+        with pytest.raises(QikinkError):
+            client.create_order(order_payload(f"F{i}"))
+
+
+def test_breaker_opens_and_fast_fails(qikink_client, fake_qikink):
+    fake_qikink.fail_orders(503, 503, 503)
+    fail_calls(qikink_client, 3)
+    assert qikink_client.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        qikink_client.create_order(order_payload("X1"))
+
+    # The rejected call never reached the upstream
+    assert fake_qikink.order_requests == 3
+    stats = qikink_client.breaker.stats()
+    assert stats['opened'] == 1 and stats['rejected'] == 1 and stats['failures'] == 3
+
+
+def test_half_open_probe_success_closes_breaker(qikink_client, fake_qikink):
+    fake_qikink.fail_orders(503, 503, 503)
+    fail_calls(qikink_client, 3)
+
+    time.sleep(0.25)
+    assert qikink_client.breaker.state == CircuitBreaker.HALF_OPEN
+
+    qikink_client.create_order(order_payload("P1"))
+    assert qikink_client.breaker.state == CircuitBreaker.CLOSED
+    assert len(fake_qikink.orders) == 1
+
+
+def test_half_open_probe_failure_reopens_breaker(qikink_client, fake_qikink):
+    fake_qikink.fail_orders(503, 503, 503, 503)
+    fail_calls(qikink_client, 3)
+
+    time.sleep(0.25)
+    with pytest.raises(QikinkError):
+        qikink_client.create_order(order_payload("P2"))
+    assert qikink_client.breaker.state == CircuitBreaker.OPEN
+    assert qikink_client.breaker.stats()['opened'] == 2
+
+
+def test_rejected_orders_do_not_trip_breaker(qikink_client, fake_qikink):
+    fake_qikink.fail_orders(422, 422, 422, 422)
+    fail_calls(qikink_client, 4)
+    assert qikink_client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_call_budget_bounds_slow_upstream(qikink_client, fake_qikink, settings):
+    qikink_client.get_access_token()
+    fake_qikink.order_delay = 1
+    settings.QIKINK_CALL_BUDGET = 0.2
+
+    started = time.monotonic()
+    with pytest.raises(QikinkError) as excinfo:
+        qikink_client.create_order(order_payload("S1"))
+    assert time.monotonic() - started < 0.9
+    assert excinfo.value.retryable
+    assert qikink_client.breaker.stats()['latency_count'] == 1
+
+
+@pytest.mark.django_db
+def test_outbox_parks_orders_while_breaker_is_open(
+    client, customer, filled_cart, shipping_address, fake_qikink, breaker_settings
+):
+    breaker_settings.QIKINK_BREAKER_RESET_TIMEOUT = 60
+    fake_qikink.fail_orders(503, 503, 503)
+    fail_calls(qikink.get_client(), 3)
+
+    client.force_login(customer)
+    response = client.post(reverse('place-order'), data=shipping_address, content_type="application/json")
+    assert response.status_code == 201
+
+    assert process_due_submissions() == 1
+
+    submission = OrderSubmission.objects.get()
+    assert submission.attempts == 0
+    assert submission.next_attempt_at > timezone.now() + timedelta(seconds=30)
+    assert submission.order.status == Order.Status.PENDING
+    assert fake_qikink.order_requests == 3
+
+
+def test_non_json_response_settles_half_open_probe(qikink_client, fake_qikink):
+    fake_qikink.fail_orders(503, 503, 503)
+    fail_calls(qikink_client, 3)
+
+    time.sleep(0.25)
+    fake_qikink.garbled_orders = 1
+    with pytest.raises(QikinkError) as excinfo:
+        qikink_client.create_order(order_payload("G1"))
+    assert excinfo.value.retryable
+    assert qikink_client.breaker.state == CircuitBreaker.OPEN
+
+    # The probe slot was released, so the next probe goes through and closes it
+    time.sleep(0.25)
+    qikink_client.create_order(order_payload("G2"))
+    assert qikink_client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unexpected_error_counts_as_failure(qikink_client, fake_qikink, monkeypatch):
+    qikink_client.get_access_token()
+
+    def explode(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(qikink_client, '_send', explode)
+    with pytest.raises(RuntimeError):
+        qikink_client.create_order(order_payload("E1"))
+    assert qikink_client.breaker.stats()['failures'] == 1
+
+
+def test_async_non_json_response_settles_half_open_probe(qikink_client, fake_qikink):
+    fake_qikink.fail_orders(503, 503, 503)
+    fail_calls(qikink_client, 3)
+    fake_qikink.statuses["A1"] = "Shipped"
+
+    async def fetch():
+        async with AsyncQikinkClient(qikink_client) as client:
+            return await client.get_order_status("A1")
+
+    time.sleep(0.25)
+    fake_qikink.garbled_statuses = 1
+    with pytest.raises(QikinkError) as excinfo:
+        async_to_sync(fetch)()
+    assert excinfo.value.retryable
+    assert qikink_client.breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.25)
+    assert async_to_sync(fetch)()["status"] == "Shipped"
+    assert qikink_client.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.django_db
+def test_outbox_retries_after_non_json_response(
+    client, customer, filled_cart, shipping_address, fake_qikink, breaker_settings
+):
+    client.force_login(customer)
+    response = client.post(reverse('place-order'), data=shipping_address, content_type="application/json")
+    assert response.status_code == 201
+
+    fake_qikink.garbled_orders = 1
+    assert process_due_submissions() == 1
+
+    submission = OrderSubmission.objects.get()
+    assert submission.attempts == 1
+    assert submission.completed_at is None
+    assert "not JSON" in submission.last_error
+    assert submission.order.status == Order.Status.PENDING
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+
+from orders.qikink import AsyncQikinkClient, QikinkClient, QikinkError
+
+
+@pytest.fixture
+def qikink_client(fake_qikink):
+    return QikinkClient()
+
+
+def order_payload(order_number):
+    return {"order_number": order_number, "line_items": []}
+
+
+def test_token_is_cached_between_orders(qikink_client, fake_qikink):
+    qikink_client.create_order(order_payload("A1"))
+    qikink_client.create_order(order_payload("A2"))
+
+    assert fake_qikink.token_requests == 1
+    assert len(fake_qikink.orders) == 2
+
+
+def test_requests_reuse_one_pooled_connection(qikink_client, fake_qikink):
+    for i in range(5):
+        qikink_client.create_order(order_payload(f"B{i}"))
+
+    assert len(fake_qikink.connections) == 1
+
+
+def test_token_is_refreshed_before_it_expires(qikink_client, fake_qikink, settings):
+    first = qikink_client.get_access_token()
+
+    # Move the cached token inside the refresh margin
+    entry = cache.get(QikinkClient.TOKEN_CACHE_KEY)
+    entry['expires_at'] = time.time() + settings.QIKINK_TOKEN_REFRESH_MARGIN - 1
+    cache.set(QikinkClient.TOKEN_CACHE_KEY, entry)
+
+    second = qikink_client.get_access_token()
+    assert second != first
+    assert fake_qikink.token_requests == 2
+
+
+def test_concurrent_refreshes_are_single_flight(qikink_client, fake_qikink):
+    fake_qikink.token_delay = 0.2
+    tokens = []
+
+    def fetch():
+        tokens.append(qikink_client.get_access_token())
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake_qikink.token_requests == 1
+    assert set(tokens) == {"token-1"}
+
+
+def test_other_worker_refreshing_serves_current_token(qikink_client, fake_qikink, settings):
+    current = qikink_client.get_access_token()
+    entry = cache.get(QikinkClient.TOKEN_CACHE_KEY)
+    entry['expires_at'] = time.time() + settings.QIKINK_TOKEN_REFRESH_MARGIN - 1
+    cache.set(QikinkClient.TOKEN_CACHE_KEY, entry)
+
+    # Simulate a refresh in flight in another process
+    cache.add(QikinkClient.TOKEN_LOCK_KEY, True)
+
+    assert qikink_client.get_access_token() == current
+    assert fake_qikink.token_requests == 1
+
+
+def test_rejected_token_is_refreshed_once(qikink_client, fake_qikink):
+    stale = qikink_client.get_access_token()
+    fake_qikink.revoked_tokens.add(stale)
+
+    qikink_client.create_order(order_payload("C1"))
+
+    assert fake_qikink.token_requests == 2
+    assert len(fake_qikink.orders) == 1
+
+
+def test_unreachable_upstream_is_retryable(settings):
+    settings.QIKINK_BASE_URL = "http://127.0.0.1:9"
+    settings.QIKINK_CONNECT_TIMEOUT = 0.5
+
+    with pytest.raises(QikinkError) as excinfo:
+        QikinkClient().create_order(order_payload("D1"))
+    assert excinfo.value.retryable
+
+
+def test_async_client_shares_token_and_refreshes_rejected_one(qikink_client, fake_qikink):
+    stale = qikink_client.get_access_token()
+    fake_qikink.revoked_tokens.add(stale)
+    fake_qikink.statuses.update({"E1": "Shipped", "E2": "Delivered"})
+
+    async def fetch():
+        async with AsyncQikinkClient(qikink_client) as client:
+            return await asyncio.gather(client.get_order_status("E1"), client.get_order_status("E2"))
+
+    first, second = async_to_sync(fetch)()
+
+    assert (first["status"], second["status"]) == ("Shipped", "Delivered")
+    assert fake_qikink.token_requests == 2
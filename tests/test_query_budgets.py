@@ -0,0 +1,28 @@
+import pytest
+
+from benchmarks.endpoints import WEBHOOK_SECRET, load_budgets, run_suite, seed
+from users.throttling import SlidingWindowRateThrottle
+
+
+@pytest.fixture
+def bench_settings(settings, monkeypatch, tmp_path, fake_qikink):
+    settings.MEDIA_ROOT = tmp_path
+    settings.QIKINK_WEBHOOK_SECRET = WEBHOOK_SECRET
+    monkeypatch.setattr(
+        SlidingWindowRateThrottle, 'THROTTLE_RATES',
+        {scope: '1000/min' for scope in SlidingWindowRateThrottle.THROTTLE_RATES},
+    )
+
+
+@pytest.mark.django_db
+def test_every_route_stays_within_its_query_budget(bench_settings):
+    data = seed(categories=2, subcategories=2, products=12, images=2, users=6, cart_items=3, orders=3)
+    budgets = load_budgets()
+
+    results = run_suite(data, iterations=2, budgets=budgets)
+
+    assert sorted(row['name'] for row in results) == sorted(budgets)
+    over = {row['name']: (row['queries'], row['budget']) for row in results if row['over_budget']}
+    assert not over, f"(queries, budget) over budget: {over}"
+    errors = {row['name']: row['bad_statuses'] for row in results if row['bad_statuses']}
+    assert not errors, f"Unexpected status codes: {errors}"
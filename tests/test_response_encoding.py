@@ -0,0 +1,76 @@
+import gzip
+import json
+from decimal import Decimal
+
+import brotli
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from config.renderers import ORJSONRenderer
+from products.models import Product, ProductImage
+from products.serializers import ProductSerializer
+
+
+@pytest.fixture
+def big_catalog(products):
+    category, subcategory = products[0].category, products[0].subcategory
+    catalog = Product.objects.bulk_create([
+        Product(product_id=f"BULK-{i}", sku=f"BULK-{i}", name=f"Bulk Tee {i}", price_with_shipping="649.50",
+                category=category, subcategory=subcategory)
+        for i in range(40)
+    ])
+    ProductImage.objects.bulk_create([
+        ProductImage(product=product, image_url=f"https://cdn.example.com/{product.sku}.jpg") for product in catalog
+    ])
+    return catalog
+
+
+def test_orjson_renderer_keeps_decimals_exact():
+    rendered = ORJSONRenderer().render({"price": Decimal("649.10"), "label": gettext_lazy("Cart is empty"), 1: None})
+
+    assert json.loads(rendered) == {"price": "649.10", "label": "Cart is empty", "1": None}
+
+
+def test_orjson_renderer_honours_requested_indent():
+    renderer = ORJSONRenderer()
+
+    assert renderer.render(None) == b''
+    assert b'\n  "a": 1' in renderer.render({"a": 1}, 'application/json; indent=4')
+
+
+@pytest.mark.django_db
+def test_orjson_renderer_matches_drf_output_for_the_catalog(big_catalog):
+    data = ProductSerializer(Product.objects.prefetch_related('images'), many=True).data
+
+    assert json.loads(ORJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+
+
+@pytest.mark.django_db
+def test_large_catalog_pages_are_compressed(client, big_catalog):
+    plain = client.get(reverse('list-products'))
+    br = client.get(reverse('list-products'), HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+    gz = client.get(reverse('list-products'), HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+
+    assert 'Content-Encoding' not in plain
+    assert 'Accept-Encoding' in plain['Vary']
+    assert br['Content-Encoding'] == 'br'
+    assert brotli.decompress(br.content) == plain.content
+    assert gz['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(gz.content) == plain.content
+    assert int(gz['Content-Length']) == len(gz.content) < len(plain.content)
+
+
+@pytest.mark.django_db
+def test_small_responses_are_not_compressed(client):
+    response = client.post(reverse('login'), data={}, content_type='application/json', HTTP_ACCEPT_ENCODING='br')
+
+    assert 'Content-Encoding' not in response
+
+
+@pytest.mark.django_db
+def test_browsable_api_is_not_offered_outside_debug(client, big_catalog):
+    response = client.get(reverse('list-products'), HTTP_ACCEPT='text/html,application/xhtml+xml,*/*;q=0.8')
+
+    assert response['Content-Type'] == 'application/json'
@@ -0,0 +1,102 @@
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cart.models import Cart, CartItem
+from reports.models import DailySales
+
+
+def aggregates():
+    return {
+        (row.dimension, row.key): (row.revenue, row.units, row.orders)
+        for row in DailySales.objects.all()
+    }
+
+
+@pytest.fixture
+def checkout(client, customer, products, shipping_address):
+    client.force_login(customer)
+
+    def _checkout(*quantities):
+        cart, _ = Cart.objects.get_or_create(user=customer)
+        for product, quantity in zip(products, quantities):
+            if quantity:
+                CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+        response = client.post(reverse('place-order'), data=shipping_address, content_type="application/json")
+        assert response.status_code == 201, f"Response: {response.content.decode()}"
+
+    return _checkout
+
+
+@pytest.mark.django_db
+def test_checkout_updates_daily_aggregates(checkout):
+    checkout(1, 2, 0)
+    checkout(0, 1, 3)
+
+    rows = aggregates()
+    assert rows[("category", "Men")] == (Decimal("3493.00"), 7, 2)
+    assert rows[("subcategory", "T-Shirts")] == (Decimal("3493.00"), 7, 2)
+    assert rows[("sku", "SKU-1")] == (Decimal("499.00"), 1, 1)
+    assert rows[("sku", "SKU-2")] == (Decimal("1497.00"), 3, 2)
+    assert rows[("sku", "SKU-3")] == (Decimal("1497.00"), 3, 1)
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_aggregates(checkout):
+    checkout(1, 2, 0)
+    checkout(0, 1, 3)
+    incremental = aggregates()
+
+    DailySales.objects.all().delete()
+    call_command('rebuild_sales_aggregates')
+
+    assert aggregates() == incremental
+
+
+@pytest.mark.django_db
+def test_sales_report_reads_only_aggregates(checkout, client, customer):
+    checkout(1, 2, 3)
+    customer.is_staff = True
+    customer.save()
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse('sales-report'), {"dimension": "sku"})
+
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    assert [row["key"] for row in response.json()["results"]] == ["SKU-3", "SKU-2", "SKU-1"]
+    assert response.json()["results"][0] == {"key": "SKU-3", "revenue": "1497.00", "units": 3, "orders": 1}
+    assert not any("orders_" in query['sql'] or "products_" in query['sql'] for query in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_sales_report_is_admin_only(client, customer):
+    client.force_login(customer)
+    assert client.get(reverse('sales-report')).status_code == 403
+
+
+@pytest.mark.django_db
+def test_sales_report_validates_dimension(client, customer):
+    customer.is_staff = True
+    customer.save()
+    client.force_login(customer)
+    assert client.get(reverse('sales-report'), {"dimension": "colour"}).status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("start", ["yesterday", "2024-02-30"])
+def test_sales_report_rejects_invalid_dates(client, customer, start):
+    customer.is_staff = True
+    customer.save()
+    client.force_login(customer)
+    response = client.get(reverse('sales-report'), {"start": start})
+    assert response.status_code == 400, f"Response: {response.content.decode()}"
+
+
+@pytest.mark.django_db
+def test_rebuild_rejects_impossible_dates():
+    with pytest.raises(CommandError, match="Invalid --start date"):
+        call_command('rebuild_sales_aggregates', start="2024-02-30")
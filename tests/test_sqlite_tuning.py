@@ -0,0 +1,50 @@
+import importlib.util
+
+from django.conf import settings
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+
+def load_settings(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    spec = importlib.util.spec_from_file_location('tuned_settings', settings.BASE_DIR / 'config' / 'settings.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def open_connection(database):
+    wrapper = DatabaseWrapper({**database, 'TIME_ZONE': None, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False,
+                               'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False}, alias='tuning')
+    wrapper.ensure_connection()
+    return wrapper
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_sqlite_is_untuned_by_default(monkeypatch, tmp_path):
+    module = load_settings(monkeypatch, DB_ENGINE='sqlite', SQLITE_DB_NAME=str(tmp_path / 'plain.sqlite3'))
+
+    assert 'OPTIONS' not in module.DATABASES['default']
+
+
+def test_tuned_sqlite_connections_use_wal(monkeypatch, tmp_path, django_db_blocker):
+    module = load_settings(
+        monkeypatch, DB_ENGINE='sqlite', SQLITE_TUNED='1', SQLITE_BUSY_TIMEOUT_MS='2500',
+        SQLITE_DB_NAME=str(tmp_path / 'tuned.sqlite3'),
+    )
+    with django_db_blocker.unblock():
+        wrapper = open_connection(module.DATABASES['default'])
+    try:
+        with django_db_blocker.unblock():
+            assert pragma(wrapper, 'journal_mode') == 'wal'
+            assert pragma(wrapper, 'synchronous') == 1  # NORMAL
+            assert pragma(wrapper, 'busy_timeout') == 2500
+            assert pragma(wrapper, 'temp_store') == 2  # MEMORY
+        assert wrapper.transaction_mode == 'IMMEDIATE'
+    finally:
+        wrapper.close()
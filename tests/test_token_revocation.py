@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from users.revocation import is_revoked, prune_expired_tokens
+from users.tokens import SkyfabRefreshToken
+
+
+def refresh(client, token):
+    return client.post(reverse('token_refresh'), data={"refresh": str(token)}, content_type="application/json")
+
+
+def blacklist_queries(ctx):
+    return [query['sql'] for query in ctx.captured_queries if 'token_blacklist_blacklistedtoken' in query['sql']]
+
+
+@pytest.mark.django_db
+def test_logged_out_token_is_refused_from_cache(client, customer):
+    token = SkyfabRefreshToken.for_user(customer)
+    client.force_login(customer)
+    assert client.post(reverse('logout'), data={"refresh": str(token)}, content_type="application/json").status_code == 200
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = refresh(client, token)
+
+    assert response.status_code == 401
+    assert blacklist_queries(ctx) == []
+
+
+@pytest.mark.django_db
+def test_rotated_refresh_token_cannot_be_reused(client, customer):
+    token = SkyfabRefreshToken.for_user(customer)
+
+    first = refresh(client, token)
+    assert first.status_code == 200, f"Response: {first.content.decode()}"
+    assert refresh(client, token).status_code == 401
+    assert refresh(client, first.json()["refresh"]).status_code == 200
+
+
+@pytest.mark.django_db
+def test_revoked_answer_is_cached(customer):
+    token = SkyfabRefreshToken.for_user(customer)
+    jti, exp = token["jti"], token["exp"]
+    BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+
+    assert is_revoked(jti, exp)
+    with CaptureQueriesContext(connection) as ctx:
+        assert is_revoked(jti, exp)
+    assert len(ctx.captured_queries) == 0
+
+
+@pytest.mark.django_db
+def test_revocation_elsewhere_is_seen_at_once(customer):
+    token = SkyfabRefreshToken.for_user(customer)
+    jti, exp = token["jti"], token["exp"]
+    assert not is_revoked(jti, exp)
+
+    # Revoked by another process, whose cache this one does not share
+    BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+
+    assert is_revoked(jti, exp)
+
+
+@pytest.mark.django_db
+def test_revocation_survives_cache_loss(customer):
+    token = SkyfabRefreshToken.for_user(customer)
+    token.blacklist()
+    cache.clear()
+
+    assert is_revoked(token["jti"], token["exp"])
+
+
+@pytest.fixture
+def stored_tokens(customer):
+    now = timezone.now()
+    tokens = OutstandingToken.objects.bulk_create([
+        OutstandingToken(
+            user=customer,
+            jti=f"jti-{i}",
+            token=f"token-{i}",
+            created_at=now - timedelta(days=2),
+            expires_at=now - timedelta(days=1) if i % 2 else now + timedelta(days=1),
+        )
+        for i in range(10)
+    ])
+    BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in tokens[:6]])
+    return tokens
+
+
+@pytest.mark.django_db
+def test_prune_deletes_only_expired_tokens_in_chunks(stored_tokens):
+    with CaptureQueriesContext(connection) as ctx:
+        deleted = prune_expired_tokens(batch_size=2)
+
+    assert deleted == 5
+    assert sorted(OutstandingToken.objects.values_list('jti', flat=True)) == [f"jti-{i}" for i in range(0, 10, 2)]
+    assert sorted(BlacklistedToken.objects.values_list('token__jti', flat=True)) == ["jti-0", "jti-2", "jti-4"]
+    # Three chunks of at most two ids each
+    assert sum(query['sql'].startswith('DELETE FROM "token_blacklist_outstandingtoken"') for query in ctx.captured_queries) == 3
+
+
+@pytest.mark.django_db
+def test_prune_command(stored_tokens, capsys):
+    call_command('prune_expired_tokens', '--once')
+
+    assert "Pruned 5 expired token(s)" in capsys.readouterr().out
+    assert OutstandingToken.objects.count() == 5
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import User, UserProfile
+
+
+@pytest.fixture
+def staff(customer):
+    customer.is_staff = True
+    customer.save(update_fields=['is_staff'])
+    return customer
+
+
+@pytest.fixture
+def many_users(db):
+    users = User.objects.bulk_create([
+        User(
+            phone_number=f"+9190000{i:05d}",
+            email=f"user{i}@example.com",
+            first_name=f"User{i}",
+        )
+        for i in range(30)
+    ])
+    UserProfile.objects.bulk_create([UserProfile(user=user, city="Chennai") for user in users])
+    return users
+
+
+def list_users(client, **params):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse('user-list'), params)
+    assert response.status_code == 200, f"Response: {response.content.decode()}"
+    return response.json(), [query['sql'] for query in ctx.captured_queries]
+
+
+@pytest.mark.django_db
+def test_user_list_is_paginated_without_per_row_queries(client, staff, many_users):
+    client.force_login(staff)
+
+    data, queries = list_users(client, page_size=10)
+
+    assert data["count"] == 31
+    assert len(data["results"]) == 10
+    assert data["results"][1]["profile"]["city"] == "Chennai"
+    assert sum('"users_userprofile"' in sql for sql in queries) == 1
+    assert sum('COUNT(' in sql for sql in queries) == 1
+
+
+@pytest.mark.django_db
+def test_user_list_count_is_reused_across_pages(client, staff, many_users):
+    client.force_login(staff)
+    list_users(client, page_size=10)
+
+    data, queries = list_users(client, page_size=10, page=3)
+
+    assert data["count"] == 31
+    assert data["results"][0]["first_name"] == "User19"
+    assert not any('COUNT(' in sql for sql in queries)
+
+
+@pytest.mark.django_db
+def test_user_list_filters_on_phone_and_email(client, staff, many_users):
+    client.force_login(staff)
+
+    by_phone, _ = list_users(client, phone_number="+919000000007")
+    by_email, _ = list_users(client, email="user12@example.com")
+
+    assert [user["email"] for user in by_phone["results"]] == ["user7@example.com"]
+    assert [user["phone_number"] for user in by_email["results"]] == ["+919000000012"]
+
+
+@pytest.mark.django_db
+def test_user_list_is_staff_only(client, customer, many_users):
+    client.force_login(customer)
+
+    assert client.get(reverse('user-list')).status_code == 403
+    assert client.get(reverse('user-list'), {"email": "user12@example.com"}).status_code == 403
+
+
+@pytest.mark.django_db
+def test_customers_only_see_their_own_account(client, customer, many_users):
+    client.force_login(customer)
+
+    own = client.get(reverse('user-detail', args=[customer.pk]))
+    other = client.get(reverse('user-detail', args=[many_users[0].pk]))
+
+    assert own.status_code == 200 and own.json()["email"] == "customer@example.com"
+    assert other.status_code == 404
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class SkyfabJWTAuthentication(JWTAuthentication):
+    """
+    Bearer JWT authentication.
+
+    With `JWT_STATELESS_USER` enabled the request user is built from the token's
+    claims (id, is_staff, phone number) instead of being loaded from the
+    database. Changes to a user, including deactivation, then take effect when
+    their access token expires.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.JWT_STATELESS_USER:
+            return super().get_user(validated_token)
+
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return api_settings.TOKEN_USER_CLASS(validated_token)
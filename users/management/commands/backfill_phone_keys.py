@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from users.models import User
+from users.phone import normalize_phone
+
+
+class Command(BaseCommand):
+    help = "Fills in the E.164 phone_key of users saved before it existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Users updated per query.")
+
+    def handle(self, *args, **options):
+        updated = 0
+        last_id = 0
+        while True:
+            users = list(
+                User.objects.filter(id__gt=last_id, phone_key__isnull=True)
+                .order_by('id')
+                .only('id', 'phone_number')[:options['batch_size']]
+            )
+            if not users:
+                break
+            last_id = users[-1].id
+            for user in users:
+                user.phone_key = normalize_phone(user.phone_number)
+            User.objects.bulk_update(users, ['phone_key'])
+            updated += len(users)
+
+        self.stdout.write(f"Backfilled phone_key for {updated} user(s)")
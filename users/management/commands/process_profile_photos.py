@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.thumbnails import process_pending_photos
+
+
+class Command(BaseCommand):
+    help = "Generates JPEG and WebP thumbnails for newly uploaded profile photos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process a single batch and exit.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Profiles processed per batch.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when nothing is pending.")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_pending_photos(batch_size=options['batch_size'])
+            if processed:
+                self.stdout.write(f"Processed {processed} profile photo(s)")
+
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.revocation import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Deletes expired JWT outstanding and blacklisted token rows in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run a single pass and exit.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Rows deleted per transaction.")
+        parser.add_argument('--interval', type=float, default=3600, help="Seconds between passes.")
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = prune_expired_tokens(batch_size=options['batch_size'])
+            self.stdout.write(f"Pruned {deleted} expired token(s)")
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
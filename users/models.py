@@ -4,6 +4,8 @@ from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from phonenumber_field.modelfields import PhoneNumberField
 
+from users.phone import normalize_phone
+
 
 class CustomUserManager(BaseUserManager):
     """Custom user model manager where authentication is based on phone number or email"""
@@ -28,6 +30,37 @@ class CustomUserManager(BaseUserManager):
 
         return self.create_user(phone_number, password, **extra_fields)
 
+    def get_by_natural_key(self, phone_number):
+        """Looks users up on the indexed E.164 key, so any spelling of the number works"""
+        return self.filter_phone(phone_number).get()
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Fills in phone_key, which save() would otherwise set"""
+        objs = list(objs)
+        for user in objs:
+            user.phone_key = normalize_phone(user.phone_number)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """Keeps phone_key in step when phone_number is among the updated fields"""
+        if 'phone_number' in fields:
+            objs = list(objs)
+            for user in objs:
+                user.phone_key = normalize_phone(user.phone_number)
+            fields = [*fields, 'phone_key']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def filter_phone(self, phone_number):
+        """
+        Users whose phone number matches `phone_number`, however it is formatted.
+        Relies on phone_key, which save(), bulk_create() and bulk_update() keep
+        current; a queryset .update() of phone_number must set it too.
+        """
+        phone_key = normalize_phone(phone_number)
+        if phone_key is None:
+            return self.none()
+        return self.filter(phone_key=phone_key)
+
 
 class User(AbstractUser):
     """Custom User model using phone number as primary authentication"""
@@ -38,6 +71,13 @@ class User(AbstractUser):
     verbose_name=_('phone number'),
     help_text=_('Indian phone number (+91) required')
 )
+    # E.164 form of `phone_number`, kept in sync on save, for exact-match lookups
+    phone_key = models.CharField(
+        max_length=16,
+        unique=True,
+        null=True,
+        editable=False
+    )
 
 
     email = models.EmailField(
@@ -60,6 +100,13 @@ class User(AbstractUser):
     def __str__(self):
         return str(self.phone_number)
 
+    def save(self, *args, **kwargs):
+        self.phone_key = normalize_phone(self.phone_number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone_number' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'phone_key'}
+        super().save(*args, **kwargs)
+
 
 class UserProfile(models.Model):
     """Extended User Profile"""
@@ -102,6 +149,25 @@ class UserProfile(models.Model):
         blank=True, 
         null=True
     )
+    # Resized, metadata-free copies of `photo` made by `manage.py process_profile_photos`
+    photo_thumbnail = models.ImageField(
+        upload_to='thumbnails/',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    photo_thumbnail_webp = models.ImageField(
+        upload_to='thumbnails/',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    photo_pending = models.BooleanField(
+        default=False,
+        db_index=True,
+        editable=False,
+        help_text=_('Set when a new photo is waiting for its thumbnails')
+    )
 
     class Meta:
         verbose_name = _('user profile')
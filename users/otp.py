@@ -0,0 +1,67 @@
+import hashlib
+import hmac
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Password reset OTPs live in the cache, never in the user's password hash.
+# Only a keyed digest of the code is stored, so a cache dump does not leak
+# usable codes, and checking one costs a single HMAC rather than a PBKDF2 run.
+
+
+def _code_key(user_id):
+    return f"otp:{user_id}"
+
+
+def _attempts_key(user_id):
+    return f"otp-attempts:{user_id}"
+
+
+def _digest(user_id, code):
+    message = f"{user_id}:{code}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def issue_otp(user):
+    """
+    Generates a new OTP for `user`, replacing any outstanding one, and returns
+    the plain code for delivery. The code expires after OTP_TTL_SECONDS.
+    """
+    code = f"{secrets.randbelow(10 ** settings.OTP_LENGTH):0{settings.OTP_LENGTH}d}"
+    cache.set_many(
+        {_code_key(user.pk): _digest(user.pk, code), _attempts_key(user.pk): 0},
+        timeout=settings.OTP_TTL_SECONDS,
+    )
+    return code
+
+
+def verify_otp(user, code):
+    """
+    Returns True if `code` is the outstanding OTP for `user`, consuming it.
+
+    Every check counts against OTP_MAX_ATTEMPTS; once they are used up the
+    OTP is discarded and the user has to request a new one.
+    """
+    digest = cache.get(_code_key(user.pk))
+    if digest is None:
+        return False
+
+    try:
+        attempts = cache.incr(_attempts_key(user.pk))
+    except ValueError:
+        # The counter expired between the two reads
+        return False
+    if attempts > settings.OTP_MAX_ATTEMPTS:
+        clear_otp(user)
+        return False
+
+    if not hmac.compare_digest(digest, _digest(user.pk, str(code).strip())):
+        return False
+
+    clear_otp(user)
+    return True
+
+
+def clear_otp(user):
+    cache.delete_many([_code_key(user.pk), _attempts_key(user.pk)])
@@ -0,0 +1,36 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that caches the total count per query for
+    USER_LIST_COUNT_CACHE_SECONDS, so paging through a large table runs
+    COUNT(*) once rather than on every page. The count may lag behind
+    inserts and deletes by up to that long.
+    """
+
+    @cached_property
+    def count(self):
+        query = str(self.object_list.query)
+        key = f"paginator-count:{hashlib.sha256(query.encode()).hexdigest()}"
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, timeout=settings.USER_LIST_COUNT_CACHE_SECONDS)
+        return count
+
+
+class UserPagination(PageNumberPagination):
+    """
+    Page-numbered user listing (`?page=` and `?page_size=`) with a cached total.
+    """
+    django_paginator_class = CachedCountPaginator
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
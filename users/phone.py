@@ -0,0 +1,47 @@
+import re
+from functools import lru_cache
+
+import phonenumbers
+
+DEFAULT_REGION = 'IN'
+
+_SEPARATORS = re.compile(r'[\s().-]')
+_E164 = re.compile(r'\+[1-9]\d{7,14}')
+_NATIONAL = re.compile(r'[6-9]\d{9}')
+
+
+def normalize_phone(value):
+    """
+    Returns `value` as an E.164 string (e.g. "+919394029313"), or None if it
+    is not a valid phone number. Numbers without a country code are taken to
+    be Indian.
+
+    Common spellings of Indian mobile numbers ("93940 29313", "+91-93940-29313",
+    "09394029313") are handled without calling into `phonenumbers`; anything
+    else falls back to a full parse. Results are memoized.
+    """
+    if isinstance(value, (list, tuple, dict)):
+        return None
+    return _normalize(str(value or ''))
+
+
+@lru_cache(maxsize=4096)
+def _normalize(value):
+    digits = _SEPARATORS.sub('', value)
+    if digits.startswith('+91') and _NATIONAL.fullmatch(digits[3:]):
+        return digits
+    if _NATIONAL.fullmatch(digits):
+        return f"+91{digits}"
+    if len(digits) == 11 and digits.startswith('0') and _NATIONAL.fullmatch(digits[1:]):
+        return f"+91{digits[1:]}"
+    if len(digits) == 12 and digits.startswith('91') and _NATIONAL.fullmatch(digits[2:]):
+        return f"+{digits}"
+
+    try:
+        number = phonenumbers.parse(digits, DEFAULT_REGION)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(number):
+        return None
+    normalized = phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+    return normalized if _E164.fullmatch(normalized) else None
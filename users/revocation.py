@@ -0,0 +1,67 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+REVOKED = 'revoked'
+
+
+def _key(jti):
+    return f"jwt-jti:{jti}"
+
+
+def _remaining(exp):
+    return max(int(exp - time.time()), 1)
+
+
+def mark_revoked(jti, exp):
+    """
+    Records in the cache that token `jti` is revoked until it expires anyway.
+    """
+    cache.set(_key(jti), REVOKED, timeout=_remaining(exp))
+
+
+def is_revoked(jti, exp):
+    """
+    Refuses tokens cached as revoked without a query, and checks the
+    blacklist table for any other token, caching the answer if it is revoked.
+
+    Live tokens are never cached, so a revocation made by another process,
+    or lost from the cache, still takes effect on the next check.
+    """
+    if cache.get(_key(jti)) == REVOKED:
+        return True
+
+    revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    if revoked:
+        mark_revoked(jti, exp)
+    return revoked
+
+
+def prune_expired_tokens(batch_size=None):
+    """
+    Deletes expired outstanding tokens and their blacklist entries,
+    `batch_size` rows per transaction, walking the primary key so each chunk
+    picks up where the last one stopped. Returns the number of outstanding
+    tokens deleted.
+    """
+    batch_size = batch_size or settings.JWT_PRUNE_BATCH_SIZE
+    now = timezone.now()
+    deleted = 0
+    last_id = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects
+            .filter(id__gt=last_id, expires_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        last_id = ids[-1]
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            deleted += OutstandingToken.objects.filter(id__in=ids).delete()[0]
@@ -2,13 +2,37 @@ from rest_framework import serializers
 from users.models import User, UserProfile
 from django.db import transaction
 from phonenumber_field.serializerfields import PhoneNumberField
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+
+from users.tokens import SkyfabRefreshToken
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile"""
     class Meta:
         model = UserProfile
-        fields = ('title', 'date_of_birth', 'address', 'country', 'city', 'zip', 'photo')
+        fields = (
+            'title', 'date_of_birth', 'address', 'country', 'city', 'zip',
+            'photo', 'photo_thumbnail', 'photo_thumbnail_webp',
+        )
+        read_only_fields = ('photo_thumbnail', 'photo_thumbnail_webp')
+
+
+class ProfilePhotoSerializer(serializers.ModelSerializer):
+    """Serializer for uploading a profile photo"""
+    photo = serializers.ImageField(required=True)
+
+    class Meta:
+        model = UserProfile
+        fields = ('photo', 'photo_thumbnail', 'photo_thumbnail_webp')
+        read_only_fields = ('photo_thumbnail', 'photo_thumbnail_webp')
+
+    def update(self, instance, validated_data):
+        """Store the new photo and queue it for thumbnailing"""
+        instance.photo = validated_data['photo']
+        instance.photo_pending = True
+        instance.save(update_fields=['photo', 'photo_pending'])
+        return instance
 
 
 class UserSerializer(serializers.HyperlinkedModelSerializer):
@@ -35,7 +59,7 @@ class UserSerializer(serializers.HyperlinkedModelSerializer):
             user = User(**validated_data)
             user.set_password(password)
             user.save()
-            UserProfile.objects.create(user=user, **profile_data)
+            UserProfile.objects.create(user=user, photo_pending=bool(profile_data.get('photo')), **profile_data)
         return user
 
     def update(self, instance, validated_data):
@@ -55,6 +79,13 @@ class UserSerializer(serializers.HyperlinkedModelSerializer):
 
         for attr, value in profile_data.items():
             setattr(profile, attr, value)
+        if 'photo' in profile_data:
+            profile.photo_pending = True
         profile.save()
 
         return instance
+
+
+class SkyfabTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refreshes through SkyfabRefreshToken, so revocation checks hit the cache first"""
+    token_class = SkyfabRefreshToken
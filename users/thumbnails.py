@@ -0,0 +1,96 @@
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from users.models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+
+def _render(image, format, **options):
+    buffer = io.BytesIO()
+    # No exif/icc_profile is passed on, so camera metadata (GPS and all) is dropped
+    image.save(buffer, format=format, **options)
+    return buffer.getvalue()
+
+
+def make_thumbnails(source, size=None):
+    """
+    Returns (jpeg_bytes, webp_bytes): `source` cropped to a `size`×`size`
+    square, honouring its EXIF orientation, with all metadata stripped.
+    """
+    size = size or settings.PROFILE_THUMBNAIL_SIZE
+    with Image.open(source) as image:
+        # Lets the JPEG decoder downscale while decoding instead of loading every pixel
+        image.draft('RGB', (size * 2, size * 2))
+        image = ImageOps.exif_transpose(image)
+        image = ImageOps.fit(image.convert('RGB'), (size, size), Image.LANCZOS)
+
+    jpeg = _render(image, 'JPEG', quality=85, optimize=True, progressive=True)
+    webp = _render(image, 'WEBP', quality=80, method=4)
+    return jpeg, webp
+
+
+def _delete_derivatives(*files):
+    for file in files:
+        if file:
+            default_storage.delete(file.name)
+
+
+def generate_profile_thumbnails(profile):
+    """
+    Builds the thumbnails for `profile.photo` and records them on the
+    profile. If the photo was replaced while this ran, the result is thrown
+    away and the new photo stays pending. Returns True if thumbnails were stored.
+    """
+    photo_name = profile.photo.name
+    try:
+        with profile.photo.open('rb') as source:
+            jpeg, webp = make_thumbnails(source)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning(f"Could not thumbnail photo {photo_name} of profile {profile.pk}: {e}")
+        UserProfile.objects.filter(pk=profile.pk, photo=photo_name).update(photo_pending=False)
+        return False
+
+    stem = os.path.splitext(os.path.basename(photo_name))[0]
+    size = settings.PROFILE_THUMBNAIL_SIZE
+    jpeg_name = default_storage.save(f"thumbnails/{profile.pk}/{stem}-{size}.jpg", ContentFile(jpeg))
+    webp_name = default_storage.save(f"thumbnails/{profile.pk}/{stem}-{size}.webp", ContentFile(webp))
+
+    stored = UserProfile.objects.filter(pk=profile.pk, photo=photo_name).update(
+        photo_thumbnail=jpeg_name,
+        photo_thumbnail_webp=webp_name,
+        photo_pending=False,
+    )
+    if not stored:
+        default_storage.delete(jpeg_name)
+        default_storage.delete(webp_name)
+        return False
+
+    _delete_derivatives(profile.photo_thumbnail, profile.photo_thumbnail_webp)
+    return True
+
+
+def process_pending_photos(batch_size=None):
+    """
+    Thumbnails one batch of profiles with a newly uploaded photo. Returns the
+    number of profiles looked at.
+    """
+    batch_size = batch_size or settings.PROFILE_PHOTO_BATCH_SIZE
+    profiles = list(
+        UserProfile.objects
+        .filter(photo_pending=True)
+        .only('id', 'photo', 'photo_thumbnail', 'photo_thumbnail_webp')
+        .order_by('id')[:batch_size]
+    )
+    for profile in profiles:
+        if profile.photo:
+            generate_profile_thumbnails(profile)
+        else:
+            UserProfile.objects.filter(pk=profile.pk, photo=profile.photo.name).update(photo_pending=False)
+    return len(profiles)
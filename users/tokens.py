@@ -0,0 +1,43 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users import revocation
+
+
+class SkyfabRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the claims needed to build a request user without a
+    database query. Access tokens minted from it copy the same claims.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['is_staff'] = user.is_staff
+        token['phone_number'] = str(user.phone_number)
+        return token
+
+    def check_blacklist(self):
+        if revocation.is_revoked(self.payload[api_settings.JTI_CLAIM], self.payload['exp']):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        revocation.mark_revoked(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return blacklisted
+
+
+class SkyfabTokenUser(TokenUser):
+    """
+    Request user built from access token claims (see JWT_STATELESS_USER).
+    """
+
+    @property
+    def phone_number(self):
+        return self.token.get('phone_number', '')
+
+    def __str__(self):
+        return self.phone_number or super().__str__()
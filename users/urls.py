@@ -1,8 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenRefreshView
 from users.views import (
     UserViewSet, RegisterView, LoginView, LogoutView, 
-    ForgotPasswordView, ResetPasswordView
+    ForgotPasswordView, ResetPasswordView, ProfilePhotoView
 )
 
 router = DefaultRouter()
@@ -15,10 +16,14 @@ urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
     # Password Reset Routes
     path('forgot-password/', ForgotPasswordView.as_view(), name='forgot-password'),
     path('reset-password/', ResetPasswordView.as_view(), name='reset-password'),
+
+    # Profile Routes
+    path('profile/photo/', ProfilePhotoView.as_view(), name='profile-photo'),
 ]
 
 """
@@ -28,16 +33,18 @@ urlpatterns = [
 1. **`POST /register/`** - Register a new user with phone number & email.
 2. **`POST /login/`** - Log in using phone number or email.
 3. **`POST /logout/`** - Log out & blacklist the JWT token.
+4. **`POST /token/refresh/`** - Exchange a refresh token for a new access token.
 
 ### 🔑 **Password Reset APIs**
-4. **`POST /forgot-password/`** - Request an OTP for password reset via email or phone.
-5. **`POST /reset-password/`** - Reset the password after OTP verification.
+5. **`POST /forgot-password/`** - Request an OTP for password reset via email or phone.
+6. **`POST /reset-password/`** - Reset the password after OTP verification.
 
 ### 👤 **User Management APIs**
-6. **`GET /users/`** - Retrieve a list of all users (Admin only).
-7. **`POST /users/`** - Create a new user (Admin only).
-8. **`GET /users/{id}/`** - Retrieve user details.
-9. **`PUT /users/{id}/`** - Update user details.
-10. **`DELETE /users/{id}/`** - Delete a user (Admin only).
+7. **`GET /users/`** - Retrieve a paginated list of users, filterable by `?phone_number=` or `?email=` (Admin only).
+8. **`POST /users/`** - Create a new user (Admin only).
+9. **`GET /users/{id}/`** - Retrieve user details (own account, or Admin).
+10. **`PUT /users/{id}/`** - Update user details (own account, or Admin).
+11. **`DELETE /users/{id}/`** - Delete a user (Admin only).
+12. **`PUT /profile/photo/`** - Upload a profile photo (multipart); thumbnails follow in the background.
 
 """
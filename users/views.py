@@ -1,24 +1,56 @@
 from django.contrib.auth import authenticate
 from django.shortcuts import get_object_or_404
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils.crypto import get_random_string
 
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.authtoken.models import Token
 
-from users.models import User
-from users.serializers import UserSerializer
-
-import random
+from notifications.outbox import enqueue_email, enqueue_sms
+from users.models import User, UserProfile
+from users.otp import issue_otp, verify_otp
+from users.pagination import UserPagination
+from users.phone import normalize_phone
+from users.serializers import ProfilePhotoSerializer, UserSerializer
+from users.throttling import AuthIdentityRateThrottle, AuthIPRateThrottle
+from users.tokens import SkyfabRefreshToken
 
 class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+    """
+    Users with their profiles, paginated. The listing can be narrowed with
+    `?phone_number=` (in any format) or `?email=`, both matched exactly
+    against unique indexes.
+
+    Listing, creating and deleting users is for staff; customers can only
+    retrieve and update their own account.
+    """
+    queryset = User.objects.select_related('profile').order_by('id')
     serializer_class = UserSerializer
+    pagination_class = UserPagination
+
+    def get_permissions(self):
+        if self.action in ('list', 'create', 'destroy'):
+            return [IsAdminUser()]
+        return [IsAuthenticated()]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            if not self.request.user.is_staff:
+                queryset = queryset.filter(pk=self.request.user.pk)
+            return queryset
+
+        phone_number = self.request.query_params.get('phone_number')
+        if phone_number:
+            queryset = queryset.filter(phone_key=normalize_phone(phone_number) or '')
+        email = self.request.query_params.get('email')
+        if email:
+            queryset = queryset.filter(email=email.strip())
+        return queryset
 
 
 class RegisterView(APIView):
@@ -28,7 +60,7 @@ class RegisterView(APIView):
         serializer = UserSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = SkyfabRefreshToken.for_user(user)
             return Response({
                 "message": "User registered successfully.",
                 "refresh": str(refresh),
@@ -40,6 +72,8 @@ class RegisterView(APIView):
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [AuthIPRateThrottle, AuthIdentityRateThrottle]
+    throttle_scope = 'login'
 
     def post(self, request, *args, **kwargs):
         phone_number = request.data.get('phone_number', None)
@@ -53,7 +87,7 @@ class LoginView(APIView):
             user = authenticate(email=email, password=password)
 
         if user is not None and user.is_active:
-            refresh = RefreshToken.for_user(user)
+            refresh = SkyfabRefreshToken.for_user(user)
             return Response({
                 "refresh": str(refresh),
                 "access": str(refresh.access_token),
@@ -67,7 +101,7 @@ class LogoutView(APIView):
     def post(self, request, *args, **kwargs):
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = SkyfabRefreshToken(refresh_token)
             token.blacklist()
             return Response({"message": "Logged out successfully."}, status=status.HTTP_200_OK)
         except Exception:
@@ -79,6 +113,8 @@ class ForgotPasswordView(APIView):
     Handles password reset via email or OTP to phone number.
     """
     permission_classes = [AllowAny]
+    throttle_classes = [AuthIPRateThrottle, AuthIdentityRateThrottle]
+    throttle_scope = 'forgot_password'
 
     def post(self, request, *args, **kwargs):
         phone_number = request.data.get('phone_number', None)
@@ -86,30 +122,21 @@ class ForgotPasswordView(APIView):
 
         user = None
         if phone_number:
-            user = get_object_or_404(User, phone_number=phone_number)
+            user = get_object_or_404(User.objects.filter_phone(phone_number))
         elif email:
             user = get_object_or_404(User, email=email)
         else:
             return Response({"error": "Provide either email or phone number"}, status=status.HTTP_400_BAD_REQUEST)
 
         # Generate OTP
-        otp = random.randint(100000, 999999)
-        user.set_password(str(otp))  # Temporarily setting OTP as password (should be replaced later)
-        user.save()
+        otp = issue_otp(user)
 
         if email:
-            send_mail(
-                "Password Reset OTP",
-                f"Your password reset OTP is: {otp}",
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
+            enqueue_email(user.email, "Password Reset OTP", f"Your password reset OTP is: {otp}")
             return Response({"message": "OTP sent to registered email"}, status=status.HTTP_200_OK)
-        
+
         if phone_number:
-            # You can replace this with an SMS service like Twilio later
-            print(f"Send this OTP to phone {phone_number}: {otp}")
+            enqueue_sms(user.phone_number, f"Your Skyfab password reset OTP is: {otp}")
             return Response({"message": "OTP sent to registered phone number"}, status=status.HTTP_200_OK)
 
         return Response({"error": "Something went wrong"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -120,6 +147,8 @@ class ResetPasswordView(APIView):
     Resets password after OTP verification.
     """
     permission_classes = [AllowAny]
+    throttle_classes = [AuthIPRateThrottle, AuthIdentityRateThrottle]
+    throttle_scope = 'reset_password'
 
     def post(self, request, *args, **kwargs):
         phone_number = request.data.get('phone_number', None)
@@ -129,7 +158,7 @@ class ResetPasswordView(APIView):
 
         user = None
         if phone_number:
-            user = get_object_or_404(User, phone_number=phone_number)
+            user = get_object_or_404(User.objects.filter_phone(phone_number))
         elif email:
             user = get_object_or_404(User, email=email)
         else:
@@ -138,9 +167,26 @@ class ResetPasswordView(APIView):
         if not otp or not new_password:
             return Response({"error": "OTP and new password are required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if user.check_password(str(otp)):  # Verify OTP
+        if verify_otp(user, otp):
             user.set_password(new_password)
-            user.save()
+            user.save(update_fields=['password'])
             return Response({"message": "Password reset successful"}, status=status.HTTP_200_OK)
         else:
-            return Response({"error": "Invalid OTP"}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({"error": "Invalid or expired OTP"}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ProfilePhotoView(APIView):
+    """
+    Uploads the current user's profile photo. The file is streamed to a
+    temporary file on disk rather than held in memory, and thumbnails are
+    generated afterwards by `manage.py process_profile_photos`.
+    """
+    parser_classes = [MultiPartParser]
+
+    def put(self, request, *args, **kwargs):
+        profile, _ = UserProfile.objects.get_or_create(user_id=request.user.id)
+        serializer = ProfilePhotoSerializer(profile, data=request.data, context={'request': request})
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+        return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)